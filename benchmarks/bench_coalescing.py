@@ -0,0 +1,76 @@
+"""
+Offline benchmark of coalescing concurrent identical calls (single-flight).
+
+Starts mock_server.MockServer and has --threads threads call the same
+functions at once, as the workers of a web tier would, with the Client's
+coalescing on and then off. For each function it prints the wall time
+of the burst, the requests the server received and the calls coalesced.
+The id caches and held collections are emptied before every burst.
+
+> python benchmarks/bench_coalescing.py --threads 32 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import client  # noqa: E402
+import filters  # noqa: E402
+import memo  # noqa: E402
+from characters import get_all_characters, get_character_by_id  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+from movies import get_all_movies  # noqa: E402
+from quotes import get_quote_by_regex  # noqa: E402
+
+
+def burst(func, threads: int) -> float:
+    """
+    Call func from threads threads released at once and return the wall time in milliseconds.
+    """
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        func()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start)*1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare bursts of identical calls with and without request coalescing.")
+    parser.add_argument("--threads", type=int, default=32, help="The number of threads calling at once.")
+    parser.add_argument("--latency", type=float, default=0.05, help="The delay in seconds the server adds to every response.")
+    args = parser.parse_args()
+
+    with MockServer(latency=args.latency) as server:
+        character_id = server.fixtures["character"][len(server.fixtures["character"])//2]["_id"]
+        calls = {
+            "get_all_movies": get_all_movies,
+            "get_all_characters": get_all_characters,
+            "get_character_by_id": lambda: get_character_by_id(character_id),
+            "get_quote_by_regex": lambda: get_quote_by_regex("dialog", "/precious/i"),
+        }
+        print(f"{'function':<22} {'coalesce':>8} {'wall ms':>9} {'requests':>9} {'coalesced':>10}")
+        for name, func in calls.items():
+            for coalesce in (True, False):
+                client.configure(api=server.api, headers={}, pool_size=args.threads, coalesce=coalesce)
+                memo.configure()
+                filters.configure()
+                requests = server.requests
+                wall_ms = burst(func, args.threads)
+                coalesced = client.get_client().stats().get("single_flight", {}).get("coalesced", 0)
+                print(f"{name:<22} {str(coalesce):>8} {wall_ms:>9.1f} {server.requests - requests:>9} {coalesced:>10}")
+        client.configure()
+
+
+if __name__ == "__main__":
+    main()
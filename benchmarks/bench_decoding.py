@@ -0,0 +1,76 @@
+"""
+CPU benchmark of decoding a list response and building its model objects.
+
+Builds one synthetic response body of quotes or characters and times the
+previous path (decode the body to text, parse it with json and build every
+object field by field) against each available JSON backend parsing the
+raw bytes, with eager and lazy object construction. "lazy + access" reads
+one field of every object, which builds them all.
+
+> python benchmarks/bench_decoding.py --count 50000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import decoding  # noqa: E402
+from characters import Character, character_from_doc  # noqa: E402
+from quotes import Quote, quote_from_doc  # noqa: E402
+from bench_records import character_docs, quote_docs  # noqa: E402
+
+
+def body(docs: list) -> bytes:
+    return json.dumps({"docs": docs, "total": len(docs), "limit": 1000, "offset": 0, "page": 1, "pages": 1}).encode("utf-8")
+
+
+def previous(content: bytes, from_doc) -> list:
+    # what Response.json() and the field by field loop did before
+    results_json = json.loads(content.decode("utf-8"))
+    objects = []
+    for i in range(results_json["total"]):
+        objects.append(from_doc(results_json["docs"][i]))
+    return objects
+
+
+def build(content: bytes, model, from_doc, id_key: str, touch: str = None) -> list:
+    objects = decoding.from_docs(decoding.loads(content)["docs"], model, from_doc, id_key)
+    if touch is not None:
+        for obj in objects:
+            getattr(obj, touch)
+    return objects
+
+
+def best(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON backends and lazy object construction.")
+    parser.add_argument("--count", type=int, default=20000, help="The number of documents in the response.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of runs, the fastest is reported.")
+    args = parser.parse_args()
+
+    cases = [
+        ("Quote", quote_docs, Quote, quote_from_doc, "id", "dialog"),
+        ("Character", character_docs, Character, character_from_doc, "_id", "name"),
+    ]
+    print(f"{'model':<10} {'path':<24} {'ms':>9} {'speedup':>8}")
+    for name, make_docs, model, from_doc, id_key, touch in cases:
+        content = body(make_docs(args.count))
+        baseline = best(lambda: previous(content, from_doc), args.repeat)
+        print(f"{name:<10} {'previous':<24} {baseline*1000:>9.1f} {1:>7.2f}x")
+        for backend in decoding.BACKENDS:
+            variants = [("eager", False, None), ("lazy", True, None), ("lazy + access", True, touch)]
+            for variant, lazy, field in variants:
+                decoding.configure(backend=backend, lazy=lazy)
+                elapsed = best(lambda: build(content, model, from_doc, id_key, field), args.repeat)
+                print(f"{name:<10} {f'{backend} {variant}':<24} {elapsed*1000:>9.1f} {baseline/elapsed:>7.2f}x")
+    decoding.configure(backend=decoding.DEFAULT_BACKEND, lazy=False)
+
+
+if __name__ == "__main__":
+    main()
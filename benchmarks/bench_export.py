@@ -0,0 +1,115 @@
+"""
+Offline benchmark of the export pipeline against sequential pulls.
+
+Starts mock_server.MockServer with --scale times the live collection sizes
+and exports all five resources, first as a script would without the
+pipeline (get_all_* for each resource in turn, then the rows of each file
+built and written at once), then with export.export(). Each run happens in
+its own process, so that its peak RSS is its own. It prints the wall time,
+the rows per second and the peak RSS of each run, and the rows per second
+of every stage of the pipeline.
+
+> python benchmarks/bench_export.py --scale 50 --format parquet --processes 4
+"""
+import argparse
+import dataclasses
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import client  # noqa: E402
+from books import get_all_books  # noqa: E402
+from chapters import get_all_chapters  # noqa: E402
+from characters import get_all_characters  # noqa: E402
+from export import FORMATS, RESOURCES, export, export_fields, export_schema  # noqa: E402
+from mock_server import FIXTURE_SIZES, MockServer, synthetic_fixtures  # noqa: E402
+from movies import get_all_movies  # noqa: E402
+from quotes import get_all_quotes  # noqa: E402
+
+GET_ALL = {
+    "book": get_all_books,
+    "chapter": get_all_chapters,
+    "character": get_all_characters,
+    "movie": get_all_movies,
+    "quote": get_all_quotes,
+}
+
+
+def sequential(directory: str, format: str, limit: int) -> int:
+    """
+    Export every resource one after the other, holding all its rows, and return the rows written.
+    """
+    rows = 0
+    for name, get_all in GET_ALL.items():
+        model = RESOURCES[name][1]
+        names = [field.name for field in export_fields(model)]
+        records = [{field: getattr(obj, field) for field in names} for obj in get_all(limit=limit)]
+        path = os.path.join(directory, f"{name}.{FORMATS[format]}")
+        if format == "ndjson":
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        else:
+            import pyarrow
+            import pyarrow.parquet
+            table = pyarrow.Table.from_pylist(records, schema=export_schema(model))
+            if format == "parquet":
+                pyarrow.parquet.write_table(table, path)
+            else:
+                with pyarrow.ipc.new_file(path, table.schema) as writer:
+                    writer.write_table(table)
+        rows += len(records)
+    return rows
+
+
+def run(args) -> dict:
+    """
+    Run one export against a new mock server and return its measurements.
+    """
+    fixtures = synthetic_fixtures({collection: size*args.scale for collection, size in FIXTURE_SIZES.items()})
+    with tempfile.TemporaryDirectory() as directory, MockServer(fixtures, latency=args.latency) as server:
+        client.configure(api=server.api, headers={}, pool_size=8)
+        start = time.perf_counter()
+        if args.run == "sequential":
+            rows = sequential(directory, args.format, args.limit)
+            stages = {}
+        else:
+            report = export(directory, args.format, processes=args.processes, limit=args.limit)
+            rows = report.rows
+            stages = {stage: dataclasses.asdict(stats) for stage, stats in report.stages.items()}
+        wall = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    return {"wall": wall, "rows": rows, "peak_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024, "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential exports with the export pipeline.")
+    parser.add_argument("--scale", type=int, default=50, help="The multiple of the live collection sizes served.")
+    parser.add_argument("--format", default="parquet", choices=list(FORMATS), help="The format of the files.")
+    parser.add_argument("--processes", type=int, default=4, help="The number of processes building batches.")
+    parser.add_argument("--latency", type=float, default=0.01, help="The delay in seconds the server adds to every response.")
+    parser.add_argument("--limit", type=int, default=1000, help="The number of rows per page.")
+    parser.add_argument("--run", choices=("sequential", "pipeline"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        print(json.dumps(run(args)))
+        return
+
+    print(f"{'export':<11} {'rows':>9} {'wall s':>8} {'rows/s':>10} {'peak MiB':>9}")
+    for mode in ("sequential", "pipeline"):
+        output = subprocess.run([sys.executable, __file__, *sys.argv[1:], "--run", mode],
+                                check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f"{mode:<11} {result['rows']:>9} {result['wall']:>8.2f} {result['rows']/result['wall']:>10,.0f} {result['peak_mib']:>9.0f}")
+        for stage, stats in result["stages"].items():
+            rate = stats["rows"]/stats["seconds"] if stats["seconds"] else 0
+            print(f"  {stage:<9} {stats['rows']:>9} {stats['seconds']:>8.2f} {rate:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Offline benchmark of answering filters from held collections with filters.find.
+
+Starts mock_server.MockServer with synthetic fixtures the size of the live
+collections and times, per filter, the round trips to the server (the
+collection not held), a local evaluation of the held collection (a new
+filter) and a repeated filter (answered from the result cache).
+
+> python benchmarks/bench_filters.py --latency 0.05 --repeat 5
+"""
+import argparse
+import importlib
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import client  # noqa: E402
+import filters  # noqa: E402
+import memo  # noqa: E402
+from filters import FETCHERS, find  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+
+# resource: filters
+QUERIES = [
+    ("character", ("name=/Character 1/i",)),
+    ("character", ("race=Hobbit,Elf", "realm!=Shire")),
+    ("movie", ("budgetInMillions>100", "academyAwardWins>=1")),
+    ("chapter", ("chapterName=/Chapter [0-9]$/",)),
+    ("quote", ("dialog=/precious/i",)),
+]
+
+
+def best(func, repeat: int) -> float:
+    """
+    Return the best time in milliseconds of one call of func.
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))*1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare filters sent to a mock One API with filters evaluated locally.")
+    parser.add_argument("--latency", type=float, default=0, help="The delay in seconds the server adds to every response.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timed runs, the best is kept.")
+    args = parser.parse_args()
+
+    with MockServer(latency=args.latency) as server:
+        client.configure(api=server.api, headers={})
+        print(f"{'resource':<10} {'filters':<40} {'server ms':>10} {'local ms':>9} {'cached ms':>10} {'results':>8}")
+        for resource, query in QUERIES:
+            filters.configure()
+            memo.configure()
+            server_ms = best(lambda: find(resource, *query), args.repeat)
+            module, name = FETCHERS[resource]
+            getattr(importlib.import_module(module), name)()
+
+            def local():
+                # a new generation of the held collection, so the result cache misses
+                filters.hold(resource, filters.held(resource))
+                return find(resource, *query)
+            local_ms = best(local, args.repeat)
+            cached_ms = best(lambda: find(resource, *query), args.repeat)
+            print(f"{resource:<10} {', '.join(query):<40} {server_ms:>10.2f} {local_ms:>9.3f} {cached_ms:>10.4f} "
+                  f"{len(find(resource, *query)):>8}")
+        client.configure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cold-start benchmark of importing the SDK.
+
+Imports each target in fresh interpreters and prints the median and
+minimum wall time of the import, and which heavy dependencies (requests,
+urllib3, numpy, sqlite3, ...) it loaded. Targets are imported as the
+lotr_sdk package by default, or with lotr_sdk/src on sys.path with --flat,
+which is how the tests and benchmarks import the modules and the only way
+trees from before the package entry point can be imported.
+
+Results can be saved with --save and compared against a saved run with
+--baseline. To measure an older commit, check it out elsewhere and point
+--src at its source directory:
+
+> git worktree add /tmp/lotr_sdk_before <commit>
+> python benchmarks/bench_import.py --flat --src /tmp/lotr_sdk_before/lotr_sdk/src --save before.json
+> python benchmarks/bench_import.py --flat --baseline before.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src")
+TARGETS = ("books", "chapters", "characters", "movies", "quotes", "client", "snapshot")
+HEAVY_MODULES = ("requests", "urllib3", "numpy", "sqlite3", "logging.handlers", "email.utils", "orjson", "aiohttp")
+
+# imports src as the lotr_sdk package, as an installed copy would be imported
+LOAD_PACKAGE = """
+spec = importlib.util.spec_from_file_location("lotr_sdk", os.path.join(src, "__init__.py"), submodule_search_locations=[src])
+package = importlib.util.module_from_spec(spec)
+sys.modules["lotr_sdk"] = package
+spec.loader.exec_module(package)
+"""
+CHILD = """
+import importlib, importlib.util, json, os, sys, time
+src, target, flat, heavy = sys.argv[1], sys.argv[2], sys.argv[3] == "1", sys.argv[4].split(",")
+start = time.perf_counter()
+if flat:
+    sys.path.insert(0, src)
+    importlib.import_module(target)
+else:
+{load_package}
+    if target != "lotr_sdk":
+        importlib.import_module("lotr_sdk." + target)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in heavy if name in sys.modules]}}))
+""".format(load_package="\n".join("    " + line for line in LOAD_PACKAGE.strip().splitlines()))
+
+
+def measure(src: str, target: str, flat: bool, runs: int) -> dict:
+    """
+    Import target in runs fresh interpreters and return the median and minimum time and the heavy modules loaded.
+    """
+    times = []
+    loaded = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, os.path.abspath(src), target, "1" if flat else "0", ",".join(HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd="/",
+        )
+        result = json.loads(output.stdout)
+        times.append(result["seconds"])
+        loaded = result["loaded"]
+    return {"median_ms": statistics.median(times)*1000, "min_ms": min(times)*1000, "loaded": loaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold import time of the SDK in fresh interpreters.")
+    parser.add_argument("--runs", type=int, default=15, help="The number of fresh interpreters per target.")
+    parser.add_argument("--src", default=SRC, help="The source directory of the SDK to import.")
+    parser.add_argument("--flat", action="store_true", help="Import the modules by bare name with src on sys.path.")
+    parser.add_argument("--save", help="Write the results to this json file.")
+    parser.add_argument("--baseline", help="A json file from --save to compare the results against.")
+    args = parser.parse_args()
+
+    targets = TARGETS if args.flat else ("lotr_sdk",) + TARGETS
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    results = {}
+    print(f"{'target':<12} {'median ms':>10} {'min ms':>8} {'baseline':>9}  heavy modules loaded")
+    for target in targets:
+        result = measure(args.src, target, args.flat, args.runs)
+        results[target] = result
+        previous = f"{baseline[target]['median_ms']:>9.1f}" if target in baseline else f"{'':>9}"
+        print(f"{target:<12} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f} {previous}  {', '.join(result['loaded']) or '-'}")
+
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Memory benchmark of the model dataclasses against their slotted records.
+
+Builds the same synthetic characters and quotes as plain dataclasses,
+slotted records and frozen slotted records, and prints the bytes each
+object keeps alive (the object plus the strings it references) as
+measured by tracemalloc.
+
+> python benchmarks/bench_records.py --count 50000
+"""
+import argparse
+import tracemalloc
+import gc
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+from characters import character_from_doc  # noqa: E402
+from quotes import quote_from_doc  # noqa: E402
+from records import CharacterRecord, FrozenCharacterRecord, QuoteRecord, FrozenQuoteRecord, to_record  # noqa: E402
+
+RACES = ["Human", "Hobbit", "Elf", "Dwarf", "Maiar", "Orc"]
+REALMS = ["", "Gondor", "Rohan", "Shire", "Rivendell"]
+
+
+def character_docs(count: int) -> list:
+    # round trip through json so repeated values are separate strings, like API responses
+    return json.loads(json.dumps([
+        {"_id": f"5cd99d4bde30eff6ebcc{i:04x}", "height": "", "race": RACES[i % len(RACES)],
+         "gender": "Male" if i % 2 else "Female", "birth": "", "spouse": "", "death": "",
+         "realm": REALMS[i % len(REALMS)], "hair": "", "name": f"Character {i}"}
+        for i in range(count)
+    ]))
+
+
+def quote_docs(count: int) -> list:
+    return json.loads(json.dumps([
+        {"_id": f"5cd96e05de30eff6ebcc{i:04x}", "id": f"5cd96e05de30eff6ebcc{i:04x}",
+         "dialog": f"Quote number {i}", "movie": f"5cd95395de30eff6ebccde5{i % 8}",
+         "character": f"5cd99d4bde30eff6ebccf{i % 300:03x}"}
+        for i in range(count)
+    ]))
+
+
+def measure(build, make_docs, count: int) -> float:
+    """
+    Return the bytes per object still allocated once the objects are built
+    and the decoded docs they came from are dropped.
+    """
+    build(make_docs(count))  # warm up the intern table and allocator
+    gc.collect()
+    tracemalloc.start()
+    docs = make_docs(count)
+    objects = build(docs)
+    del docs
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size/count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory used by dataclasses and slotted records.")
+    parser.add_argument("--count", type=int, default=20000, help="The number of objects to build.")
+    args = parser.parse_args()
+
+    cases = [
+        ("Character", character_docs, character_from_doc, CharacterRecord, FrozenCharacterRecord),
+        ("Quote", quote_docs, quote_from_doc, QuoteRecord, FrozenQuoteRecord),
+    ]
+    print(f"{'model':<10} {'variant':<16} {'bytes/object':>12} {'saving':>8}")
+    for name, make_docs, from_doc, record, frozen_record in cases:
+        baseline = measure(lambda docs: [from_doc(doc) for doc in docs], make_docs, args.count)
+        variants = [
+            ("dataclass", baseline),
+            ("record", measure(lambda docs: [to_record(from_doc(doc)) for doc in docs], make_docs, args.count)),
+            ("frozen record", measure(lambda docs: [to_record(from_doc(doc), frozen=True) for doc in docs], make_docs, args.count)),
+        ]
+        for variant, size in variants:
+            print(f"{name:<10} {variant:<16} {size:>12.1f} {1 - size/baseline:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
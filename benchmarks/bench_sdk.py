@@ -0,0 +1,185 @@
+"""
+Offline benchmark of every public get_* function against a local mock One API.
+
+Starts mock_server.MockServer (synthetic fixtures the size of the live
+collections, or a recorded snapshot file), points the client at it and
+calls each get_* function of books, chapters, characters, movies and
+quotes repeatedly. For each function it prints the throughput in calls
+per second, the p50 and p99 latency and the peak memory of one call as
+measured by tracemalloc. The id caches and held collections are emptied
+before every call so that each call does its full work, unless --warm is
+passed.
+
+Results can be saved with --save and compared against a saved run with
+--baseline; the exit status is 1 when any function got slower or used
+more memory than the tolerance allows.
+
+> python benchmarks/bench_sdk.py --iterations 50 --latency 0.002 --save before.json
+> python benchmarks/bench_sdk.py --iterations 50 --latency 0.002 --baseline before.json
+"""
+import argparse
+import inspect
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import books  # noqa: E402
+import chapters  # noqa: E402
+import characters  # noqa: E402
+import client  # noqa: E402
+import filters  # noqa: E402
+import memo  # noqa: E402
+import movies  # noqa: E402
+import quotes  # noqa: E402
+from mock_server import DEFAULT_PAGE_SIZE, MockServer  # noqa: E402
+
+# module: (collection, name field, regex used for get_*_by_regex)
+MODULES = {
+    books: ("book", "name", "/book/i"),
+    chapters: ("chapter", "chapterName", "/chapter 1/i"),
+    characters: ("character", "name", "/character 1/i"),
+    movies: ("movie", "name", "/movie/i"),
+    quotes: ("quote", "dialog", "/precious/i"),
+}
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Return the nearest-rank percentile of values.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q/100*len(ordered)) - 1, 0)]
+
+
+def public_functions():
+    """
+    Yield every public get_* function defined in the resource modules with its module.
+    """
+    for module in MODULES:
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith("get_") and func.__module__ == module.__name__:
+                yield module, name, func
+
+
+def arguments(module, func, fixtures: dict) -> dict:
+    """
+    Return the arguments of a get_* function, picked from the fixtures by parameter name.
+    Options with defaults (params, max_workers, ...) keep them.
+    """
+    collection, name_field, regex = MODULES[module]
+    docs = fixtures[collection]
+    middle = docs[len(docs)//2]
+    values = {
+        "id": middle["_id"],
+        "ids": [doc["_id"] for doc in docs[::max(len(docs)//10, 1)]],
+        "name": middle.get(name_field),
+        "sort_by": name_field,
+        "sort_type": "asc",
+        "regex": regex,
+    }
+    kwargs = {}
+    for parameter in inspect.signature(func).parameters.values():
+        if parameter.name.endswith("_arg"):
+            kwargs[parameter.name] = name_field
+        elif parameter.name in values:
+            kwargs[parameter.name] = values[parameter.name]
+        elif parameter.default is inspect.Parameter.empty:
+            raise ValueError(f"No benchmark value for the {parameter.name} argument of {func.__name__}")
+    return kwargs
+
+
+def measure(func, kwargs: dict, iterations: int, warm: bool) -> dict:
+    """
+    Call func iterations times and return its throughput, latency percentiles and peak memory.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not warm:
+            memo.configure()
+            filters.configure()
+        call_start = time.perf_counter()
+        func(**kwargs)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+
+    if not warm:
+        memo.configure()
+        filters.configure()
+    tracemalloc.start()
+    result = func(**kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "calls_per_second": iterations/elapsed,
+        "p50_ms": percentile(latencies, 50)*1000,
+        "p99_ms": percentile(latencies, 99)*1000,
+        "peak_kib": peak/1024,
+        "results": len(result) if isinstance(result, list) else int(result is not None),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Return a line for every function whose p50 latency or peak memory grew by more than tolerance.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "peak_kib"):
+            if previous[metric] > 0 and current[metric] > previous[metric]*(1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every public get_* function against a local mock One API.")
+    parser.add_argument("--iterations", type=int, default=20, help="The number of calls per function.")
+    parser.add_argument("--latency", type=float, default=0, help="The delay in seconds the server adds to every response.")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="The server's default number of docs per page.")
+    parser.add_argument("--error-rate", type=float, default=0, help="The share of requests answered with an error.")
+    parser.add_argument("--snapshot", help="A snapshot file recorded from the live API to serve instead of synthetic fixtures.")
+    parser.add_argument("--filter", default="", help="Only run functions whose name contains this text.")
+    parser.add_argument("--warm", action="store_true", help="Keep the id caches and held collections between calls.")
+    parser.add_argument("--save", help="Write the results to this json file.")
+    parser.add_argument("--baseline", help="A json file from --save to compare the results against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="The allowed growth over the baseline (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    options = dict(latency=args.latency, page_size=args.page_size, error_rate=args.error_rate)
+    server = MockServer.from_snapshot(args.snapshot, **options) if args.snapshot else MockServer(**options)
+    results = {}
+    with server:
+        client.configure(api=server.api, headers={})
+        print(f"{'function':<28} {'calls/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10} {'results':>8}")
+        for module, name, func in public_functions():
+            if args.filter not in name:
+                continue
+            result = measure(func, arguments(module, func, server.fixtures), args.iterations, args.warm)
+            results[name] = result
+            print(f"{name:<28} {result['calls_per_second']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['peak_kib']:>10.1f} {result['results']:>8}")
+        print(f"{server.requests} requests served, {server.errors} errors injected")
+        client.configure()
+
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+CPU benchmark of searching quote dialog with search.QuoteIndex.
+
+Builds synthetic quotes with a skewed vocabulary and times, per query,
+a case-insensitive regex scan of every dialog (the work the server does
+for get_quote_by_regex("dialog", ...), without the round trips) against
+the index's term, phrase, prefix, search and contains queries. It also
+prints the time to build, save and load the index.
+
+> python benchmarks/bench_search.py --count 100000 --ngram-size 3
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+from quotes import Quote  # noqa: E402
+from search import QuoteIndex  # noqa: E402
+
+
+def synthetic_quotes(count: int, vocabulary: int = 5000, seed: int = 0) -> list:
+    """
+    Return count Quotes of 4 to 20 words drawn from a vocabulary with a Zipf-like distribution.
+    """
+    rand = random.Random(seed)
+    words = ["".join(rand.choice(string.ascii_lowercase) for _ in range(rand.randint(2, 9))) for _ in range(vocabulary - 2)]
+    # the query words are common but not stop words
+    words[100:100] = ["precious", "shire"]
+    weights = [1/(rank + 1) for rank in range(len(words))]
+    quotes = []
+    for i in range(count):
+        dialog = " ".join(rand.choices(words, weights, k=rand.randint(4, 20))).capitalize() + "."
+        quotes.append(Quote(f"q{i}", dialog, f"m{i % 8}", f"c{i % 900}"))
+    return quotes
+
+
+def best(func, repeat: int) -> float:
+    """
+    Return the best time in milliseconds of one call of func.
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))*1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare regex scans of quote dialog with QuoteIndex queries.")
+    parser.add_argument("--count", type=int, default=20000, help="The number of quotes.")
+    parser.add_argument("--ngram-size", type=int, default=3, help="The n-gram length of the index, 0 for none.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of timed runs, the best is kept.")
+    args = parser.parse_args()
+
+    quotes = synthetic_quotes(args.count)
+    start = time.perf_counter()
+    index = QuoteIndex(quotes, args.ngram_size)
+    build_ms = (time.perf_counter() - start)*1000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json")
+        save_ms = best(lambda: index.save(path), args.repeat)
+        load_ms = best(lambda: QuoteIndex.load(path), args.repeat)
+        size_kib = os.path.getsize(path)/1024
+    rebuild_ms = best(lambda: QuoteIndex(quotes, args.ngram_size), args.repeat)
+    print(f"{args.count} quotes, index built in {build_ms:.1f} ms (rebuild {rebuild_ms:.1f} ms), "
+          f"saved in {save_ms:.1f} ms ({size_kib:.0f} KiB), loaded in {load_ms:.1f} ms")
+
+    # query: (regex equivalent, index query)
+    queries = {
+        "term precious": (r"\bprecious\b", lambda: index.term("precious")),
+        "phrase precious shire": (r"\bprecious shire\b", lambda: index.phrase("precious shire")),
+        "prefix pre": (r"\bpre", lambda: index.prefix("pre")),
+        "search 'precious sh'": (r"\bprecious\b(?=.*\bsh)|\bsh\w*\b(?=.*\bprecious\b)", lambda: index.search("precious sh")),
+        "contains ecio": (r"ecio", lambda: index.contains("ecio")),
+    }
+    print(f"{'query':<24} {'regex ms':>9} {'index ms':>9} {'speedup':>8} {'results':>8}")
+    for name, (pattern, query) in queries.items():
+        regex = re.compile(pattern, re.IGNORECASE)
+        scan = lambda: [quote for quote in quotes if regex.search(quote.dialog)]  # noqa: E731
+        scan_ms = best(scan, args.repeat)
+        index_ms = best(query, args.repeat)
+        print(f"{name:<24} {scan_ms:>9.2f} {index_ms:>9.3f} {scan_ms/index_ms:>7.0f}x {len(query()):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Offline benchmark of syncing a snapshot incrementally.
+
+Starts mock_server.MockServer with --scale times the live collection sizes,
+downloads a full snapshot and syncs it again: unchanged, after editing
+--changes random quotes and after appending as many. For every sync it
+prints the wall time, the pages fetched, the docs changed and the KiB
+received. Appends change the total of every page, so every page of the
+collection is fetched and compared by checksum.
+
+> python benchmarks/bench_sync.py --scale 20 --changes 10 --latency 0.02
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lotr_sdk", "src"))
+
+import client  # noqa: E402
+from mock_server import FIXTURE_SIZES, MockServer, synthetic_fixtures  # noqa: E402
+from snapshot import sync_snapshot  # noqa: E402
+
+
+def row(name: str, report):
+    pages = sum(result.pages for result in report.collections)
+    fetched = sum(result.fetched_pages for result in report.collections)
+    changed = sum(result.inserted + result.updated + result.deleted for result in report.collections)
+    kib = sum(result.bytes for result in report.collections)/1024
+    print(f"{name:<10} {report.total_time*1000:>9.1f} {fetched:>7}/{pages:<7} {changed:>8} {kib:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full snapshot download with incremental syncs.")
+    parser.add_argument("--scale", type=int, default=20, help="The multiple of the live collection sizes served.")
+    parser.add_argument("--changes", type=int, default=10, help="The number of docs edited, and appended, before the last sync.")
+    parser.add_argument("--latency", type=float, default=0.02, help="The delay in seconds the server adds to every response.")
+    parser.add_argument("--limit", type=int, default=1000, help="The number of docs per page.")
+    args = parser.parse_args()
+
+    fixtures = synthetic_fixtures({collection: size*args.scale for collection, size in FIXTURE_SIZES.items()})
+    rand = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory, MockServer(fixtures, latency=args.latency) as server:
+        path = os.path.join(directory, "snapshot.json.gz")
+        client.configure(api=server.api, headers={}, pool_size=8)
+        print(f"{'sync':<10} {'wall ms':>9} {'fetched/pages':>15} {'changed':>8} {'KiB':>10}")
+        row("full", sync_snapshot(path, limit=args.limit)[1])
+        row("unchanged", sync_snapshot(path, limit=args.limit)[1])
+        quotes = server.fixtures["quote"]
+        for i in rand.sample(range(len(quotes)), args.changes):
+            quotes[i] = {**quotes[i], "dialog": quotes[i]["dialog"] + " edited"}
+        row("edited", sync_snapshot(path, limit=args.limit)[1])
+        quotes.extend({**quotes[i], "_id": f"new{i}", "id": f"new{i}"} for i in range(args.changes))
+        row("appended", sync_snapshot(path, limit=args.limit)[1])
+        client.configure()
+
+
+if __name__ == "__main__":
+    main()
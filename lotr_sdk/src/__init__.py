@@ -0,0 +1,69 @@
+"""
+An SDK for The One API (https://the-one-api.dev).
+
+The resource functions and models are available from the package itself
+(i.e. lotr_sdk.get_all_characters, lotr_sdk.Character) and every module as
+a submodule (i.e. lotr_sdk.client). Both are imported on first access, so
+that importing lotr_sdk costs almost nothing and a tool calling one
+function only pays for the modules that function needs. requests is
+imported when the first request is sent.
+
+The modules import each other relatively inside the package, and by their
+bare names when lotr_sdk/src itself is on sys.path (the tests and benchmarks).
+"""
+import importlib
+
+__version__ = "0.0.1"
+
+SUBMODULES = (
+    "aio", "batch", "books", "cache", "chapters", "characters", "client", "columnar", "decoding", "events", "export", "filters",
+    "memo", "metrics", "mock_server", "movies", "pagination", "quotes", "ratelimit", "records", "sdk_logging",
+    "search", "settings", "singleflight", "snapshot", "sorting", "transport",
+)
+
+# module: the names it exports at the top of the package
+_EXPORTS = {
+    "books": (
+        "Book", "get_all_books", "get_book_by_id", "get_book_by_name", "get_book_by_regex", "get_chapters_by_book_id",
+        "get_sorted_books", "hydrate_books",
+    ),
+    "chapters": (
+        "Chapter", "get_all_chapters", "get_chapter_by_id", "get_chapter_by_name", "get_chapter_by_regex",
+        "get_sorted_chapters", "iter_chapters",
+    ),
+    "characters": (
+        "Character", "get_all_characters", "get_character_by_id", "get_character_by_name", "get_character_by_regex",
+        "get_characters_by_ids", "get_sorted_characters", "iter_characters",
+    ),
+    "movies": (
+        "Movie", "get_all_movies", "get_movie_by_id", "get_movie_by_name", "get_movie_by_regex", "get_movies_by_ids",
+        "get_sorted_movies",
+    ),
+    "quotes": (
+        "Quote", "expand_quotes", "get_all_quotes", "get_quote_by_id", "get_quote_by_regex", "get_quotes_by_ids",
+        "get_sorted_quotes", "iter_quotes",
+    ),
+    "client": ("Client", "configure", "get_client"),
+}
+_EXPORTED_BY = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_EXPORTED_BY)
+
+
+def __getattr__(name: str):
+    """
+    A function called for the names not yet imported, which imports the
+    submodule or the module exporting the name and keeps it on the package.
+    """
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _EXPORTED_BY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES) | set(__all__))
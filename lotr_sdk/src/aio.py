@@ -0,0 +1,535 @@
+from typing import List, Tuple
+import asyncio
+import time
+if __package__:
+    from .books import BOOK_API, Book, book_from_doc, SORT_FIELDS as BOOK_SORT_FIELDS
+    from .chapters import CHAPTER_API, Chapter, chapter_from_doc, SORT_FIELDS as CHAPTER_SORT_FIELDS
+    from .characters import CHARACTER_API, Character, character_from_doc, SORT_FIELDS as CHARACTER_SORT_FIELDS
+    from .movies import MOVIE_API, Movie, movie_from_doc, SORT_FIELDS as MOVIE_SORT_FIELDS
+    from .quotes import QUOTE_API, Quote, quote_from_doc, SORT_FIELDS as QUOTE_SORT_FIELDS
+    from .cache import DiskCache, resource_of
+    from .client import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE, rebase
+    from .decoding import loads
+    from .events import RequestEvent, emit, hooks, page_of
+    from .memo import id_cache
+    from .pagination import _page_count, _page_params
+    from .ratelimit import RateLimiter, retry_delay
+    from .sdk_logging import get_logger
+else:
+    from books import BOOK_API, Book, book_from_doc, SORT_FIELDS as BOOK_SORT_FIELDS
+    from chapters import CHAPTER_API, Chapter, chapter_from_doc, SORT_FIELDS as CHAPTER_SORT_FIELDS
+    from characters import CHARACTER_API, Character, character_from_doc, SORT_FIELDS as CHARACTER_SORT_FIELDS
+    from movies import MOVIE_API, Movie, movie_from_doc, SORT_FIELDS as MOVIE_SORT_FIELDS
+    from quotes import QUOTE_API, Quote, quote_from_doc, SORT_FIELDS as QUOTE_SORT_FIELDS
+    from cache import DiskCache, resource_of
+    from client import DEFAULT_MAX_RETRIES, DEFAULT_POOL_SIZE, rebase
+    from decoding import loads
+    from events import RequestEvent, emit, hooks, page_of
+    from memo import id_cache
+    from pagination import _page_count, _page_params
+    from ratelimit import RateLimiter, retry_delay
+    from sdk_logging import get_logger
+
+logger = get_logger(__name__)
+
+# aiohttp is only needed by callers of the async API
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Import api and header
+try:
+    if __package__:
+        from .settings import API, AUTH_HEADER
+    else:
+        from settings import API, AUTH_HEADER
+except ImportError as e:
+    logger.exception(e)
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+def _trace_config():
+    """
+    A function that returns an aiohttp TraceConfig adding the DNS and
+    connect time of each request to the RequestEvent passed as its trace_request_ctx.
+    """
+    async def on_dns_start(session, context, params):
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx.dns_time += time.perf_counter() - context.dns_start
+
+    async def on_connect_start(session, context, params):
+        context.connect_start = time.perf_counter()
+        context.dns_before = context.trace_request_ctx.dns_time if context.trace_request_ctx is not None else 0
+
+    async def on_connect_end(session, context, params):
+        event = context.trace_request_ctx
+        if event is not None:
+            # aiohttp resolves the host while creating the connection
+            event.connect_time += time.perf_counter() - context.connect_start - (event.dns_time - context.dns_before)
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(on_dns_start)
+    config.on_dns_resolvehost_end.append(on_dns_end)
+    config.on_connection_create_start.append(on_connect_start)
+    config.on_connection_create_end.append(on_connect_end)
+    return config
+
+
+class AsyncClient():
+    """
+    A class that owns a non-blocking connection pool to The One API and
+    limits how many requests are in flight at once. Like client.Client, it
+    can take its requests from a shared RateLimiter, retries 429 responses
+    and answers from a DiskCache; pass the same limiter and cache to both
+    clients so that sync and async callers share one quota and one cache.
+
+    Attributes
+    ----------
+    api (str): The base url of the API.
+    headers (dict): The headers sent with every request.
+    pool_size (int): The maximum number of open connections.
+    max_concurrency (int): The maximum number of requests in flight.
+    cache (DiskCache): An optional on-disk cache of the responses.
+    rate_limiter (RateLimiter): An optional token bucket every request waits on.
+    max_retries (int): The number of times a 429 response is retried.
+    """
+    def __init__(self, api: str = API, headers: dict = AUTH_HEADER, pool_size: int = DEFAULT_POOL_SIZE, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 cache: DiskCache = None, rate_limiter: RateLimiter = None, max_retries: int = DEFAULT_MAX_RETRIES):
+        if aiohttp is None:
+            raise ImportError("The async API requires aiohttp. Install it with: pip install aiohttp")
+        self.api = api
+        self.headers = dict(headers)
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.retries = 0
+        self.backoff_time = 0
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            trace_configs=[_trace_config()]
+        )
+
+    async def get(self, url: str, params: dict = None) -> Tuple[int, dict]:
+        """
+        A function that sends a GET request and returns the status code and decoded json.
+        When hooks are registered (see events.add_hook), each of them receives a RequestEvent.
+
+        Arguments
+        ----------
+        url (str): The url to request.
+        params (dict): A dictionary of parameters sent in the API call.
+        """
+        url = rebase(url, self.api)
+        event = RequestEvent(url=url, resource=resource_of(url), page=page_of(url, params)) if hooks() else None
+        start = time.perf_counter()
+        status, body = await self._get(url, params, event)
+        if event is not None:
+            event.status = status
+            event.bytes = len(body)
+            event.total_time = time.perf_counter() - start
+            emit(event)
+        if status != 200:
+            return status, {}
+        return status, loads(body)
+
+    async def _get(self, url: str, params: dict = None, event: RequestEvent = None) -> Tuple[int, bytes]:
+        """
+        A function that answers a request from the cache or the server, as Client._get does.
+        """
+        if self.cache is None:
+            status, body, _ = await self._send(url, params, None, event)
+            return status, body
+        entry = self.cache.get(url, params)
+        if entry is not None and self.cache.is_fresh(entry):
+            if event is not None:
+                event.cache = "hit"
+            return 200, entry.body
+        if event is not None:
+            event.cache = "miss"
+        headers = self.cache.validators(entry) if entry is not None else None
+        status, body, response_headers = await self._send(url, params, headers, event)
+        if status == 304 and entry is not None:
+            self.cache.revalidated(entry)
+            if event is not None:
+                event.cache = "revalidated"
+            return 200, entry.body
+        if status == 200:
+            self.cache.put_body(url, params, body, response_headers)
+        return status, body
+
+    async def _send(self, url: str, params: dict = None, headers: dict = None, event: RequestEvent = None):
+        """
+        A function that sends a request once the rate limiter allows it and
+        retries 429 responses, honoring Retry-After or backing off exponentially
+        with jitter. Returns the status code, body and headers.
+        """
+        for attempt in range(self.max_retries+1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            async with self._semaphore:
+                sent = time.perf_counter()
+                async with self.session.get(url, params=params, headers=headers, trace_request_ctx=event) as results:
+                    if event is not None:
+                        event.ttfb = time.perf_counter() - sent
+                        event.retries = attempt
+                    status = results.status
+                    body = await results.read()
+                    response_headers = results.headers
+            if status != 429 or attempt == self.max_retries:
+                return status, body, response_headers
+            delay = retry_delay(attempt, response_headers.get("Retry-After"))
+            logger.warning("Status 429 from %s. Retrying in %.2f seconds.", url, delay)
+            self.retries += 1
+            self.backoff_time += delay
+            if self.rate_limiter is not None:
+                # the limiter makes every caller wait, including this one
+                self.rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+        return status, body, response_headers
+
+    async def close(self):
+        """
+        A function that closes every pooled connection.
+        """
+        await self.session.close()
+
+
+_client = None
+
+
+def _discard(client: AsyncClient):
+    """
+    A function that closes the session of an AsyncClient created in an event
+    loop that has stopped (i.e. by an earlier asyncio.run()), dropping its
+    connections at once since the session can't be awaited from another loop.
+    A client whose loop still runs in another thread is left to that loop.
+    """
+    if client.session.closed or client._loop.is_running():
+        return
+    client.session.connector._close()
+
+
+def get_async_client() -> AsyncClient:
+    """
+    A function that returns the shared AsyncClient of the running event loop,
+    creating it on first use. The client of an earlier loop is closed.
+    """
+    global _client
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.session.closed or _client._loop is not loop:
+        if _client is not None:
+            _discard(_client)
+        _client = AsyncClient()
+    return _client
+
+
+async def configure(**kwargs) -> AsyncClient:
+    """
+    A function that replaces the shared AsyncClient with a new one built from
+    the given arguments (i.e. api, headers, pool_size, max_concurrency, cache, rate_limiter, max_retries).
+
+    Arguments
+    ----------
+    kwargs: The keyword arguments passed to AsyncClient.
+    """
+    global _client
+    old_client = _client
+    _client = AsyncClient(**kwargs)
+    if old_client is not None and old_client._loop is not _client._loop:
+        _discard(old_client)
+    elif old_client is not None and not old_client.session.closed:
+        await old_client.close()
+    return _client
+
+
+async def _get_one(url: str, params: dict, name: str):
+    """
+    A function that returns the first doc of a response, or None on failure.
+    """
+    status_code, results_json = await get_async_client().get(url, params)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", url)
+        return results_json["docs"][0]
+    logger.error("Failed with Status Code %s. Failed to get %s.", status_code, name)
+    return None
+
+
+async def _get_all(url: str, params: dict, name: str, limit: int = None) -> List:
+    """
+    A function that returns the docs of every page of a list endpoint, or []
+    if any page fails, as pagination.get_all_docs does for the sync API.
+    Pages 2..N are requested at once and limited by the client's max_concurrency.
+    """
+    client = get_async_client()
+    params = _page_params(params, limit)
+    status_code, results_json = await client.get(url, params)
+    if status_code != 200:
+        logger.error("Status %s. Failed to get %s.", status_code, name)
+        return []
+    docs = list(results_json["docs"])
+    pages = _page_count(results_json)
+    if pages > 1:
+        fetched = await asyncio.gather(*[client.get(url, {**params, "page": page}) for page in range(2, pages+1)])
+        failed_pages = []
+        for page, (status_code, results_json) in enumerate(fetched, start=2):
+            if status_code == 200:
+                docs.extend(results_json["docs"])
+            else:
+                logger.error("Status %s. Failed to get %s page %s.", status_code, name, page)
+                failed_pages.append(page)
+        if failed_pages:
+            logger.error("Failed to get %s pages %s of %s.", name, ", ".join(map(str, failed_pages)), pages)
+            return []
+    logger.info("Success! You have accessed %s.", url)
+    return docs
+
+
+async def _get_by_id(resource: str, url: str, id: str, from_doc, name: str):
+    """
+    A function that returns an object by id from the resource's id cache,
+    or fetches it and stores it there.
+    """
+    cache = id_cache(resource)
+    cached = cache.get(id)
+    if cached is not None:
+        return cached
+    doc = await _get_one(f"{url}{id}", None, f"{name} from id {id}")
+    if doc is None:
+        return None
+    obj = from_doc(doc)
+    cache.put(obj.id, obj)
+    return obj
+
+
+def _sort_params(sort_by: str, sort_type: str, sort_fields: tuple) -> dict:
+    """
+    A function that validates sort_by and sort_type and returns the sort params,
+    or None if either is invalid.
+    """
+    if sort_by not in sort_fields:
+        logger.error("%s is not a valid argument. Valid options: %s", sort_by, ', '.join(sort_fields))
+        return None
+    if sort_type != "asc" and sort_type != "desc":
+        logger.error("%s is not a valid argument. Valid options: asc, desc", sort_type)
+        return None
+    return {"sort": sort_by+":"+sort_type}
+
+
+# Books
+
+async def get_all_books(params: dict = {}, limit: int = None) -> List:
+    """
+    A coroutine that returns a list of all books, limit of them per page.
+    """
+    books = [book_from_doc(doc) for doc in await _get_all(BOOK_API, params, "books", limit)]
+    id_cache("book").put_many(books)
+    return books
+
+
+async def get_book_by_id(id: str = "") -> Book:
+    """
+    A coroutine that receives a Book id and returns a Book object.
+    """
+    return await _get_by_id("book", BOOK_API, id, book_from_doc, "Book")
+
+
+async def get_chapters_by_book_id(id: str = "") -> List:
+    """
+    A coroutine that receives a Book id and returns a list of Chapters from the book.
+    """
+    return [chapter_from_doc(doc) for doc in await _get_all(f"{BOOK_API}{id}/chapter", None, f"chapters for book {id}")]
+
+
+async def get_book_by_name(name: str = "") -> Book:
+    """
+    A coroutine that receives a Book name and returns a Book object.
+    """
+    doc = await _get_one(BOOK_API, {"name": name}, f"Book from {name}")
+    return book_from_doc(doc) if doc is not None else None
+
+
+async def get_sorted_books(sort_by: str, sort_type: str) -> List:
+    """
+    A coroutine that returns a list of books sorted by sort_by (_id, name)
+    and sort_type (asc, desc).
+    """
+    params = _sort_params(sort_by, sort_type, BOOK_SORT_FIELDS)
+    return [] if params is None else await get_all_books(params)
+
+
+async def get_book_by_regex(book_arg: str, regex: str) -> List:
+    """
+    A coroutine that receives a Book argument and matches to a regex expression.
+    """
+    return await get_all_books({book_arg: regex})
+
+
+# Chapters
+
+async def get_all_chapters(params: dict = {}, limit: int = None) -> List:
+    """
+    A coroutine that returns a list of all chapters, limit of them per page.
+    """
+    chapters = [chapter_from_doc(doc) for doc in await _get_all(CHAPTER_API, params, "chapters", limit)]
+    id_cache("chapter").put_many(chapters)
+    return chapters
+
+
+async def get_chapter_by_id(id: str = "") -> Chapter:
+    """
+    A coroutine that receives a Chapter id and returns a Chapter object.
+    """
+    return await _get_by_id("chapter", CHAPTER_API, id, chapter_from_doc, "Chapter")
+
+
+async def get_chapter_by_name(name: str = "") -> Chapter:
+    """
+    A coroutine that receives a name (chapterName) and returns a Chapter object.
+    """
+    doc = await _get_one(CHAPTER_API, {"chapterName": name}, f"Chapter from chapterName {name}")
+    return chapter_from_doc(doc) if doc is not None else None
+
+
+async def get_sorted_chapters(sort_by: str, sort_type: str) -> List:
+    """
+    A coroutine that returns a list of chapters sorted by sort_by (_id, chapterName, book)
+    and sort_type (asc, desc).
+    """
+    params = _sort_params(sort_by, sort_type, CHAPTER_SORT_FIELDS)
+    return [] if params is None else await get_all_chapters(params)
+
+
+async def get_chapter_by_regex(chapter_arg: str, regex: str) -> List:
+    """
+    A coroutine that receives a Chapter argument and matches to a regex expression.
+    """
+    return await get_all_chapters({chapter_arg: regex})
+
+
+# Characters
+
+async def get_all_characters(params: dict = {}, limit: int = None) -> List:
+    """
+    A coroutine that returns a list of all characters, limit of them per page.
+    """
+    characters = [character_from_doc(doc) for doc in await _get_all(CHARACTER_API, params, "characters", limit)]
+    id_cache("character").put_many(characters)
+    return characters
+
+
+async def get_character_by_id(id: str = "") -> Character:
+    """
+    A coroutine that receives a Character id and returns a Character object.
+    """
+    return await _get_by_id("character", CHARACTER_API, id, character_from_doc, "Character")
+
+
+async def get_character_by_name(name: str = "") -> Character:
+    """
+    A coroutine that receives a Character name and returns a Character object.
+    """
+    doc = await _get_one(CHARACTER_API, {"name": name}, f"Character from {name}")
+    return character_from_doc(doc) if doc is not None else None
+
+
+async def get_sorted_characters(sort_by: str, sort_type: str) -> List:
+    """
+    A coroutine that returns a list of characters sorted by sort_by (i.e. _id, name, race)
+    and sort_type (asc, desc).
+    """
+    params = _sort_params(sort_by, sort_type, CHARACTER_SORT_FIELDS)
+    return [] if params is None else await get_all_characters(params)
+
+
+async def get_character_by_regex(char_arg: str, regex: str) -> List:
+    """
+    A coroutine that receives a Character argument and matches to a regex expression.
+    """
+    return await get_all_characters({char_arg: regex})
+
+
+# Movies
+
+async def get_all_movies(params: dict = {}, limit: int = None) -> List:
+    """
+    A coroutine that returns a list of all movies, limit of them per page.
+    """
+    movies = [movie_from_doc(doc) for doc in await _get_all(MOVIE_API, params, "movies", limit)]
+    id_cache("movie").put_many(movies)
+    return movies
+
+
+async def get_movie_by_id(id: str = "") -> Movie:
+    """
+    A coroutine that receives a Movie id and returns a Movie object.
+    """
+    return await _get_by_id("movie", MOVIE_API, id, movie_from_doc, "Movie")
+
+
+async def get_movie_by_name(name: str = "") -> Movie:
+    """
+    A coroutine that receives a Movie name and returns a Movie object.
+    """
+    doc = await _get_one(MOVIE_API, {"name": name}, f"Movie from {name}")
+    return movie_from_doc(doc) if doc is not None else None
+
+
+async def get_sorted_movies(sort_by: str, sort_type: str) -> List:
+    """
+    A coroutine that returns a list of movies sorted by sort_by (i.e. _id, name, budgetInMillions)
+    and sort_type (asc, desc).
+    """
+    params = _sort_params(sort_by, sort_type, MOVIE_SORT_FIELDS)
+    return [] if params is None else await get_all_movies(params)
+
+
+async def get_movie_by_regex(movie_arg: str, regex: str) -> List:
+    """
+    A coroutine that receives a Movie argument and matches to a regex expression.
+    """
+    return await get_all_movies({movie_arg: regex})
+
+
+# Quotes
+
+async def get_all_quotes(params: dict = {}, limit: int = None) -> List:
+    """
+    A coroutine that returns a list of all quotes, limit of them per page.
+    """
+    quotes = [quote_from_doc(doc) for doc in await _get_all(QUOTE_API, params, "quotes", limit)]
+    id_cache("quote").put_many(quotes)
+    return quotes
+
+
+async def get_quote_by_id(id: str = "") -> Quote:
+    """
+    A coroutine that receives a Quote id and returns a Quote object.
+    """
+    return await _get_by_id("quote", QUOTE_API, id, quote_from_doc, "Quote")
+
+
+async def get_sorted_quotes(sort_by: str, sort_type: str) -> List:
+    """
+    A coroutine that returns a list of quotes sorted by sort_by (id, dialog, movie, character)
+    and sort_type (asc, desc).
+    """
+    params = _sort_params(sort_by, sort_type, QUOTE_SORT_FIELDS)
+    return [] if params is None else await get_all_quotes(params)
+
+
+async def get_quote_by_regex(quote_arg: str, regex: str) -> List:
+    """
+    A coroutine that receives a Quote argument and matches to a regex expression.
+    """
+    return await get_all_quotes({quote_arg: regex})
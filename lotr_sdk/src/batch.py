@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List
+if __package__:
+    from .memo import LRUCache
+else:
+    from memo import LRUCache
+
+DEFAULT_MAX_WORKERS = 8
+# the ids are sent as one comma separated filter, so keep the url short
+IDS_PER_PULL = 100
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+
+def get_by_ids(ids: Iterable[str], cache: LRUCache, list_fetch: Callable, id_fetch: Callable, max_workers: int = DEFAULT_MAX_WORKERS) -> List:
+    """
+    A function that resolves many ids at once and returns the objects in
+    input order, with None for ids that could not be found. Duplicate ids
+    are resolved once. Ids are served from the id cache first, then from
+    list pulls filtered on _id, and whatever is still missing is fetched
+    by id concurrently.
+
+    Arguments
+    ----------
+    ids (list): The ids to resolve.
+    cache (LRUCache): The id cache of the resource.
+    list_fetch (function): The resource's get_all_* function.
+    id_fetch (function): The resource's get_*_by_id function.
+    max_workers (int): The number of threads used for the requests.
+    """
+    ids = list(ids)
+    found = {}
+    missing = []
+    for id in dict.fromkeys(ids):
+        cached = cache.get(id)
+        if cached is not None:
+            found[id] = cached
+        else:
+            missing.append(id)
+
+    if len(missing) > 1:
+        pulls = [{"_id": ",".join(chunk)} for chunk in _chunks(missing, IDS_PER_PULL)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for objects in executor.map(list_fetch, pulls):
+                for obj in objects:
+                    found[obj.id] = obj
+        missing = [id for id in missing if id not in found]
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for id, obj in zip(missing, executor.map(id_fetch, missing)):
+                if obj is not None:
+                    found[id] = obj
+
+    return [found.get(id) for id in ids]
@@ -1,23 +1,41 @@
 from dataclasses import dataclass, field
 from typing import List
-from chapters import Chapter
-import requests
-import logging
-
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s',
-    filename='lotr_sdk.log',
-    level=logging.INFO
-    )
+if __package__:
+    from .batch import IDS_PER_PULL
+    from .client import get_client
+    from .columnar import docs_to_columns, to_columns
+    from .decoding import decode, from_docs
+    from .filters import find, hold, is_complete
+    from .memo import id_cache
+    from .pagination import PaginationReport, get_all_docs
+    from .sdk_logging import get_logger
+    from .sorting import parse_sort, sort
+else:
+    from batch import IDS_PER_PULL
+    from client import get_client
+    from columnar import docs_to_columns, to_columns
+    from decoding import decode, from_docs
+    from filters import find, hold, is_complete
+    from memo import id_cache
+    from pagination import PaginationReport, get_all_docs
+    from sdk_logging import get_logger
+    from sorting import parse_sort, sort
+import copy
+
+logger = get_logger(__name__)
 
 # Import api and header
 try:
-    from settings import API, AUTH_HEADER
+    if __package__:
+        from .settings import API
+    else:
+        from settings import API
 except ImportError as e:
-    logging.exception(e)
+    logger.exception(e)
 
 BOOK_API = f"{API}book/"
+ID_CACHE = id_cache("book")
+SORT_FIELDS = ("_id", "name")
 
 
 @dataclass
@@ -29,37 +47,96 @@ class Book():
     ----------
     id (str): The id of the book.
     name (str): The name of the book.
-    chapters (list): A list of chapters from the book.
+    chapters (list): A list of chapters from the book, Chapter objects once hydrated by hydrate_books.
     """
     id: str = ""
     name: str = ""
-    chapters: List[str] = field(default_factory=list)
+    chapters: List = field(default_factory=list)
 
 
-def get_all_books(params:dict = {}) -> List:
+def book_from_doc(doc: dict) -> Book:
     """
-    A function that returns a list of all books.
+    A function that receives a book document from the API and returns a Book object.
 
     Arguments
     ----------
-    params (dict): A dictionary of parameters sent in the API call.
+    doc (dict): The book document.
     """
-    results = requests.get(url=BOOK_API, params=params, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success! You have accessed {BOOK_API}.")
-        results_json = results.json()
-        books = []
-        total_books = results_json["total"]
-        for i in range(total_books):
-            book = Book(
-                id=results_json["docs"][i]["_id"],
-                name=results_json["docs"][i]["name"]
-            )
-            books.append(book)
+    return Book(
+        doc.get("_id"),
+        doc.get("name"),
+        doc.get("chapters", [])
+    )
+
+
+def hydrate_books(books: List[Book], max_workers: int = 1) -> List[Book]:
+    """
+    A function that returns copies of a list of Books with their chapters
+    filled with Chapter objects. Every chapter comes from one
+    get_all_chapters pull and is grouped by its book id locally, instead
+    of one get_chapters_by_book_id call per book. Each Chapter is a copy
+    whose book_obj is set to its Book. The Books and Chapters passed in and
+    held by the id caches are shared, so they are left as they are.
+
+    Arguments
+    ----------
+    books (list): The Books to hydrate.
+    max_workers (int): The number of threads used to fetch the pages of chapters.
+    """
+    if not books:
         return books
+    # chapters is only imported when books are hydrated
+    if __package__:
+        from .chapters import get_all_chapters
     else:
-        logging.error(f"Status {results.status_code}. Failed to get books.")
-        return []
+        from chapters import get_all_chapters
+    ids = list(dict.fromkeys(book.id for book in books))
+    # a few books are filtered on, otherwise every chapter is pulled
+    params = {"book": ",".join(ids)} if len(ids) <= IDS_PER_PULL else {}
+    by_book = {id: [] for id in ids}
+    for chapter in get_all_chapters(params, max_workers):
+        if chapter.book in by_book:
+            by_book[chapter.book].append(chapter)
+    hydrated = []
+    for book in books:
+        book = copy.copy(book)
+        book.chapters = [copy.copy(chapter) for chapter in by_book[book.id]]
+        for chapter in book.chapters:
+            chapter.book_obj = book
+        hydrated.append(book)
+    return hydrated
+
+
+def get_all_books(params:dict = {}, max_workers: int = 1, report: PaginationReport = None, columnar: bool = False,
+                  limit: int = None, chapters: bool = False) -> List:
+    """
+    A function that returns a list of all books, following every page.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with per-page latency and total wall time.
+    columnar (bool): Whether to return a ColumnarResult with one column per Book field.
+        Without chapters, the columns are built straight from the documents, so the Books are not cached or held.
+    limit (int): The number of books per page, a larger limit needs fewer requests.
+    chapters (bool): Whether to fill every Book's chapters with its Chapter objects, see hydrate_books.
+    """
+    status_code, docs = get_all_docs(BOOK_API, params, max_workers, report, limit)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", BOOK_API)
+        if columnar and not chapters:
+            return docs_to_columns(docs, Book)
+        books = from_docs(docs, Book, book_from_doc)
+        ID_CACHE.put_many(books)
+        if is_complete(params):
+            hold("book", books)
+        if chapters:
+            books = hydrate_books(books, max_workers)
+        return to_columns(books, Book) if columnar else books
+    else:
+        logger.error("Status %s. Failed to get books.", status_code)
+        return to_columns([], Book) if columnar else []
 
 
 def get_book_by_id(id:str = "") -> Book:
@@ -70,19 +147,19 @@ def get_book_by_id(id:str = "") -> Book:
     ----------
     id (str): The id of the Book
     """
+    cached = ID_CACHE.get(id)
+    if cached is not None:
+        return cached
     book_api_id = f"{BOOK_API}{id}"
-    results = requests.get(url=book_api_id, headers=AUTH_HEADER)
+    results = get_client().get(book_api_id)
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {book_api_id}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Book(
-            results_json.get("_id"),
-            results_json.get("name"),
-            results_json.get("chapters")
-        )
+        logger.info("Success! You have accessed %s.", book_api_id)
+        results_json = decode(results)
+        book = book_from_doc(results_json["docs"][0])
+        ID_CACHE.put(book.id, book)
+        return book
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Chapter from id {id}.")
+        logger.error("Failed with Status Code %s. Failed to get Chapter from id %s.", results.status_code, id)
         return None
 
 
@@ -95,25 +172,29 @@ def get_chapters_by_book_id(id: str = "") -> List:
     ----------
     id (str): The id of the Book
     """
+    # chapters is only imported by the callers of this function
+    if __package__:
+        from .chapters import Chapter
+    else:
+        from chapters import Chapter
     book_chapters_api = f"{BOOK_API}{id}/chapter"
-    results = requests.get(url=book_chapters_api, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success Status {results.status_code}! You have accessed {book_chapters_api}.")
+    status_code, docs = get_all_docs(book_chapters_api)
+    if status_code == 200:
+        logger.info("Success Status %s! You have accessed %s.", status_code, book_chapters_api)
         chapters = []
-        results_json = results.json()
-        total_chapters = results_json["total"]
-        for chapter in results_json["docs"]:
+        for chapter in docs:
+            # the nested endpoint leaves out the book of its chapters
             chapters.append(
                             Chapter(
                                 chapter.get("_id"),
-                                chapter.get("chapterName")
+                                chapter.get("chapterName"),
+                                chapter.get("book", id)
                             )
                         )
-            # logging.info(f'{chapter}')
-        logging.info(f"Success! You have accessed {total_chapters} chapters at {book_chapters_api}.")
+        logger.info("Success! You have accessed %s chapters at %s.", len(chapters), book_chapters_api)
         return chapters
     else:
-        logging.error(f"Status {results.status_code}. Failed to get chapters for {book_chapters_api}.")
+        logger.error("Status %s. Failed to get chapters for %s.", status_code, book_chapters_api)
         return []
 
 
@@ -125,55 +206,54 @@ def get_book_by_name(name:str = "") -> Book:
     ----------
     name (str): The name of the Book
     """
-    results = requests.get(url=BOOK_API, params={"name": name}, headers=AUTH_HEADER)
+    results = get_client().get(BOOK_API, params={"name": name})
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {BOOK_API}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Book(
-            results_json.get("_id"),
-            results_json.get("name"),
-            results_json.get("chapters")
-        )
+        logger.info("Success! You have accessed %s.", BOOK_API)
+        results_json = decode(results)
+        return book_from_doc(results_json["docs"][0])
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Book from {name}.")
+        logger.error("Failed with Status Code %s. Failed to get Book from %s.", results.status_code, name)
         return None
 
 
-def get_sorted_books(sort_by:str, sort_type: str) -> List:
+def get_sorted_books(sort_by:str, sort_type: str = "asc", limit: int = None) -> List:
     """
     A function that receives an argument to sort by (i.e. _id, name)
     and a sort type (i.e. asc: ascending, desc: descending)
 
+    Several keys can be given with their own direction (i.e. name:asc,_id:desc),
+    sort_type being the direction of the keys without one. The held collection
+    is sorted locally, and fetched once when it isn't held, see sorting.sort.
+    Like the API, missing values come first in ascending sorts and last in descending ones.
+
     Arguments
     ----------
     sort_by (str): The Book argument to sort by (_id, name)
     sort_type (str): The sort type (asc: ascending, desc: descending)
+    limit (int): The number of Books to return, the first ones of the sort. All by default.
     """
-    # check if correct sort_by and sort_type have been passed:
-    if sort_by != "_id" and sort_by != "name":
-        logging.error(f"{sort_by} is not a valid argument. Valid options: _id, name")
-        return []
-    if sort_type != "asc" and sort_type != "desc":
-        logging.error(f"{sort_type} is not a valid argument. Valid options: asc, desc")
+    try:
+        keys = parse_sort(sort_by, sort_type)
+    except ValueError as e:
+        logger.error("%s", e)
         return []
+    for field, _ in keys:
+        if field not in SORT_FIELDS:
+            logger.error("%s is not a valid argument. Valid options: %s", field, ", ".join(SORT_FIELDS))
+            return []
 
-    params = {"sort": sort_by+":"+sort_type}
-    logging.info(params)
-    results = get_all_books(params)
-    return results
+    return sort("book", keys, limit)
 
 
 
 def get_book_by_regex(book_arg: str, regex: str) -> List:
     """
     A function that receives a Book argument and matches to a regex expression.
+    The whole collection is matched locally once get_all_books() fetched it, see filters.find.
 
     Arguments
     ----------
     book_arg (str): The Book class argument to match by (i.e. id, name).
     regex (str): The regex expression used to match with.
     """
-    params = {book_arg: regex}
-    results = get_all_books(params)
-    return results
\ No newline at end of file
+    return find("book", {book_arg: regex})
\ No newline at end of file
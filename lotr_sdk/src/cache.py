@@ -0,0 +1,270 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict
+import threading
+import json
+import time
+import os
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "lotr_sdk", "cache.sqlite3")
+DEFAULT_TTL = 24*60*60
+DEFAULT_MAX_SIZE = 100*1024*1024
+RESOURCES = ("book", "chapter", "character", "movie", "quote")
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass
+class CacheEntry():
+    """
+    A class to represent a cached response.
+
+    Attributes
+    ----------
+    key (str): The cache key of the response (url plus params).
+    url (str): The url of the response.
+    resource (str): The resource of the url (i.e. character, quote).
+    body (bytes): The body of the response.
+    headers (dict): The headers of the response.
+    etag (str): The ETag sent by the server, if any.
+    last_modified (str): The Last-Modified date sent by the server, if any.
+    stored_at (float): The time the response was last fetched or revalidated.
+    """
+    key: str = ""
+    url: str = ""
+    resource: str = ""
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = None
+    last_modified: str = None
+    stored_at: float = 0
+
+    def to_response(self) -> "requests.Response":
+        """
+        A function that rebuilds a requests Response from the entry.
+        """
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+        response = Response()
+        response.status_code = 200
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = "utf-8"
+        response._content = self.body
+        response.from_cache = True
+        return response
+
+
+def resource_of(url: str) -> str:
+    """
+    A function that returns the resource a url belongs to (i.e. character, quote),
+    or an empty string if it is not a resource url.
+
+    Arguments
+    ----------
+    url (str): The url of the request.
+    """
+    for segment in url.split("?")[0].split("/"):
+        if segment in RESOURCES:
+            return segment
+    return ""
+
+
+class DiskCache():
+    """
+    A class that stores API responses on disk in a sqlite database, keyed
+    on url plus params. Entries expire after a per-resource time to live
+    and the least recently used entries are evicted once the bodies
+    exceed max_size bytes.
+
+    Attributes
+    ----------
+    path (str): The path of the sqlite database.
+    ttl (dict): The time to live in seconds of each resource (i.e. {"quote": 3600}).
+    default_ttl (float): The time to live in seconds of resources missing from ttl.
+    max_size (int): The maximum total size in bytes of the cached bodies.
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: dict = None, default_ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path
+        self.ttl = dict(ttl or {})
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # sqlite3 is only needed once a cache is created
+        import sqlite3
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, url TEXT, resource TEXT, body BLOB, headers TEXT, "
+            "etag TEXT, last_modified TEXT, stored_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def key(url: str, params: dict = None) -> str:
+        """
+        A function that returns the cache key of a url plus params.
+
+        Arguments
+        ----------
+        url (str): The url of the request.
+        params (dict): A dictionary of parameters sent in the API call.
+        """
+        import hashlib
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, url: str, params: dict = None) -> CacheEntry:
+        """
+        A function that returns the cached entry of a url plus params, or None.
+
+        Arguments
+        ----------
+        url (str): The url of the request.
+        params (dict): A dictionary of parameters sent in the API call.
+        """
+        key = self.key(url, params)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, resource, body, headers, etag, last_modified, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return CacheEntry(key, row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """
+        A function that checks if an entry is younger than its resource's time to live.
+
+        Arguments
+        ----------
+        entry (CacheEntry): The cached entry.
+        """
+        ttl = self.ttl.get(entry.resource, self.default_ttl)
+        fresh = time.time() - entry.stored_at < ttl
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return fresh
+
+    def validators(self, entry: CacheEntry) -> Dict[str, str]:
+        """
+        A function that returns the conditional request headers of an entry.
+
+        Arguments
+        ----------
+        entry (CacheEntry): The cached entry.
+        """
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, entry: CacheEntry):
+        """
+        A function that marks an entry as fresh after the server answered 304 Not Modified.
+
+        Arguments
+        ----------
+        entry (CacheEntry): The cached entry.
+        """
+        entry.stored_at = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._db.execute("UPDATE entries SET stored_at = ? WHERE key = ?", (entry.stored_at, entry.key))
+            self._db.commit()
+
+    def put(self, url: str, params: dict, response: "requests.Response"):
+        """
+        A function that stores a 200 response and evicts the least recently used
+        entries if the cache grows past max_size.
+
+        Arguments
+        ----------
+        url (str): The url of the request.
+        params (dict): A dictionary of parameters sent in the API call.
+        response (Response): The response to store.
+        """
+        self.put_body(url, params, response.content, response.headers)
+
+    def put_body(self, url: str, params: dict, body: bytes, headers):
+        """
+        A function that stores the body and headers of a 200 response, for
+        clients other than requests (i.e. aio.AsyncClient).
+
+        Arguments
+        ----------
+        url (str): The url of the request.
+        params (dict): A dictionary of parameters sent in the API call.
+        body (bytes): The body of the response.
+        headers (dict): The headers of the response, with case insensitive get (i.e. a CIMultiDict).
+        """
+        now = time.time()
+        stored_headers = {"Content-Type": headers.get("Content-Type", "application/json")}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(url, params), url, resource_of(url), body, json.dumps(stored_headers),
+                 headers.get("ETag"), headers.get("Last-Modified"), now, now, len(body))
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """
+        A function that deletes the least recently used entries until the cache fits in max_size.
+        """
+        size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if size <= self.max_size:
+            return
+        for key, entry_size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+            if size <= self.max_size:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            size -= entry_size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        A function that returns the hit, miss, revalidation and eviction counters
+        and the number and size of the stored entries.
+        """
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size": size,
+        }
+
+    def clear(self):
+        """
+        A function that deletes every entry.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        """
+        A function that closes the database.
+        """
+        with self._lock:
+            self._db.close()
@@ -1,22 +1,38 @@
 from dataclasses import dataclass
-from typing import List
-import requests
-import logging
-
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s',
-    filename='lotr_sdk.log',
-    level=logging.INFO
-    )
+from typing import Iterator, List
+if __package__:
+    from .client import get_client
+    from .columnar import docs_to_columns, to_columns
+    from .decoding import decode, from_docs
+    from .filters import find, hold, is_complete
+    from .memo import id_cache
+    from .pagination import PaginationReport, get_all_docs, iter_pages
+    from .sdk_logging import get_logger
+    from .sorting import parse_sort, sort
+else:
+    from client import get_client
+    from columnar import docs_to_columns, to_columns
+    from decoding import decode, from_docs
+    from filters import find, hold, is_complete
+    from memo import id_cache
+    from pagination import PaginationReport, get_all_docs, iter_pages
+    from sdk_logging import get_logger
+    from sorting import parse_sort, sort
+
+logger = get_logger(__name__)
 
 # Import api and header
 try:
-    from settings import API, AUTH_HEADER
+    if __package__:
+        from .settings import API
+    else:
+        from settings import API
 except ImportError as e:
-    logging.exception(e)
+    logger.exception(e)
 
 CHAPTER_API = f"{API}chapter/"
+ID_CACHE = id_cache("chapter")
+SORT_FIELDS = ("_id", "chapterName", "book")
 
 
 @dataclass
@@ -29,10 +45,28 @@ class Chapter():
     id (str): The id of the chapter.
     chapterName (str): The name of the chapter.
     book (str): The id of the book that the chapter belongs to.
+    book_obj (Book): The book that the chapter belongs to, set by books.hydrate_books.
     """
     id: str = ""
     chapterName: str = ""
     book: str = ""
+    # not a dataclass field, so records, columns and comparisons only see the id
+    book_obj = None
+
+
+def chapter_from_doc(doc: dict) -> Chapter:
+    """
+    A function that receives a chapter document from the API and returns a Chapter object.
+
+    Arguments
+    ----------
+    doc (dict): The chapter document.
+    """
+    return Chapter(
+        doc.get("_id"),
+        doc.get("chapterName"),
+        doc.get("book")
+    )
 
 
 def get_chapter_by_id(id:str = "") -> Chapter:
@@ -43,19 +77,19 @@ def get_chapter_by_id(id:str = "") -> Chapter:
     ----------
     id (str): The id of the Chapter
     """
+    cached = ID_CACHE.get(id)
+    if cached is not None:
+        return cached
     chapter_api_id = CHAPTER_API+id 
-    results = requests.get(url=chapter_api_id, headers=AUTH_HEADER)
+    results = get_client().get(chapter_api_id)
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {chapter_api_id}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Chapter(
-            results_json.get("_id"),
-            results_json.get("chapterName"),
-            results_json.get("book")
-        )
+        logger.info("Success! You have accessed %s.", chapter_api_id)
+        results_json = decode(results)
+        chapter = chapter_from_doc(results_json["docs"][0])
+        ID_CACHE.put(chapter.id, chapter)
+        return chapter
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Chapter from id {id}.")
+        logger.error("Failed with Status Code %s. Failed to get Chapter from id %s.", results.status_code, id)
         return None
 
 
@@ -67,100 +101,100 @@ def get_chapter_by_name(name:str = "") -> Chapter:
     ----------
     name (str): The chapterName of the Chapter
     """
-    results = requests.get(url=CHAPTER_API, params={"chapterName": name}, headers=AUTH_HEADER)
+    results = get_client().get(CHAPTER_API, params={"chapterName": name})
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {CHAPTER_API}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Chapter(
-            results_json.get("_id"),
-            results_json.get("chapterName"),
-            results_json.get("book")
-        )
+        logger.info("Success! You have accessed %s.", CHAPTER_API)
+        results_json = decode(results)
+        return chapter_from_doc(results_json["docs"][0])
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Chapter from chapterName {name}.")
+        logger.error("Failed with Status Code %s. Failed to get Chapter from chapterName %s.", results.status_code, name)
         return None
 
 
-def get_all_chapters(params:dict = {}) -> List:
+def get_all_chapters(params:dict = {}, max_workers: int = 1, report: PaginationReport = None, columnar: bool = False,
+                     limit: int = None) -> List:
     """
-    A function that returns a list of all chapters.
+    A function that returns a list of all chapters, following every page.
 
     Arguments
     ----------
     params (dict): A dictionary of parameters sent in the API call.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with per-page latency and total wall time.
+    columnar (bool): Whether to return a ColumnarResult with one column per Chapter field.
+        The columns are built straight from the documents, so the Chapters are not cached or held.
+    limit (int): The number of chapters per page, a larger limit needs fewer requests.
     """
-    results = requests.get(url=CHAPTER_API, params=params, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success! You have accessed {CHAPTER_API}.")
-        results_json = results.json()
-        chapters = []
-        for chapter in results_json["docs"]:
-            chapters.append(
-                Chapter(
-                    chapter.get("_id"),
-                    chapter.get("chapterName"),
-                    chapter.get("book")
-                )
-            )
-        # check for more pages to load
-        pages = results_json["pages"]
-        # if there are more than 1 page of chapters, pull the rest of the pages
-        if pages > 1:
-            for page in range(2,pages+1):
-                addl_results = requests.get(CHAPTER_API,params={"page": page}, headers=AUTH_HEADER)
-                if addl_results.status_code == 200:
-                    logging.info(f"Success! You have accessed {CHAPTER_API} page {page}.")
-                    results_json = addl_results.json()
-                    for chapter in results_json["docs"]:
-                        chapters.append(
-                            Chapter(
-                                chapter.get("_id"),
-                                chapter.get("chapterName"),
-                                chapter.get("book")
-                            )
-                        )
-                else:
-                    logging.error(f"Status {addl_results.status_code}. Failed to get chapters page {page}.")
+    status_code, docs = get_all_docs(CHAPTER_API, params, max_workers, report, limit)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", CHAPTER_API)
+        if columnar:
+            return docs_to_columns(docs, Chapter)
+        chapters = from_docs(docs, Chapter, chapter_from_doc)
+        ID_CACHE.put_many(chapters)
+        if is_complete(params):
+            hold("chapter", chapters)
         return chapters
     else:
-        logging.error(f"Status {results.status_code}. Failed to get chapters.")
-        return []
+        logger.error("Status %s. Failed to get chapters.", status_code)
+        return to_columns([], Chapter) if columnar else []
+
 
+def iter_chapters(params: dict = {}, prefetch: bool = False, limit: int = None) -> Iterator[Chapter]:
+    """
+    A generator that yields Chapter objects page by page, as soon as each
+    page is parsed, instead of building the whole list first.
 
-def get_sorted_chapters(sort_by:str, sort_type: str) -> List:
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    prefetch (bool): Whether to fetch the next page in the background.
+    limit (int): The number of chapters per page.
+    """
+    for docs in iter_pages(CHAPTER_API, params, prefetch, limit):
+        chapters = from_docs(docs, Chapter, chapter_from_doc)
+        ID_CACHE.put_many(chapters)
+        yield from chapters
+
+
+def get_sorted_chapters(sort_by:str, sort_type: str = "asc", limit: int = None) -> List:
     """
     A function that receives an argument to sort by (i.e. _id, chapterName, book)
     and a sort type (i.e. asc: ascending, desc: descending)
 
+    Several keys can be given with their own direction (i.e. name:asc,_id:desc),
+    sort_type being the direction of the keys without one. The held collection
+    is sorted locally, and fetched once when it isn't held, see sorting.sort.
+    Like the API, missing values come first in ascending sorts and last in descending ones.
+
     Arguments
     ----------
     sort_by (str): The Chapter argument to sort by (_id, chapterName, book)
     sort_type (str): The sort type (asc: ascending, desc: descending)
+    limit (int): The number of Chapters to return, the first ones of the sort. All by default.
     """
-    # check if correct sort_by and sort_type have been passed:
-    if sort_by != "_id" and sort_by != "chapterName" and sort_by != "book":
-        logging.error(f"{sort_by} is not a valid argument. Valid options: _id, chapterName, book")
-        return []
-    if sort_type != "asc" and sort_type != "desc":
-        logging.error(f"{sort_type} is not a valid argument. Valid options: asc, desc")
+    try:
+        keys = parse_sort(sort_by, sort_type)
+    except ValueError as e:
+        logger.error("%s", e)
         return []
+    for field, _ in keys:
+        if field not in SORT_FIELDS:
+            logger.error("%s is not a valid argument. Valid options: %s", field, ", ".join(SORT_FIELDS))
+            return []
 
-    params = {"sort": sort_by+":"+sort_type}
-    results = get_all_chapters(params)
-    return results
+    return sort("chapter", keys, limit)
 
 
 def get_chapter_by_regex(chapter_arg: str, regex: str) -> List:
     """
     A function that receives a Chapter argument and matches to a regex expression.
+    The whole collection is matched locally once get_all_chapters() fetched it, see filters.find.
 
     Arguments
     ----------
     chapter_arg (str): The Chapter class argument to match by (i.e. id, chapterName, book).
     regex (str): The regex expression used to match with.
     """
-    params = {chapter_arg: regex}
-    results = get_all_chapters(params)
-    return results
+    return find("chapter", {chapter_arg: regex})
 
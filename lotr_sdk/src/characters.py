@@ -1,22 +1,40 @@
 from dataclasses import dataclass
-from typing import List
-import requests
-import logging
-
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s',
-    filename='lotr_sdk.log',
-    level=logging.INFO
-    )
+from typing import Iterator, List
+if __package__:
+    from .batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from .client import get_client
+    from .columnar import docs_to_columns, to_columns
+    from .decoding import decode, from_docs
+    from .filters import find, hold, is_complete
+    from .memo import id_cache
+    from .pagination import PaginationReport, get_all_docs, iter_pages
+    from .sdk_logging import get_logger
+    from .sorting import parse_sort, sort
+else:
+    from batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from client import get_client
+    from columnar import docs_to_columns, to_columns
+    from decoding import decode, from_docs
+    from filters import find, hold, is_complete
+    from memo import id_cache
+    from pagination import PaginationReport, get_all_docs, iter_pages
+    from sdk_logging import get_logger
+    from sorting import parse_sort, sort
+
+logger = get_logger(__name__)
 
 # Import api and header
 try:
-    from settings import API, AUTH_HEADER
+    if __package__:
+        from .settings import API
+    else:
+        from settings import API
 except ImportError as e:
-    logging.exception(e)
+    logger.exception(e)
 
 CHARACTER_API = f"{API}character/"
+ID_CACHE = id_cache("character")
+SORT_FIELDS = ("_id", "height", "race", "gender", "birth", "spouse", "death", "realm", "hair", "name")
 
 
 @dataclass
@@ -50,43 +68,73 @@ class Character():
     wikiUrl: str = ""
 
 
-def get_all_characters(params:dict = {}) -> List:
+def character_from_doc(doc: dict) -> Character:
+    """
+    A function that receives a character document from the API and returns a Character object.
+
+    Arguments
+    ----------
+    doc (dict): The character document.
+    """
+    return Character(
+        id=doc["_id"],
+        height=doc["height"],
+        race=doc["race"],
+        # at least one of the characters doesn't have a gender
+        gender=doc.get("gender", ""),
+        birth=doc["birth"],
+        spouse=doc["spouse"],
+        death=doc["death"],
+        realm=doc["realm"],
+        hair=doc["hair"],
+        name=doc["name"]
+    )
+
+
+def get_all_characters(params:dict = {}, max_workers: int = 1, report: PaginationReport = None, columnar: bool = False,
+                       limit: int = None) -> List:
     """
-    A function that returns a list of all characters.
+    A function that returns a list of all characters, following every page.
 
     Arguments
     ----------
     params (dict): A dictionary of parameters sent in the API call.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with per-page latency and total wall time.
+    columnar (bool): Whether to return a ColumnarResult with one column per Character field.
+        The columns are built straight from the documents, so the Characters are not cached or held.
+    limit (int): The number of characters per page, a larger limit needs fewer requests.
     """
-    results = requests.get(url=CHARACTER_API, params=params, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success! You have accessed {CHARACTER_API}.")
-        results_json = results.json()
-        characters = []
-        total_characters = results_json["total"]
-        for i in range(total_characters):
-            # at least one of the characters doesn't have a gender
-            try:
-                gender_char = results_json["docs"][i]["gender"]
-            except:
-                gender_char = ""
-            char = Character(
-                id=results_json["docs"][i]["_id"],
-                height=results_json["docs"][i]["height"],
-                race=results_json["docs"][i]["race"],
-                gender=gender_char, 
-                birth=results_json["docs"][i]["birth"],
-                spouse=results_json["docs"][i]["spouse"],
-                death=results_json["docs"][i]["death"],
-                realm=results_json["docs"][i]["realm"],
-                hair=results_json["docs"][i]["hair"],
-                name=results_json["docs"][i]["name"]
-            )
-            characters.append(char)
+    status_code, docs = get_all_docs(CHARACTER_API, params, max_workers, report, limit)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", CHARACTER_API)
+        if columnar:
+            return docs_to_columns(docs, Character)
+        characters = from_docs(docs, Character, character_from_doc)
+        ID_CACHE.put_many(characters)
+        if is_complete(params):
+            hold("character", characters)
         return characters
     else:
-        logging.error(f"Status {results.status_code}. Failed to get characters.")
-        return []
+        logger.error("Status %s. Failed to get characters.", status_code)
+        return to_columns([], Character) if columnar else []
+
+
+def iter_characters(params: dict = {}, prefetch: bool = False, limit: int = None) -> Iterator[Character]:
+    """
+    A generator that yields Character objects page by page, as soon as each
+    page is parsed, instead of building the whole list first.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    prefetch (bool): Whether to fetch the next page in the background.
+    limit (int): The number of characters per page.
+    """
+    for docs in iter_pages(CHARACTER_API, params, prefetch, limit):
+        characters = from_docs(docs, Character, character_from_doc)
+        ID_CACHE.put_many(characters)
+        yield from characters
 
 
 def get_character_by_id(id:str = "") -> Character:
@@ -97,34 +145,37 @@ def get_character_by_id(id:str = "") -> Character:
     ----------
     id (str): The id of the Character
     """
+    cached = ID_CACHE.get(id)
+    if cached is not None:
+        return cached
     char_api_id = f"{CHARACTER_API}{id}"
-    results = requests.get(url=char_api_id, headers=AUTH_HEADER)
+    results = get_client().get(char_api_id)
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {char_api_id}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        # at least one of the characters doesn't have a gender
-        try:
-            gender_char = results_json["gender"]
-        except:
-            gender_char = ""
-        return Character(
-            id=results_json["_id"],
-            height=results_json["height"],
-            race=results_json["race"],
-            gender=gender_char, 
-            birth=results_json["birth"],
-            spouse=results_json["spouse"],
-            death=results_json["death"],
-            realm=results_json["realm"],
-            hair=results_json["hair"],
-            name=results_json["name"]
-        )
+        logger.info("Success! You have accessed %s.", char_api_id)
+        results_json = decode(results)
+        character = character_from_doc(results_json["docs"][0])
+        ID_CACHE.put(character.id, character)
+        return character
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Character from id {id}.")
+        logger.error("Failed with Status Code %s. Failed to get Character from id %s.", results.status_code, id)
         return None
 
 
+def get_characters_by_ids(ids: List[str], max_workers: int = DEFAULT_MAX_WORKERS) -> List:
+    """
+    A function that receives a list of Character ids and returns a list of Character
+    objects in the same order, with None for ids that were not found.
+    Duplicate ids are fetched once, cached Characters are not fetched again and
+    the rest are pulled with as few requests as possible.
+
+    Arguments
+    ----------
+    ids (list): The ids of the Characters
+    max_workers (int): The number of threads used for the requests.
+    """
+    return get_by_ids(ids, ID_CACHE, get_all_characters, get_character_by_id, max_workers)
+
+
 def get_character_by_name(name:str = "") -> Character:
     """
     A function that receives a Character name and returns a Character object.
@@ -133,62 +184,51 @@ def get_character_by_name(name:str = "") -> Character:
     ----------
     name (str): The name of the Character
     """
-    results = requests.get(url=CHARACTER_API, params={"name": name}, headers=AUTH_HEADER)
+    results = get_client().get(CHARACTER_API, params={"name": name})
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {CHARACTER_API}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        # at least one of the characters doesn't have a gender
-        try:
-            gender_char = results_json["gender"]
-        except:
-            gender_char = ""
-        return Character(
-            id=results_json["_id"],
-            height=results_json["height"],
-            race=results_json["race"],
-            gender=gender_char, 
-            birth=results_json["birth"],
-            spouse=results_json["spouse"],
-            death=results_json["death"],
-            realm=results_json["realm"],
-            hair=results_json["hair"],
-            name=results_json["name"]
-        )
+        logger.info("Success! You have accessed %s.", CHARACTER_API)
+        results_json = decode(results)
+        return character_from_doc(results_json["docs"][0])
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Character from {name}.")
+        logger.error("Failed with Status Code %s. Failed to get Character from %s.", results.status_code, name)
         return None
 
 
-def get_sorted_characters(sort_by:str, sort_type: str) -> List:
+def get_sorted_characters(sort_by:str, sort_type: str = "asc", limit: int = None) -> List:
     """
     A function that receives an argument to sort by (i.e. id, height,
     race, gender, birth, spouse, death, realm, hair, name) and a 
     sort type (i.e. asc: ascending, desc: descending)
 
+    Several keys can be given with their own direction (i.e. name:asc,_id:desc),
+    sort_type being the direction of the keys without one. The held collection
+    is sorted locally, and fetched once when it isn't held, see sorting.sort.
+    Like the API, missing values come first in ascending sorts and last in descending ones.
+
     Arguments
     ----------
     sort_by (str): The Character argument to sort by (i.e. id, height,
     race, gender, birth, spouse, death, realm, hair, name)
     sort_type (str): The sort type (asc: ascending, desc: descending)
+    limit (int): The number of Characters to return, the first ones of the sort. All by default.
     """
-    # check if correct sort_by and sort_type have been passed:
-    if sort_by != "_id" and sort_by != "height" and sort_by != "race" and sort_by != "gender" and sort_by != "birth" and sort_by != "spouse" and sort_by != "death" and sort_by != "realm" and sort_by != "hair" and sort_by != "name":
-        logging.error(f"{sort_by} is not a valid argument. Valid options: _id, height, race, gender, birth, spouse, death, realm, hair, name")
-        return []
-    if sort_type != "asc" and sort_type != "desc":
-        logging.error(f"{sort_type} is not a valid argument. Valid options: asc, desc")
+    try:
+        keys = parse_sort(sort_by, sort_type)
+    except ValueError as e:
+        logger.error("%s", e)
         return []
+    for field, _ in keys:
+        if field not in SORT_FIELDS:
+            logger.error("%s is not a valid argument. Valid options: %s", field, ", ".join(SORT_FIELDS))
+            return []
 
-    params = {"sort": sort_by+":"+sort_type}
-    logging.info(params)
-    results = get_all_characters(params)
-    return results
+    return sort("character", keys, limit)
 
 
 def get_character_by_regex(char_arg: str, regex: str) -> List:
     """
     A function that receives a Character argument and matches to a regex expression.
+    The whole collection is matched locally once get_all_characters() fetched it, see filters.find.
 
     Arguments
     ----------
@@ -196,6 +236,4 @@ def get_character_by_regex(char_arg: str, regex: str) -> List:
     race, gender, birth, spouse, death, realm, hair, name).
     regex (str): The regex expression used to match with.
     """
-    params = {char_arg: regex}
-    results = get_all_characters(params)
-    return results
\ No newline at end of file
+    return find("character", {char_arg: regex})
\ No newline at end of file
@@ -0,0 +1,262 @@
+from typing import TYPE_CHECKING, Dict
+if __package__:
+    from .cache import DiskCache, resource_of
+    from .events import RequestEvent, connection_timings, emit, hooks, page_of, reset_timings
+    from .ratelimit import RateLimiter, retry_delay
+    from .sdk_logging import get_logger
+    from .singleflight import SingleFlight
+else:
+    from cache import DiskCache, resource_of
+    from events import RequestEvent, connection_timings, emit, hooks, page_of, reset_timings
+    from ratelimit import RateLimiter, retry_delay
+    from sdk_logging import get_logger
+    from singleflight import SingleFlight
+import threading
+import time
+
+logger = get_logger(__name__)
+
+# Import api and header
+try:
+    if __package__:
+        from .settings import API, AUTH_HEADER
+    else:
+        from settings import API, AUTH_HEADER
+except ImportError as e:
+    logger.exception(e)
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+
+
+def rebase(url: str, api: str) -> str:
+    """
+    A function that points a url built on settings.API at another base url,
+    so that a client can be configured against a different server.
+
+    Arguments
+    ----------
+    url (str): The url to rebase.
+    api (str): The base url to use instead of settings.API.
+    """
+    if api != API and url.startswith(API):
+        return api + url[len(API):]
+    return url
+
+
+class Client():
+    """
+    A class that owns a keep-alive connection pool to The One API.
+    Every resource module sends its requests through a shared Client
+    so that TCP and TLS handshakes are reused between calls.
+
+    Attributes
+    ----------
+    api (str): The base url of the API.
+    headers (dict): The headers sent with every request.
+    pool_size (int): The maximum number of connections kept alive per host.
+    cache (DiskCache): An optional on-disk cache of the responses.
+    rate_limiter (RateLimiter): An optional token bucket every request waits on.
+    max_retries (int): The number of times a 429 response is retried.
+    single_flight (SingleFlight): Shares one request between concurrent identical calls, None when coalesce is False.
+    """
+    def __init__(self, api: str = API, headers: dict = AUTH_HEADER, pool_size: int = DEFAULT_POOL_SIZE, cache: DiskCache = None,
+                 rate_limiter: RateLimiter = None, max_retries: int = DEFAULT_MAX_RETRIES, coalesce: bool = True):
+        self.api = api
+        self.headers = dict(headers)
+        self.pool_size = pool_size
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.single_flight = SingleFlight() if coalesce else None
+        self.retries = 0
+        self.backoff_time = 0
+        self._stats_lock = threading.Lock()
+        # requests is imported with the first client rather than with the SDK
+        import requests
+        if __package__:
+            from .transport import TimedHTTPAdapter
+        else:
+            from transport import TimedHTTPAdapter
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._adapter = TimedHTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+    def get(self, url: str, params: dict = None, headers: dict = None) -> "requests.Response":
+        """
+        A function that sends a GET request over the pooled session. With a
+        cache, fresh responses are served from disk and stale responses
+        are revalidated with a conditional request when the server sent
+        an ETag or Last-Modified header. Requests sent with headers (i.e. a
+        conditional If-None-Match) always go to the server. When hooks are
+        registered (see events.add_hook), each of them receives a RequestEvent
+        afterwards. Concurrent calls with the same url, params and headers
+        share one request and its response, and their events are marked as coalesced.
+
+        Arguments
+        ----------
+        url (str): The url to request.
+        params (dict): A dictionary of parameters sent in the API call.
+        headers (dict): Headers sent with this request on top of the Client's headers.
+        """
+        url = rebase(url, self.api)
+        if self.single_flight is None:
+            return self._observe(url, params, headers)
+        start = time.perf_counter()
+        key = (
+            url,
+            tuple(sorted((name, str(value)) for name, value in params.items())) if params else (),
+            tuple(sorted(headers.items())) if headers else (),
+        )
+        results, coalesced = self.single_flight.do(key, lambda: self._observe(url, params, headers))
+        if coalesced and hooks():
+            emit(RequestEvent(url=url, resource=resource_of(url), page=page_of(url, params), status=results.status_code,
+                              total_time=time.perf_counter() - start, coalesced=True))
+        return results
+
+    def _observe(self, url: str, params: dict = None, headers: dict = None) -> "requests.Response":
+        """
+        A function that answers a request and passes its RequestEvent to the hooks.
+        """
+        if not hooks():
+            return self._get(url, params, headers)
+        event = RequestEvent(url=url, resource=resource_of(url), page=page_of(url, params))
+        start = time.perf_counter()
+        try:
+            results = self._get(url, params, headers, event)
+        except Exception:
+            event.total_time = time.perf_counter() - start
+            emit(event)
+            raise
+        event.total_time = time.perf_counter() - start
+        event.status = results.status_code
+        event.bytes = len(results.content)
+        emit(event)
+        return results
+
+    def _get(self, url: str, params: dict = None, headers: dict = None, event: RequestEvent = None) -> "requests.Response":
+        """
+        A function that answers a request from the cache or the server.
+        Requests with their own headers (i.e. If-None-Match) skip the cache.
+        """
+        if self.cache is None or headers:
+            return self._send(url, params, headers, event)
+        entry = self.cache.get(url, params)
+        if entry is not None and self.cache.is_fresh(entry):
+            if event is not None:
+                event.cache = "hit"
+            return entry.to_response()
+        if event is not None:
+            event.cache = "miss"
+        headers = self.cache.validators(entry) if entry is not None else None
+        results = self._send(url, params, headers, event)
+        if results.status_code == 304 and entry is not None:
+            self.cache.revalidated(entry)
+            if event is not None:
+                event.cache = "revalidated"
+            return entry.to_response()
+        if results.status_code == 200:
+            self.cache.put(url, params, results)
+        return results
+
+    def _send(self, url: str, params: dict = None, headers: dict = None, event: RequestEvent = None) -> "requests.Response":
+        """
+        A function that sends a request once the rate limiter allows it and
+        retries 429 responses, honoring Retry-After or backing off exponentially
+        with jitter. The connection timings of every attempt are added to event.
+        """
+        for attempt in range(self.max_retries+1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            reset_timings()
+            results = self.session.get(url, params=params, headers=headers)
+            if event is not None:
+                dns_time, connect_time = connection_timings()
+                event.dns_time += dns_time
+                event.connect_time += connect_time
+                event.ttfb = results.elapsed.total_seconds()
+                event.retries = attempt
+            if results.status_code != 429 or attempt == self.max_retries:
+                return results
+            delay = retry_delay(attempt, results.headers.get("Retry-After"))
+            logger.warning("Status 429 from %s. Retrying in %.2f seconds.", url, delay)
+            with self._stats_lock:
+                self.retries += 1
+                self.backoff_time += delay
+            if self.rate_limiter is not None:
+                # the limiter makes every caller wait, including this one
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        """
+        A function that returns the connection counters of the pool (requests
+        sent, connections opened and reused), the 429 retries and the time
+        spent backing off, plus the rate limiter's throughput and throttled time
+        and the calls that shared a request in flight.
+        """
+        pools = self._adapter.poolmanager.pools
+        opened = 0
+        sent = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return {
+            "requests": sent,
+            "connections_opened": opened,
+            "connections_reused": max(sent - opened, 0),
+            "retries": self.retries,
+            "backoff_time": self.backoff_time,
+            **({"rate_limiter": self.rate_limiter.stats()} if self.rate_limiter is not None else {}),
+            **({"single_flight": self.single_flight.stats()} if self.single_flight is not None else {}),
+        }
+
+    def close(self):
+        """
+        A function that closes every pooled connection.
+        """
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Client:
+    """
+    A function that returns the shared Client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = Client()
+    return _client
+
+
+def configure(**kwargs) -> Client:
+    """
+    A function that replaces the shared Client with a new one built from
+    the given arguments (i.e. api, headers, pool_size, cache, rate_limiter, max_retries, coalesce).
+
+    Arguments
+    ----------
+    kwargs: The keyword arguments passed to Client.
+    """
+    global _client
+    with _client_lock:
+        old_client = _client
+        _client = Client(**kwargs)
+    if old_client is not None:
+        old_client.close()
+    return _client
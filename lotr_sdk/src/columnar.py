@@ -0,0 +1,310 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence
+import dataclasses
+import operator
+import sys
+
+NUMERIC_TYPES = (int, float)
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+AGGREGATES = ("sum", "mean", "min", "max", "count")
+
+_NOT_LOADED = object()
+_numpy_module = _NOT_LOADED
+
+
+def _numpy():
+    """
+    A function that returns the numpy module, imported on the first columnar
+    result rather than with the SDK, or None when it is not installed.
+    Columns then fall back to the standard library array module.
+    """
+    global _numpy_module
+    if _numpy_module is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
+
+
+def _is_array(value) -> bool:
+    # an ndarray can only exist once numpy was imported, so there is no need to import it here
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, (numpy.ndarray, numpy.generic))
+
+
+def _numeric_column(values: List, use_numpy: bool):
+    # numbers are stored as float64 since the API sends floats in fields typed as int
+    if use_numpy:
+        numpy = _numpy()
+        return numpy.array(values, dtype=numpy.float64)
+    return array("d", values)
+
+
+def _numbers(values: Iterable) -> List:
+    # missing numbers are nan, so that the column stays float64
+    return [value if value is not None else float("nan") for value in values]
+
+
+def _take(column, index: Sequence[int]):
+    """
+    A function that returns the values of a column at the given positions, keeping its type.
+    """
+    if _is_array(column):
+        numpy = _numpy()
+        return column[numpy.asarray(index, dtype=numpy.intp)]
+    if isinstance(column, array):
+        return array(column.typecode, (column[i] for i in index))
+    return [column[i] for i in index]
+
+
+class ColumnarResult():
+    """
+    A class that holds a list of model objects (i.e. Movie) as one column per
+    field. Numeric fields are typed float64 columns (NumPy arrays when NumPy is
+    installed, otherwise array.array) that can be filtered, sorted and
+    aggregated without building per-row objects.
+
+    Attributes
+    ----------
+    model (class): The model dataclass of the rows (i.e. Movie).
+    columns (dict): The column of each field.
+    """
+    def __init__(self, model, columns: Dict[str, Sequence]):
+        self.model = model
+        self.columns = columns
+        self._int_fields = {field.name for field in dataclasses.fields(model) if field.type is int}
+
+    @classmethod
+    def from_docs(cls, docs: Sequence[dict], model, keys: Dict[str, str] = None, use_numpy: bool = None) -> "ColumnarResult":
+        """
+        A function that builds the columns straight from API documents, one
+        column per field, without building a model object per row. Each field
+        is read from the key of the same name, and id from _id, unless keys
+        names another. A missing value is nan in numeric columns and the
+        field's default in the others.
+
+        Arguments
+        ----------
+        docs (list): The API documents (i.e. the docs of every page of /movie).
+        model (class): The model dataclass of the rows.
+        keys (dict): The document key of the fields not read from their own name (i.e. {"id": "id"}).
+        use_numpy (bool): Whether to store numeric columns as NumPy arrays. Defaults to True when NumPy is installed.
+        """
+        if use_numpy is None:
+            use_numpy = _numpy() is not None
+        keys = {"id": "_id", **(keys or {})}
+        columns = {}
+        for field in dataclasses.fields(model):
+            key = keys.get(field.name, field.name)
+            if field.type in NUMERIC_TYPES:
+                columns[field.name] = _numeric_column(_numbers(doc.get(key) for doc in docs), use_numpy)
+            elif field.default_factory is not dataclasses.MISSING:
+                factory = field.default_factory
+                columns[field.name] = [doc[key] if key in doc else factory() for doc in docs]
+            else:
+                default = field.default if field.default is not dataclasses.MISSING else None
+                columns[field.name] = [doc.get(key, default) for doc in docs]
+        return cls(model, columns)
+
+    @classmethod
+    def from_objects(cls, objects: Sequence, model, use_numpy: bool = None) -> "ColumnarResult":
+        """
+        A function that pivots a list of model objects the caller already has
+        into columns. Use from_docs to build columns from API documents.
+
+        Arguments
+        ----------
+        objects (list): The model objects (i.e. the result of get_all_movies()).
+        model (class): The model dataclass of the objects.
+        use_numpy (bool): Whether to store numeric columns as NumPy arrays. Defaults to True when NumPy is installed.
+        """
+        if use_numpy is None:
+            use_numpy = _numpy() is not None
+        columns = {}
+        for field in dataclasses.fields(model):
+            values = [getattr(obj, field.name) for obj in objects]
+            if field.type in NUMERIC_TYPES:
+                columns[field.name] = _numeric_column(_numbers(values), use_numpy)
+            else:
+                columns[field.name] = values
+        return cls(model, columns)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, field: str) -> Sequence:
+        return self.columns[field]
+
+    def __iter__(self) -> Iterator:
+        return (self.row(i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"ColumnarResult({self.model.__name__}, rows={len(self)}, columns={list(self.columns)})"
+
+    def row(self, i: int):
+        """
+        A function that materializes one row as a model object.
+
+        Arguments
+        ----------
+        i (int): The position of the row.
+        """
+        values = {}
+        for field, column in self.columns.items():
+            value = column[i]
+            if field in self._int_fields and float(value).is_integer():
+                value = int(value)
+            elif isinstance(value, float) or _is_array(value):
+                value = float(value)
+            values[field] = value
+        return self.model(**values)
+
+    def rows(self) -> List:
+        """
+        A function that materializes every row as a model object.
+        """
+        return list(self)
+
+    def take(self, index: Sequence[int]) -> "ColumnarResult":
+        """
+        A function that returns a new result with the rows at the given positions.
+
+        Arguments
+        ----------
+        index (list): The positions of the rows, in the order to keep them.
+        """
+        return ColumnarResult(self.model, {field: _take(column, index) for field, column in self.columns.items()})
+
+    def filter(self, mask: Sequence[bool]) -> "ColumnarResult":
+        """
+        A function that returns a new result with the rows where mask is True.
+
+        Arguments
+        ----------
+        mask (list): A boolean per row (i.e. the result of mask()).
+        """
+        if _is_array(mask):
+            return self.take(_numpy().flatnonzero(mask))
+        return self.take([i for i, keep in enumerate(mask) if keep])
+
+    def mask(self, field: str, op: str, value) -> Sequence[bool]:
+        """
+        A function that compares a column with a value and returns a boolean per row.
+
+        Arguments
+        ----------
+        field (str): The field to compare (i.e. budgetInMillions).
+        op (str): The comparison (<, <=, >, >=, ==, !=).
+        value: The value to compare with.
+        """
+        compare = OPERATORS[op]
+        column = self.columns[field]
+        if _is_array(column):
+            return compare(column, value)
+        return [compare(item, value) for item in column]
+
+    def where(self, field: str, op: str, value) -> "ColumnarResult":
+        """
+        A function that returns a new result with the rows where the comparison holds
+        (i.e. where("budgetInMillions", ">", 100)).
+
+        Arguments
+        ----------
+        field (str): The field to compare.
+        op (str): The comparison (<, <=, >, >=, ==, !=).
+        value: The value to compare with.
+        """
+        return self.filter(self.mask(field, op, value))
+
+    def sort(self, field: str, descending: bool = False) -> "ColumnarResult":
+        """
+        A function that returns a new result sorted by a field.
+
+        Arguments
+        ----------
+        field (str): The field to sort by.
+        descending (bool): Whether to sort from largest to smallest.
+        """
+        column = self.columns[field]
+        if _is_array(column):
+            index = _numpy().argsort(-column if descending else column, kind="stable")
+        else:
+            index = sorted(range(len(column)), key=column.__getitem__, reverse=descending)
+        return self.take(index)
+
+    def aggregate(self, field: str, func: str) -> float:
+        """
+        A function that aggregates a numeric column.
+
+        Arguments
+        ----------
+        field (str): The field to aggregate (i.e. boxOfficeRevenueInMillions).
+        func (str): The aggregate (sum, mean, min, max, count). Every aggregate but count is nan on an empty result.
+        """
+        if func not in AGGREGATES:
+            raise ValueError(f"{func} is not a valid aggregate. Valid options: {', '.join(AGGREGATES)}")
+        column = self.columns[field]
+        if func == "count":
+            return len(column)
+        if len(column) == 0:
+            return float("nan")
+        if _is_array(column):
+            return float(getattr(_numpy(), func)(column))
+        if func == "mean":
+            return sum(column)/len(column)
+        return float({"sum": sum, "min": min, "max": max}[func](column))
+
+    def to_numpy(self) -> Dict[str, "numpy.ndarray"]:
+        """
+        A function that returns the columns as a dictionary of NumPy arrays.
+        Numeric columns are shared with this result, not copied.
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError("to_numpy requires numpy. Install it with: pip install numpy")
+        arrays = {}
+        for field, column in self.columns.items():
+            if isinstance(column, numpy.ndarray):
+                arrays[field] = column
+            elif isinstance(column, array):
+                arrays[field] = numpy.frombuffer(column, dtype=numpy.float64)
+            else:
+                arrays[field] = numpy.array(column, dtype=object)
+        return arrays
+
+
+def to_columns(objects: Sequence, model, use_numpy: bool = None) -> ColumnarResult:
+    """
+    A function that pivots a list of model objects into a ColumnarResult.
+
+    Arguments
+    ----------
+    objects (list): The model objects (i.e. the result of get_all_movies()).
+    model (class): The model dataclass of the objects.
+    use_numpy (bool): Whether to store numeric columns as NumPy arrays.
+    """
+    return ColumnarResult.from_objects(objects, model, use_numpy)
+
+
+def docs_to_columns(docs: Sequence[dict], model, keys: Dict[str, str] = None, use_numpy: bool = None) -> ColumnarResult:
+    """
+    A function that builds a ColumnarResult straight from API documents,
+    see ColumnarResult.from_docs.
+
+    Arguments
+    ----------
+    docs (list): The API documents.
+    model (class): The model dataclass of the rows.
+    keys (dict): The document key of the fields not read from their own name.
+    use_numpy (bool): Whether to store numeric columns as NumPy arrays.
+    """
+    return ColumnarResult.from_docs(docs, model, keys, use_numpy)
@@ -0,0 +1,169 @@
+from importlib.util import find_spec
+from typing import Callable, Dict, List
+import dataclasses
+import json
+
+
+def _orjson_loads(data: bytes):
+    # orjson is imported with the first document parsed rather than with the SDK
+    global _loads
+    import orjson
+    BACKENDS["orjson"] = orjson.loads
+    if _loads is _orjson_loads:
+        _loads = orjson.loads
+    return orjson.loads(data)
+
+
+# orjson is optional, the standard library json module is used without it
+BACKENDS = {"json": json.loads}
+if find_spec("orjson") is not None:
+    BACKENDS["orjson"] = _orjson_loads
+DEFAULT_BACKEND = "orjson" if "orjson" in BACKENDS else "json"
+
+_loads = BACKENDS[DEFAULT_BACKEND]
+_backend = DEFAULT_BACKEND
+_lazy = False
+_lazy_models = {}
+
+
+def configure(backend: str = None, lazy: bool = None):
+    """
+    A function that sets the JSON parser used for every response and
+    whether list functions build their objects lazily.
+
+    Arguments
+    ----------
+    backend (str): The name of the parser (json or orjson).
+    lazy (bool): Whether objects are built from their document on first attribute access.
+    """
+    global _loads, _backend, _lazy
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"{backend} is not an available JSON backend. Valid options: {', '.join(BACKENDS)}")
+        _loads = BACKENDS[backend]
+        _backend = backend
+    if lazy is not None:
+        _lazy = lazy
+
+
+def backend() -> str:
+    """
+    A function that returns the name of the JSON parser in use.
+    """
+    return _backend
+
+
+def loads(data: bytes):
+    """
+    A function that parses a JSON document straight from its bytes.
+
+    Arguments
+    ----------
+    data (bytes): The JSON document.
+    """
+    return _loads(data)
+
+
+def decode(results):
+    """
+    A function that parses the body of a response without decoding it to text first.
+
+    Arguments
+    ----------
+    results (requests.Response): The response to parse.
+    """
+    return _loads(results.content)
+
+
+class _LazyField():
+    """
+    A non-data descriptor standing in for a field of a lazy object. It is
+    only reached until the object is built, after which the instance
+    __dict__ holds the field and attribute access costs nothing extra.
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return getattr(cls._model, self.name)
+        obj._build()
+        return obj.__dict__[self.name]
+
+
+def _build(self):
+    state = self.__dict__
+    if "_doc" not in state:
+        return
+    fields = self._from_doc(state["_doc"]).__dict__
+    # fields set on the lazy object before it was built win
+    fields.update(state)
+    del fields["_doc"]
+    self.__dict__ = fields
+
+
+def _lazy_init(self, doc: dict):
+    self.__dict__["_doc"] = doc
+    if self._id_key in doc:
+        self.__dict__["id"] = doc[self._id_key]
+
+
+def _lazy_eq(self, other):
+    if not isinstance(other, self._model):
+        return NotImplemented
+    return all(getattr(self, field.name) == getattr(other, field.name) for field in dataclasses.fields(self._model))
+
+
+def _lazy_reduce(self):
+    self._build()
+    return (self._model, tuple(getattr(self, field.name) for field in dataclasses.fields(self._model)))
+
+
+def lazy_model(model, from_doc: Callable, id_key: str = "_id"):
+    """
+    A function that returns a subclass of a model dataclass (i.e. Character)
+    whose instances keep their API document and only run from_doc on the
+    first access of a field other than id.
+
+    Arguments
+    ----------
+    model (class): The model dataclass.
+    from_doc (function): The function that builds a model object from a document (i.e. character_from_doc).
+    id_key (str): The document key holding the id, which is set eagerly so that objects can be cached.
+    """
+    key = (model, from_doc)
+    if key not in _lazy_models:
+        namespace = {field.name: _LazyField(field.name) for field in dataclasses.fields(model)}
+        namespace.update({
+            "__doc__": model.__doc__,
+            "__module__": model.__module__,
+            "__qualname__": model.__qualname__,
+            "__init__": _lazy_init,
+            "__eq__": _lazy_eq,
+            "__hash__": None,
+            "__reduce__": _lazy_reduce,
+            "_build": _build,
+            "_model": model,
+            "_from_doc": staticmethod(from_doc),
+            "_id_key": id_key,
+        })
+        _lazy_models[key] = type(f"Lazy{model.__name__}", (model,), namespace)
+    return _lazy_models[key]
+
+
+def from_docs(docs: List[Dict], model, from_doc: Callable, id_key: str = "_id") -> List:
+    """
+    A function that turns a list of API documents into model objects,
+    lazily when configure(lazy=True) was called.
+
+    Arguments
+    ----------
+    docs (list): The API documents.
+    model (class): The model dataclass.
+    from_doc (function): The function that builds a model object from a document.
+    id_key (str): The document key holding the id.
+    """
+    if _lazy:
+        cls = lazy_model(model, from_doc, id_key)
+        return [cls(doc) for doc in docs]
+    return [from_doc(doc) for doc in docs]
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Callable, List
+if __package__:
+    from .cache import RESOURCES
+    from .sdk_logging import get_logger
+else:
+    from cache import RESOURCES
+    from sdk_logging import get_logger
+import threading
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RequestEvent():
+    """
+    A class to represent one request of the SDK, passed to every hook once it completes.
+    Times are in seconds, and dns_time and connect_time are 0 when a pooled
+    connection was reused.
+
+    Attributes
+    ----------
+    url (str): The url requested.
+    resource (str): The resource of the url (i.e. character, quote).
+    page (int): The page requested, for list endpoints.
+    status (int): The status code returned.
+    bytes (int): The size of the response body.
+    retries (int): The number of 429 responses retried.
+    cache (str): The cache outcome (hit, miss, revalidated), or an empty string without a cache.
+    dns_time (float): The time spent resolving the host.
+    connect_time (float): The time spent opening the connection, including the TLS handshake.
+    ttfb (float): The time from sending the request to receiving the response headers.
+    total_time (float): The wall time of the whole call, including retries and waits.
+    coalesced (bool): Whether the call shared the response of an identical request in flight
+        instead of sending its own. Only status and total_time are set then.
+    """
+    url: str = ""
+    resource: str = ""
+    page: int = None
+    status: int = 0
+    bytes: int = 0
+    retries: int = 0
+    cache: str = ""
+    dns_time: float = 0
+    connect_time: float = 0
+    ttfb: float = 0
+    total_time: float = 0
+    coalesced: bool = False
+
+
+_hooks = []
+_hooks_lock = threading.Lock()
+# connection timings of the request in flight on each thread, set by transport's connections
+timings = threading.local()
+
+
+def add_hook(hook: Callable[[RequestEvent], None]):
+    """
+    A function that registers a hook called with a RequestEvent after every request.
+
+    Arguments
+    ----------
+    hook (function): The function to call (i.e. a MetricsAggregator).
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + [hook]
+
+
+def remove_hook(hook: Callable[[RequestEvent], None]):
+    """
+    A function that unregisters a hook.
+
+    Arguments
+    ----------
+    hook (function): The function registered with add_hook.
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = [registered for registered in _hooks if registered is not hook]
+
+
+def hooks() -> List[Callable[[RequestEvent], None]]:
+    """
+    A function that returns the registered hooks.
+    """
+    return _hooks
+
+
+def emit(event: RequestEvent):
+    """
+    A function that passes an event to every hook. A failing hook is
+    logged and never breaks the request.
+
+    Arguments
+    ----------
+    event (RequestEvent): The event of the completed request.
+    """
+    for hook in _hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            logger.exception(e)
+
+
+def page_of(url: str, params: dict = None) -> int:
+    """
+    A function that returns the page requested from a list endpoint, or None for an id endpoint.
+
+    Arguments
+    ----------
+    url (str): The url of the request.
+    params (dict): The parameters of the request.
+    """
+    if url.split("?")[0].rstrip("/").rsplit("/", 1)[-1] not in RESOURCES:
+        return None
+    return int((params or {}).get("page", 1))
+
+
+def reset_timings():
+    """
+    A function that clears the connection timings of the current thread before a request.
+    """
+    timings.dns_time = 0
+    timings.connect_time = 0
+
+
+def connection_timings() -> tuple:
+    """
+    A function that returns the DNS and connect times of the last request on the current thread.
+    """
+    return getattr(timings, "dns_time", 0), getattr(timings, "connect_time", 0)
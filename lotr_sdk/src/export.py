@@ -0,0 +1,386 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+if __package__:
+    from .books import BOOK_API, Book, book_from_doc
+    from .chapters import CHAPTER_API, Chapter, chapter_from_doc
+    from .characters import CHARACTER_API, Character, character_from_doc
+    from .movies import MOVIE_API, Movie, movie_from_doc
+    from .quotes import QUOTE_API, Quote, quote_from_doc
+    from .client import get_client
+    from .decoding import loads
+    from .pagination import _page_count, _page_params
+    from .sdk_logging import LOG_FORMAT, get_logger
+else:
+    from books import BOOK_API, Book, book_from_doc
+    from chapters import CHAPTER_API, Chapter, chapter_from_doc
+    from characters import CHARACTER_API, Character, character_from_doc
+    from movies import MOVIE_API, Movie, movie_from_doc
+    from quotes import QUOTE_API, Quote, quote_from_doc
+    from client import get_client
+    from decoding import loads
+    from pagination import _page_count, _page_params
+    from sdk_logging import LOG_FORMAT, get_logger
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = get_logger(__name__)
+
+# format: file extension
+FORMATS = {"parquet": "parquet", "arrow": "arrow", "ndjson": "ndjson"}
+# resource: (url, model, from_doc)
+RESOURCES = {
+    "book": (BOOK_API, Book, book_from_doc),
+    "chapter": (CHAPTER_API, Chapter, chapter_from_doc),
+    "character": (CHARACTER_API, Character, character_from_doc),
+    "movie": (MOVIE_API, Movie, movie_from_doc),
+    "quote": (QUOTE_API, Quote, quote_from_doc),
+}
+STAGES = ("fetch", "convert", "write")
+NUMERIC_TYPES = (int, float)
+DEFAULT_PAGE_SIZE = 1000
+
+
+def _pyarrow():
+    """
+    A function that returns the pyarrow module, imported on the first Parquet
+    or Arrow export rather than with the SDK.
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet and Arrow exports require pyarrow. Install it with: pip install pyarrow") from None
+    return pyarrow
+
+
+def export_fields(model) -> List[dataclasses.Field]:
+    """
+    A function that returns the fields of a model that are exported, leaving
+    out the lists filled from other resources (i.e. Book.chapters).
+
+    Arguments
+    ----------
+    model (class): The model dataclass (i.e. Character).
+    """
+    return [field for field in dataclasses.fields(model) if field.type in NUMERIC_TYPES or field.type is str]
+
+
+def export_schema(model):
+    """
+    A function that returns the Arrow schema of a model: numbers as float64,
+    since the API sends floats in fields typed as int, and text as strings.
+
+    Arguments
+    ----------
+    model (class): The model dataclass (i.e. Movie).
+    """
+    pyarrow = _pyarrow()
+    return pyarrow.schema([
+        (field.name, pyarrow.float64() if field.type in NUMERIC_TYPES else pyarrow.string()) for field in export_fields(model)
+    ])
+
+
+def _convert(resource: str, content: bytes, format: str):
+    """
+    A function run in a worker process that parses one page and returns its
+    rows as a RecordBatch (parquet, arrow) or NDJSON bytes, with the number of
+    rows and the seconds spent.
+    """
+    start = time.perf_counter()
+    _, model, from_doc = RESOURCES[resource]
+    objects = [from_doc(doc) for doc in loads(content)["docs"]]
+    names = [field.name for field in export_fields(model)]
+    if format == "ndjson":
+        batch = "".join(
+            json.dumps({name: getattr(obj, name) for name in names}, ensure_ascii=False) + "\n" for obj in objects
+        ).encode("utf-8")
+    else:
+        batch = _pyarrow().RecordBatch.from_pydict(
+            {name: [getattr(obj, name) for obj in objects] for name in names}, schema=export_schema(model)
+        )
+    return batch, len(objects), time.perf_counter() - start
+
+
+class _Writer():
+    """
+    A class that appends the batches of one resource to its file.
+    """
+    def __init__(self, path: str, format: str, model):
+        self.format = format
+        if format == "ndjson":
+            self.file = open(path, "wb")
+        elif format == "parquet":
+            import pyarrow.parquet
+            self.file = pyarrow.parquet.ParquetWriter(path, export_schema(model))
+        else:
+            self.file = _pyarrow().ipc.new_file(path, export_schema(model))
+
+    def write(self, batch):
+        if self.format == "ndjson":
+            self.file.write(batch)
+        else:
+            self.file.write_batch(batch)
+
+    def close(self):
+        self.file.close()
+
+
+@dataclass
+class StageStats():
+    """
+    A class to represent the work of one stage of an export.
+
+    Attributes
+    ----------
+    rows (int): The number of rows that went through the stage.
+    seconds (float): The time spent in the stage, summed over its threads or processes.
+    """
+    rows: int = 0
+    seconds: float = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The rows handled per second spent in the stage.
+        """
+        return self.rows/self.seconds if self.seconds else 0
+
+
+@dataclass
+class ResourceExport():
+    """
+    A class to represent the export of one resource.
+
+    Attributes
+    ----------
+    resource (str): The resource (i.e. quote).
+    path (str): The path of the file written.
+    status_code (int): 200, or the status code of the page that failed, in which case the file holds the pages before it.
+        0 when the request of a page or its conversion raised an exception.
+    pages (int): The number of pages written.
+    rows (int): The number of rows written.
+    bytes (int): The size of the file written.
+    error (str): The exception raised by the request or the conversion of the page that failed, if any.
+    """
+    resource: str = ""
+    path: str = ""
+    status_code: int = 200
+    pages: int = 0
+    rows: int = 0
+    bytes: int = 0
+    error: str = ""
+
+
+@dataclass
+class ExportReport():
+    """
+    A class to represent an export.
+
+    Attributes
+    ----------
+    format (str): The format of the files (parquet, arrow, ndjson).
+    resources (dict): The ResourceExport of each resource.
+    stages (dict): The StageStats of the fetch, convert and write stages.
+    total_time (float): The wall time in seconds of the export.
+    """
+    format: str = ""
+    resources: Dict[str, ResourceExport] = field(default_factory=dict)
+    stages: Dict[str, StageStats] = field(default_factory=lambda: {stage: StageStats() for stage in STAGES})
+    total_time: float = 0
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether every resource was exported.
+        """
+        return all(result.status_code == 200 for result in self.resources.values())
+
+    @property
+    def rows(self) -> int:
+        """
+        The number of rows written.
+        """
+        return sum(result.rows for result in self.resources.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The rows written per second of wall time.
+        """
+        return self.rows/self.total_time if self.total_time else 0
+
+
+def export(directory: str, format: str = "parquet", resources: List[str] = None, processes: int = None,
+           max_pending: int = None, limit: int = DEFAULT_PAGE_SIZE) -> ExportReport:
+    """
+    A function that writes every row of the given resources to one file per
+    resource (i.e. quote.parquet) in directory, and returns a report of the
+    rows per second of each stage. A thread per resource streams its pages,
+    a pool of processes parses each page and builds its columnar batch (or
+    NDJSON lines), and the batches are appended to the files in page order.
+    At most max_pending pages are held at once, so memory stays bounded by
+    max_pending*limit rows whatever the size of the collections.
+
+    Arguments
+    ----------
+    directory (str): The directory of the files, created if missing.
+    format (str): The format of the files (parquet, arrow, ndjson). Parquet and Arrow require pyarrow.
+    resources (list): The resources to export (i.e. ["quote", "character"]). Defaults to all five.
+    processes (int): The number of processes building batches. Defaults to the number of CPUs.
+    max_pending (int): The number of pages fetched but not yet written. Defaults to twice processes.
+    limit (int): The number of rows per page, and so per batch.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"{format} is not a valid format. Valid options: {', '.join(FORMATS)}")
+    resources = list(resources) if resources is not None else list(RESOURCES)
+    for resource in resources:
+        if resource not in RESOURCES:
+            raise ValueError(f"{resource} is not a valid resource. Valid options: {', '.join(RESOURCES)}")
+    if format != "ndjson":
+        _pyarrow()
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2*processes
+    os.makedirs(directory, exist_ok=True)
+
+    report = ExportReport(format)
+    start = time.perf_counter()
+    client = get_client()
+    # a slot is taken before fetching a page and given back once it is written
+    slots = threading.Semaphore(max_pending)
+    pending = queue.Queue()
+    stop = threading.Event()
+    stats_lock = threading.Lock()
+    # the resources whose page failed to convert, so that their threads stop fetching
+    failed = set()
+    writers = {}
+    for resource in resources:
+        path = os.path.join(directory, f"{resource}.{FORMATS[format]}")
+        report.resources[resource] = ResourceExport(resource, path)
+        writers[resource] = _Writer(path, format, RESOURCES[resource][1])
+
+    def stream(resource: str, pool: ProcessPoolExecutor):
+        url = RESOURCES[resource][0]
+        params = _page_params(None, limit)
+        page = pages = 1
+        status_code = 200
+        error = ""
+        try:
+            while page <= pages:
+                slots.acquire()
+                if stop.is_set():
+                    break
+                if resource in failed:
+                    slots.release()
+                    break
+                fetch_start = time.perf_counter()
+                results = client.get(url, params={**params, "page": page})
+                fetch_time = time.perf_counter() - fetch_start
+                if results.status_code != 200:
+                    slots.release()
+                    logger.error("Status %s. Failed to export %s page %s.", results.status_code, url, page)
+                    status_code = results.status_code
+                    break
+                if page == 1:
+                    pages = _page_count(loads(results.content))
+                with stats_lock:
+                    report.stages["fetch"].seconds += fetch_time
+                pending.put((resource, pool.submit(_convert, resource, results.content, format)))
+                page += 1
+        except Exception as e:
+            # i.e. a connection reset or timeout, the file then ends before this page
+            slots.release()
+            logger.exception("Failed to export %s page %s.", url, page)
+            status_code = 0
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            # the end of the resource, with its status code and error
+            pending.put((resource, (status_code, error)))
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            threads = [threading.Thread(target=stream, args=(resource, pool), daemon=True) for resource in resources]
+            for thread in threads:
+                thread.start()
+            streaming = len(resources)
+            try:
+                while streaming:
+                    resource, item = pending.get()
+                    if isinstance(item, tuple):
+                        if resource not in failed:
+                            report.resources[resource].status_code, report.resources[resource].error = item
+                        streaming -= 1
+                        continue
+                    if resource in failed:
+                        # a page fetched before the resource failed
+                        item.cancel()
+                        slots.release()
+                        continue
+                    try:
+                        batch, rows, convert_time = item.result()
+                    except Exception as e:
+                        # i.e. a KeyError from a doc missing a field, the file then ends before this page
+                        slots.release()
+                        logger.exception("Failed to convert a page of %s.", resource)
+                        failed.add(resource)
+                        writers.pop(resource).close()
+                        report.resources[resource].status_code = 0
+                        report.resources[resource].error = f"{type(e).__name__}: {e}"
+                        continue
+                    write_start = time.perf_counter()
+                    writers[resource].write(batch)
+                    write_time = time.perf_counter() - write_start
+                    del batch
+                    slots.release()
+                    result = report.resources[resource]
+                    result.pages += 1
+                    result.rows += rows
+                    for stage, seconds in (("convert", convert_time), ("write", write_time)):
+                        report.stages[stage].rows += rows
+                        report.stages[stage].seconds += seconds
+                    with stats_lock:
+                        report.stages["fetch"].rows += rows
+            finally:
+                # let the threads still fetching stop, if the export stopped early (i.e. a write failed)
+                stop.set()
+                for _ in threads:
+                    slots.release()
+                for thread in threads:
+                    thread.join()
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    for result in report.resources.values():
+        result.bytes = os.path.getsize(result.path)
+        if result.status_code == 200:
+            logger.info("Success! You have exported %s %ss to %s.", result.rows, result.resource, result.path)
+    report.total_time = time.perf_counter() - start
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the collections of The One API to Parquet, Arrow or NDJSON files.")
+    parser.add_argument("directory", help="The directory of the files.")
+    parser.add_argument("--format", default="parquet", choices=list(FORMATS), help="The format of the files.")
+    parser.add_argument("--resources", nargs="+", choices=list(RESOURCES), help="The resources to export, all by default.")
+    parser.add_argument("--processes", type=int, help="The number of processes building batches.")
+    parser.add_argument("--max-pending", type=int, help="The number of pages held in memory at once.")
+    parser.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE, help="The number of rows per page.")
+    args = parser.parse_args()
+    # the SDK only logs to a NullHandler, so the command line shows its warnings and errors
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    report = export(args.directory, args.format, args.resources, args.processes, args.max_pending, args.limit)
+    for result in report.resources.values():
+        print(f"{result.resource}: {result.rows} rows, {result.pages} pages, {result.bytes/1024:.0f} KiB, {result.path}"
+              + ("" if result.status_code == 200 else f", failed with {result.error or f'status {result.status_code}'}"))
+    for stage, stats in report.stages.items():
+        print(f"{stage}: {stats.rows} rows in {stats.seconds:.2f}s, {stats.rows_per_second:,.0f} rows/s")
+    print(f"Exported {report.rows} rows in {report.total_time:.2f}s, {report.rows_per_second:,.0f} rows/s")
+    if not report.ok:
+        raise SystemExit("Failed to export every resource, see the errors above.")
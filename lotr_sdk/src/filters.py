@@ -0,0 +1,405 @@
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Union
+import importlib
+import re
+if __package__:
+    from .client import get_client
+    from .memo import LRUCache
+    from .sdk_logging import get_logger
+else:
+    from client import get_client
+    from memo import LRUCache
+    from sdk_logging import get_logger
+import threading
+import time
+
+logger = get_logger(__name__)
+
+# how long a held collection answers filters before the server is asked again, in seconds
+DEFAULT_MAX_AGE = 24*60*60
+PREDICATE_CACHE_SIZE = 512
+RESULT_CACHE_SIZE = 256
+# the parameters that page or sort a request instead of filtering it
+PAGING_PARAMS = ("limit", "page", "offset", "sort")
+# the parameters a request for a whole collection may have, page and offset skip part of it
+COMPLETE_PARAMS = ("limit", "sort")
+REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+# [!]field[operator value], the longer operators first
+FILTER_PATTERN = re.compile(r"(!?)([\w.]+)(?:(!=|>=|<=|=|<|>)(.*))?", re.DOTALL)
+# resource: (module, function returning the whole collection from the server)
+FETCHERS = {
+    "book": ("books", "get_all_books"),
+    "chapter": ("chapters", "get_all_chapters"),
+    "character": ("characters", "get_all_characters"),
+    "movie": ("movies", "get_all_movies"),
+    "quote": ("quotes", "get_all_quotes"),
+}
+
+
+def compile_regex(regex: str):
+    """
+    A function that compiles a regex in the syntax of the API (i.e. /Belem/i).
+    A value without slashes only matches itself.
+
+    Arguments
+    ----------
+    regex (str): The regex expression.
+    """
+    if len(regex) > 1 and regex.startswith("/") and regex.rfind("/") > 0:
+        end = regex.rfind("/")
+        flags = 0
+        for flag in regex[end+1:]:
+            flags |= REGEX_FLAGS.get(flag, 0)
+        return re.compile(regex[1:end], flags)
+    return re.compile(f"^{re.escape(regex)}$")
+
+
+def _parse(expression: str) -> tuple:
+    # (negate, field, operator, value), checking the syntax without compiling the value
+    match = FILTER_PATTERN.fullmatch(expression.strip())
+    if match is None or (match.group(1) and match.group(3)):
+        raise ValueError(f"{expression} is not a valid filter. Examples: name=/Belem/i, budgetInMillions>100, race=Hobbit,Elf")
+    return match.groups()
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals_any(values: List[str]) -> Callable:
+    # numeric fields are compared as numbers, so that budgetInMillions=94 matches 94.0
+    strings = frozenset(values)
+    numbers = set()
+    for value in values:
+        try:
+            numbers.add(float(value))
+        except ValueError:
+            pass
+    return lambda field: field in numbers if _is_number(field) else field is not None and str(field) in strings
+
+
+def _compare(operator: str, value: str) -> Callable:
+    try:
+        bound = float(value)
+        same_type = _is_number
+    except ValueError:
+        bound = value
+        same_type = lambda field: isinstance(field, str)  # noqa: E731
+    if operator == "<":
+        return lambda field: same_type(field) and field < bound
+    if operator == "<=":
+        return lambda field: same_type(field) and field <= bound
+    if operator == ">":
+        return lambda field: same_type(field) and field > bound
+    return lambda field: same_type(field) and field >= bound
+
+
+class Filter():
+    """
+    A class that represents one filter in the syntax of the API, compiled
+    into a predicate on a field value:
+
+    name=Gandalf, name!=Frodo (match, negate), race=Hobbit,Elf, race!=Orc,Goblin
+    (include, exclude), name=/Belem/i, name!=/Belem/i (regex), budgetInMillions>100,
+    runtimeInMinutes>=160, <, <= (compare), name, !name (exists, does not exist).
+
+    Attributes
+    ----------
+    expression (str): The filter (i.e. name=/Belem/i).
+    field (str): The field filtered on (i.e. name).
+    operator (str): The operator (=, !=, <, <=, >, >=, exists, !exists).
+    value (str): The value compared with, empty for exists and !exists.
+    test (function): The predicate on a field value.
+    """
+    def __init__(self, expression: str):
+        negate, field, operator, value = _parse(expression)
+        self.expression = expression
+        self.field = field
+        # the models keep the API's _id as id
+        self._attribute = "id" if field == "_id" else field
+        if operator is None:
+            self.operator = "!exists" if negate else "exists"
+            self.value = ""
+            self.test = (lambda value: value is None) if negate else (lambda value: value is not None)
+            return
+        self.operator = operator
+        self.value = value
+        if operator in ("<", "<=", ">", ">="):
+            self.test = _compare(operator, value)
+            return
+        if len(value) > 1 and value.startswith("/") and value.rfind("/") > 0:
+            try:
+                search = compile_regex(value).search
+            except re.error as e:
+                raise ValueError(f"{value} is not a valid regex: {e}")
+            test = lambda field: isinstance(field, str) and search(field) is not None  # noqa: E731
+        else:
+            test = _equals_any(value.split(","))
+        self.test = (lambda field: not test(field)) if operator == "!=" else test
+
+    def __call__(self, obj) -> bool:
+        """
+        A function that returns whether a model object (i.e. a Character) passes the filter.
+
+        Arguments
+        ----------
+        obj (object): The model object.
+        """
+        return self.test(getattr(obj, self._attribute, None))
+
+    def matches_doc(self, doc: dict) -> bool:
+        """
+        A function that returns whether an API document passes the filter.
+
+        Arguments
+        ----------
+        doc (dict): The API document.
+        """
+        return self.test(doc.get(self.field))
+
+    def __repr__(self) -> str:
+        return f"Filter({self.expression!r})"
+
+
+@lru_cache(maxsize=PREDICATE_CACHE_SIZE)
+def compile_filter(expression: str) -> Filter:
+    """
+    A function that returns the compiled Filter of an expression, compiling
+    each distinct expression once.
+
+    Arguments
+    ----------
+    expression (str): The filter in the syntax of the API (i.e. budgetInMillions>100).
+    """
+    return Filter(expression)
+
+
+def to_expressions(params: dict) -> List[str]:
+    """
+    A function that returns the filters of request parameters as expressions,
+    as the server reads them once the query string is decoded: {"name": "/Belem/i"}
+    is name=/Belem/i, {"name!": "Frodo"} is name!=Frodo and {"budgetInMillions>100": ""}
+    is budgetInMillions>100. Paging and sort parameters are skipped.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    """
+    return [f"{key}={value}" if value != "" else key for key, value in params.items() if key not in PAGING_PARAMS]
+
+
+def to_params(expressions: Iterable[str]) -> dict:
+    """
+    A function that returns the request parameters sending filter expressions
+    to the server, the reverse of to_expressions. Only the syntax is checked,
+    so that a regex Python can't compile still reaches the server.
+
+    Arguments
+    ----------
+    expressions (list): The filters (i.e. ["race=Hobbit,Elf", "name=/Sam/i"]).
+    """
+    params = {}
+    for expression in expressions:
+        _, field, operator, value = _parse(expression)
+        if operator in ("=", "!=", "<=", ">="):
+            params[f"{field}{operator[:-1]}"] = value
+        else:
+            params[expression] = ""
+    return params
+
+
+def _normalize(filters) -> tuple:
+    expressions = []
+    for value in filters:
+        if isinstance(value, dict):
+            expressions.extend(to_expressions(value))
+        else:
+            expressions.append(value)
+    return tuple(expressions)
+
+
+def evaluate(objects: Iterable, *filters: Union[str, dict]) -> List:
+    """
+    A function that returns the objects passing every filter, in order.
+
+    Arguments
+    ----------
+    objects (list): The model objects (i.e. Characters).
+    filters (str or dict): Filter expressions (i.e. "race=Hobbit,Elf") or request parameters.
+    """
+    predicates = [compile_filter(expression) for expression in _normalize(filters)]
+    if not predicates:
+        return list(objects)
+    if len(predicates) == 1:
+        return list(filter(predicates[0], objects))
+    return [obj for obj in objects if all(predicate(obj) for predicate in predicates)]
+
+
+# resource: (client, held at, generation, objects)
+_held = {}
+_held_lock = threading.Lock()
+_generation = 0
+_max_age = DEFAULT_MAX_AGE
+_results = LRUCache(RESULT_CACHE_SIZE)
+_counters = {"local": 0, "server": 0}
+
+
+def is_complete(params: dict) -> bool:
+    """
+    A function that returns whether request parameters ask for a whole collection,
+    i.e. only set the page size or sort it. A page or an offset skips part of it.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    """
+    return all(key in COMPLETE_PARAMS for key in params)
+
+
+def hold(resource: str, objects: List, held_at: float = None):
+    """
+    A function that keeps a whole collection to answer filters locally. The
+    resource modules call it when a whole collection is fetched.
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie).
+    objects (list): Every object of the collection.
+    held_at (float): The time the collection was fetched, now by default.
+    """
+    global _generation
+    if _max_age <= 0:
+        return
+    with _held_lock:
+        _generation += 1
+        _held[resource] = (get_client(), held_at if held_at is not None else time.time(), _generation, list(objects))
+    logger.debug("Holding %s %s objects.", len(objects), resource)
+
+
+def use_snapshot(snapshot):
+    """
+    A function that holds every collection of a Snapshot, as of the time it was taken.
+
+    Arguments
+    ----------
+    snapshot (Snapshot): The snapshot.
+    """
+    for resource in FETCHERS:
+        hold(resource, snapshot.all(resource), snapshot.created_at)
+
+
+def held(resource: str):
+    """
+    A function that returns the held objects of a collection, or None if the
+    collection is not held, was fetched before client.configure() replaced the
+    Client or is older than max_age.
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie).
+    """
+    entry = _fresh(resource)
+    return entry[3] if entry is not None else None
+
+
+def _fresh(resource: str):
+    entry = _held.get(resource)
+    if entry is None or entry[0] is not get_client() or time.time() - entry[1] > _max_age:
+        return None
+    return entry
+
+
+def release(resource: str = None):
+    """
+    A function that drops a held collection, or every one, so that the next filters go to the server.
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie), every resource by default.
+    """
+    with _held_lock:
+        if resource is None:
+            _held.clear()
+        else:
+            _held.pop(resource, None)
+    _results.clear()
+
+
+def fetcher(resource: str) -> Callable:
+    """
+    A function that returns the get_all_* function of a resource (i.e. get_all_characters for character).
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie).
+    """
+    module, name = FETCHERS[resource]
+    # the resource modules import this module, so they are only imported when needed
+    if __package__:
+        return getattr(importlib.import_module(f".{module}", __package__), name)
+    return getattr(importlib.import_module(module), name)
+
+
+def find(resource: str, *filters: Union[str, dict]) -> List:
+    """
+    A function that returns the objects of a collection passing every filter.
+    They are evaluated on the held collection when there is one, and sent to
+    the server otherwise, or when a regex is in a syntax the server knows but
+    Python's re doesn't (i.e. /\\p{Lu}/u).
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie).
+    filters (str or dict): Filter expressions (i.e. "budgetInMillions>100") or request parameters
+        (i.e. {"name": "/Belem/i"}).
+    """
+    if resource not in FETCHERS:
+        raise ValueError(f"{resource} is not a valid resource. Valid options: {', '.join(FETCHERS)}")
+    expressions = _normalize(filters)
+    entry = _fresh(resource)
+    if entry is not None:
+        try:
+            for expression in expressions:
+                compile_filter(expression)
+        except ValueError as e:
+            logger.info("%s, sending the filters to the server.", e)
+            entry = None
+    if entry is None:
+        with _held_lock:
+            _counters["server"] += 1
+        return fetcher(resource)(to_params(expressions))
+    with _held_lock:
+        _counters["local"] += 1
+    key = "\n".join((str(entry[2]), resource) + expressions)
+    results = _results.get(key)
+    if results is None:
+        results = evaluate(entry[3], *expressions)
+        _results.put(key, results)
+    return list(results)
+
+
+def configure(max_age: float = DEFAULT_MAX_AGE):
+    """
+    A function that sets how long held collections answer filters and drops them.
+
+    Arguments
+    ----------
+    max_age (float): The age in seconds after which a held collection is ignored. 0 disables holding.
+    """
+    global _max_age
+    _max_age = max_age
+    release()
+    with _held_lock:
+        _counters["local"] = 0
+        _counters["server"] = 0
+
+
+def stats() -> Dict:
+    """
+    A function that returns the number of filters answered locally and by the
+    server, the held collection sizes and the counters of the result cache.
+    """
+    with _held_lock:
+        counters = dict(_counters)
+        sizes = {resource: len(entry[3]) for resource, entry in _held.items()}
+    return {**counters, "held": sizes, "results": _results.stats(), "predicates": compile_filter.cache_info()._asdict()}
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from typing import Dict, Iterable
+import threading
+
+DEFAULT_MAXSIZE = 4096
+
+
+class LRUCache():
+    """
+    A class that holds a bounded number of objects in memory and evicts
+    the least recently used one when it is full. Cached objects are shared
+    between callers, so they should not be modified in place.
+
+    Attributes
+    ----------
+    maxsize (int): The maximum number of objects held.
+    hits (int): The number of lookups that found an object.
+    misses (int): The number of lookups that found nothing.
+    evictions (int): The number of objects evicted to make room.
+    """
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        A function that returns the object stored under key, or None.
+
+        Arguments
+        ----------
+        key (str): The key of the object (i.e. its id).
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value):
+        """
+        A function that stores an object under key.
+
+        Arguments
+        ----------
+        key (str): The key of the object (i.e. its id).
+        value: The object to store.
+        """
+        if not key or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def put_many(self, objects: Iterable):
+        """
+        A function that stores a list of objects under their id.
+
+        Arguments
+        ----------
+        objects (list): The objects to store (i.e. Character, Movie).
+        """
+        for obj in objects:
+            self.put(obj.id, obj)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, int]:
+        """
+        A function that returns the hit, miss and eviction counters and the current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        """
+        A function that removes every object and resets the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+_maxsize = DEFAULT_MAXSIZE
+
+
+def id_cache(resource: str) -> LRUCache:
+    """
+    A function that returns the shared LRUCache of a resource (i.e. character, movie),
+    creating it on first use.
+
+    Arguments
+    ----------
+    resource (str): The name of the resource.
+    """
+    with _caches_lock:
+        if resource not in _caches:
+            _caches[resource] = LRUCache(_maxsize)
+        return _caches[resource]
+
+
+def configure(maxsize: int = DEFAULT_MAXSIZE):
+    """
+    A function that sets the maximum size of every id cache and empties them.
+
+    Arguments
+    ----------
+    maxsize (int): The maximum number of objects held per resource. 0 disables the caches.
+    """
+    global _maxsize
+    with _caches_lock:
+        _maxsize = maxsize
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+        cache.maxsize = maxsize
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """
+    A function that returns the counters of every id cache, by resource.
+    """
+    with _caches_lock:
+        caches = dict(_caches)
+    return {resource: cache.stats() for resource, cache in caches.items()}
@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from typing import Dict, Sequence, Tuple
+if __package__:
+    from .events import RequestEvent
+else:
+    from events import RequestEvent
+import threading
+import json
+
+# seconds, the default latency buckets of the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PHASES = ("dns_time", "connect_time", "ttfb", "total_time")
+METRIC_PREFIX = "lotr_sdk"
+
+
+class Histogram():
+    """
+    A class that counts observations in fixed buckets, so that percentiles
+    can be estimated in constant memory.
+
+    Attributes
+    ----------
+    buckets (tuple): The upper bounds of the buckets, in increasing order.
+    counts (list): The number of observations in each bucket, the last one being +Inf.
+    count (int): The number of observations.
+    sum (float): The sum of the observations.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0]*(len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value: float):
+        """
+        A function that adds one observation.
+
+        Arguments
+        ----------
+        value (float): The observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        A function that estimates a quantile by interpolating inside its bucket,
+        as Prometheus' histogram_quantile does.
+
+        Arguments
+        ----------
+        q (float): The quantile, between 0 and 1 (i.e. 0.99).
+        """
+        if self.count == 0:
+            return 0
+        rank = q*self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i-1] if i else 0
+                return lower + (self.buckets[i] - lower)*(rank - seen)/count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict:
+        """
+        A function that returns the histogram with cumulative bucket counts, keyed by upper bound.
+        """
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class MetricsAggregator():
+    """
+    A class that is registered as a hook (events.add_hook) and aggregates
+    every RequestEvent in memory: a latency histogram per resource and
+    phase (dns_time, connect_time, ttfb, total_time), and counters of
+    requests by status, response bytes, retries and cache outcomes. Calls
+    that shared an identical request in flight are only counted as coalesced.
+
+    Attributes
+    ----------
+    buckets (tuple): The upper bounds in seconds of the latency buckets.
+    """
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            if event.coalesced:
+                self.coalesced[event.resource] = self.coalesced.get(event.resource, 0) + 1
+                return
+            for phase in PHASES:
+                key = (event.resource, phase)
+                if key not in self.latency:
+                    self.latency[key] = Histogram(self.buckets)
+                self.latency[key].observe(getattr(event, phase))
+            status_key = (event.resource, event.status)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.bytes[event.resource] = self.bytes.get(event.resource, 0) + event.bytes
+            self.retries[event.resource] = self.retries.get(event.resource, 0) + event.retries
+            if event.cache:
+                cache_key = (event.resource, event.cache)
+                self.cache[cache_key] = self.cache.get(cache_key, 0) + 1
+
+    def reset(self):
+        """
+        A function that clears every histogram and counter.
+        """
+        with self._lock:
+            self.latency: Dict[Tuple[str, str], Histogram] = {}
+            self.requests: Dict[Tuple[str, int], int] = {}
+            self.bytes: Dict[str, int] = {}
+            self.retries: Dict[str, int] = {}
+            self.cache: Dict[Tuple[str, str], int] = {}
+            self.coalesced: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        """
+        A function that returns every metric, grouped by resource.
+        """
+        with self._lock:
+            resources = {}
+            for (resource, phase), histogram in self.latency.items():
+                resources.setdefault(resource, {"latency": {}})["latency"][phase] = histogram.to_dict()
+            for (resource, status), count in self.requests.items():
+                resources[resource].setdefault("requests", {})[str(status)] = count
+            for resource in resources:
+                resources[resource]["bytes"] = self.bytes.get(resource, 0)
+                resources[resource]["retries"] = self.retries.get(resource, 0)
+            for (resource, outcome), count in self.cache.items():
+                resources[resource].setdefault("cache", {})[outcome] = count
+            for resource, count in self.coalesced.items():
+                resources.setdefault(resource, {"latency": {}})["coalesced"] = count
+            return resources
+
+    def to_json(self) -> str:
+        """
+        A function that returns every metric as a json document.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        A function that returns every metric in the Prometheus text exposition format.
+        """
+        lines = [
+            f"# HELP {METRIC_PREFIX}_request_duration_seconds Time spent in each phase of a request.",
+            f"# TYPE {METRIC_PREFIX}_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (resource, phase), histogram in sorted(self.latency.items()):
+                labels = f'resource="{resource}",phase="{phase.replace("_time", "")}"'
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_PREFIX}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{METRIC_PREFIX}_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{METRIC_PREFIX}_request_duration_seconds_count{{{labels}}} {histogram.count}")
+            counters = [
+                ("requests_total", "Requests by status code.", {(r, f'status="{s}"'): c for (r, s), c in self.requests.items()}),
+                ("response_bytes_total", "Bytes of response bodies.", {(r, ""): c for r, c in self.bytes.items()}),
+                ("retries_total", "429 responses retried.", {(r, ""): c for r, c in self.retries.items()}),
+                ("cache_total", "Cache outcomes.", {(r, f'outcome="{o}"'): c for (r, o), c in self.cache.items()}),
+                ("coalesced_total", "Calls that shared an identical request in flight.", {(r, ""): c for r, c in self.coalesced.items()}),
+            ]
+            for name, help, values in counters:
+                lines.append(f"# HELP {METRIC_PREFIX}_{name} {help}")
+                lines.append(f"# TYPE {METRIC_PREFIX}_{name} counter")
+                for (resource, labels), value in sorted(values.items()):
+                    extra = f",{labels}" if labels else ""
+                    lines.append(f'{METRIC_PREFIX}_{name}{{resource="{resource}"{extra}}} {value}')
+        return "\n".join(lines) + "\n"
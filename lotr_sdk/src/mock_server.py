@@ -0,0 +1,352 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+from urllib.parse import parse_qs, unquote, urlparse
+import argparse
+import hashlib
+import threading
+import random
+import math
+import json
+import operator
+import re
+import time
+if __package__:
+    from .snapshot import Snapshot
+    from .sorting import sort_key
+else:
+    from snapshot import Snapshot
+    from sorting import sort_key
+
+DEFAULT_PAGE_SIZE = 1000
+# the sizes of the live collections
+FIXTURE_SIZES = {"book": 3, "chapter": 62, "character": 933, "movie": 8, "quote": 2384}
+# nested list endpoints: (parent collection, child collection): child field holding the parent id
+NESTED = {
+    ("book", "chapter"): "book",
+    ("movie", "quote"): "movie",
+    ("character", "quote"): "character",
+}
+RACES = ["Human", "Hobbit", "Elf", "Dwarf", "Maiar", "Orc", "Ent", "Dragon"]
+REALMS = ["", "Gondor", "Rohan", "Shire", "Rivendell", "Lothlórien", "Mordor"]
+GENDERS = ["Male", "Female", ""]
+REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _oid(prefix: str, i: int) -> str:
+    return f"{prefix}{i:016x}"
+
+
+def synthetic_fixtures(sizes: Dict[str, int] = None, seed: int = 0) -> Dict[str, List[dict]]:
+    """
+    A function that returns documents shaped like the live collections,
+    with the same sizes and cross references between them.
+
+    Arguments
+    ----------
+    sizes (dict): The number of documents of each collection. Defaults to the live sizes.
+    seed (int): The seed of the generated values.
+    """
+    sizes = {**FIXTURE_SIZES, **(sizes or {})}
+    rand = random.Random(seed)
+    books = [{"_id": _oid("5cf5805f", i), "name": f"Book {i}"} for i in range(sizes["book"])]
+    chapters = [
+        {"_id": _oid("6091b6d6", i), "chapterName": f"Chapter {i}", "book": books[i % len(books)]["_id"]}
+        for i in range(sizes["chapter"])
+    ]
+    characters = [
+        {"_id": _oid("5cd99d4b", i), "height": f"{rand.randint(90, 220)}cm" if i % 3 else "",
+         "race": rand.choice(RACES), "gender": rand.choice(GENDERS), "birth": f"TA {rand.randint(1, 3018)}",
+         "spouse": "", "death": f"FA {rand.randint(1, 120)}" if i % 2 else "", "realm": rand.choice(REALMS),
+         "hair": "", "name": f"Character {i}", "wikiUrl": f"http://lotr.fandom.com/wiki/Character_{i}"}
+        for i in range(sizes["character"])
+    ]
+    movies = [
+        {"_id": _oid("5cd95395", i), "name": f"Movie {i}", "runtimeInMinutes": rand.randint(150, 560),
+         "budgetInMillions": rand.randint(90, 675), "boxOfficeRevenueInMillions": round(rand.uniform(800, 6000), 1),
+         "academyAwardNominations": rand.randint(0, 30), "academyAwardWins": rand.randint(0, 17),
+         "rottenTomatoesScore": rand.randint(60, 96)}
+        for i in range(sizes["movie"])
+    ]
+    quotes = []
+    for i in range(sizes["quote"]):
+        id = _oid("5cd96e05", i)
+        quotes.append({
+            "_id": id, "dialog": f"Quote {i} " + " ".join(rand.choice(("ring", "shire", "precious", "nazgul", "mordor")) for _ in range(6)),
+            "movie": movies[i % len(movies)]["_id"] if movies else "",
+            "character": characters[rand.randrange(len(characters))]["_id"] if characters else "", "id": id
+        })
+    return {"book": books, "chapter": chapters, "character": characters, "movie": movies, "quote": quotes}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _query_filter(key: str, value: str) -> Callable[[dict], bool]:
+    """
+    A function that returns a predicate on documents for one decoded query
+    parameter, as the API reads it: name=Gandalf, name!=Frodo, race=Hobbit,Elf,
+    race!=Orc,Goblin, name=/Belem/i, budgetInMillions<100 and >100 (the whole
+    filter is the key), <=100 and >=100 (the key ends with < or >), name, !name.
+    It is written apart from the SDK's filters module, so that tests against
+    the mock server check it rather than repeat it.
+    """
+    if value == "":
+        match = re.fullmatch(r"([\w.]+)([<>])(.+)", key, re.DOTALL)
+        if match is None:
+            field = key.lstrip("!")
+            return (lambda doc: field not in doc) if key.startswith("!") else (lambda doc: field in doc)
+        field, op, value = match.groups()
+    elif key[-1] in "<>":
+        field, op = key[:-1], key[-1] + "="
+    else:
+        field, op = key.rstrip("!"), "!=" if key.endswith("!") else "="
+
+    if op in ("<", "<=", ">", ">="):
+        compare = COMPARISONS[op]
+        try:
+            bound = float(value)
+        except ValueError:
+            return lambda doc: isinstance(doc.get(field), str) and compare(doc[field], value)
+        return lambda doc: _is_number(doc.get(field)) and compare(doc[field], bound)
+
+    if len(value) > 1 and value.startswith("/") and value.rfind("/") > 0:
+        end = value.rfind("/")
+        flags = 0
+        for flag in value[end+1:]:
+            flags |= REGEX_FLAGS.get(flag, 0)
+        try:
+            pattern = re.compile(value[1:end], flags)
+        except re.error as e:
+            raise ValueError(f"{value} is not a valid regex: {e}")
+        test = lambda field: isinstance(field, str) and pattern.search(field) is not None  # noqa: E731
+    else:
+        values = value.split(",")
+        numbers = set()
+        for item in values:
+            try:
+                numbers.add(float(item))
+            except ValueError:
+                pass
+        test = lambda field: field in numbers if _is_number(field) else field is not None and str(field) in values  # noqa: E731
+    if op == "!=":
+        return lambda doc: not test(doc.get(field))
+    return lambda doc: test(doc.get(field))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that answers the list, id and nested endpoints of The One API from self.server.fixtures.
+    """
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, which Nagle's algorithm would delay by the ack timeout
+    disable_nagle_algorithm = True
+
+    def _send(self, status: int, payload: dict = None, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        if status == 200:
+            # like the API (Express), a weak ETag of the body, and 304 without a body when If-None-Match matches it
+            etag = f'W/"{len(body):x}-{hashlib.sha1(body).hexdigest()[:27]}"'
+            headers = {**(headers or {}), "ETag": etag}
+            if self.headers.get("If-None-Match") == etag:
+                with self.server.lock:
+                    self.server.not_modified += 1
+                status = 304
+                body = b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        with server.lock:
+            server.requests += 1
+            fail = server.error_rate > 0 and server.random.random() < server.error_rate
+            delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            with server.lock:
+                server.errors += 1
+            headers = {"Retry-After": "0"} if server.error_status == 429 else None
+            self._send(server.error_status, {"success": False, "message": "Injected error"}, headers)
+            return
+
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        if parts and parts[0] == "v2":
+            parts = parts[1:]
+        if not parts or parts[0] not in server.fixtures:
+            self._send(404, {"success": False, "message": "Not found."})
+            return
+        collection = parts[0]
+        docs = server.fixtures[collection]
+        if len(parts) == 2:
+            doc = server.by_id[collection].get(parts[1])
+            if doc is None:
+                self._send(404, {"success": False, "message": "Something went wrong."})
+                return
+            docs = [doc]
+        elif len(parts) == 3:
+            field = NESTED.get((collection, parts[2]))
+            if field is None:
+                self._send(404, {"success": False, "message": "Not found."})
+                return
+            docs = [doc for doc in server.fixtures[parts[2]] if doc.get(field) == parts[1]]
+        try:
+            page = self._page(docs, parse_qs(url.query, keep_blank_values=True))
+        except ValueError as e:
+            self._send(400, {"success": False, "message": str(e)})
+            return
+        self._send(200, page)
+
+    def _page(self, docs: List[dict], query: Dict[str, List[str]]) -> dict:
+        params = {key: values[-1] for key, values in query.items()}
+        limit = int(params.pop("limit", self.server.page_size))
+        page = int(params.pop("page", 1))
+        offset = int(params.pop("offset", (page - 1)*limit))
+        sort = params.pop("sort", None)
+        for key, value in params.items():
+            match = _query_filter(key, value)
+            docs = [doc for doc in docs if match(doc)]
+        if sort:
+            field, _, direction = sort.partition(":")
+            docs = sorted(docs, key=lambda doc: sort_key(doc.get(field)), reverse=direction == "desc")
+        return {
+            "docs": docs[offset:offset+limit],
+            "total": len(docs),
+            "limit": limit,
+            "offset": offset,
+            "page": page,
+            "pages": max(math.ceil(len(docs)/limit), 1) if limit else 1,
+        }
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer():
+    """
+    A class that serves fixtures over HTTP in place of The One API, so that
+    tests and benchmarks run offline and reproducibly. It answers list
+    endpoints with the API's filters, sort and pagination, id endpoints and
+    nested endpoints (i.e. /book/{id}/chapter), answers conditional requests
+    with ETags, and can add latency and inject errors.
+
+    Attributes
+    ----------
+    fixtures (dict): The documents of each collection (i.e. {"character": [...]}).
+    latency (float): The delay in seconds added to every response.
+    jitter (float): The maximum random delay in seconds added on top of latency.
+    page_size (int): The number of docs per page when a request has no limit.
+    error_rate (float): The share of requests answered with error_status.
+    error_status (int): The status code of injected errors (i.e. 500, 429).
+    seed (int): The seed of the jitter and error injection.
+    """
+    def __init__(self, fixtures: Dict[str, List[dict]] = None, latency: float = 0, jitter: float = 0,
+                 page_size: int = DEFAULT_PAGE_SIZE, error_rate: float = 0, error_status: int = 500, seed: int = 0):
+        self.fixtures = fixtures if fixtures is not None else synthetic_fixtures(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self._server = None
+
+    @classmethod
+    def from_snapshot(cls, path: str, **kwargs) -> "MockServer":
+        """
+        A function that returns a MockServer serving the documents of a snapshot
+        file recorded from the live API (i.e. with python snapshot.py).
+
+        Arguments
+        ----------
+        path (str): The path of the snapshot file.
+        """
+        return cls(Snapshot.load(path).docs, **kwargs)
+
+    def start(self) -> "MockServer":
+        """
+        A function that starts serving on a free local port in a background thread.
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        server.daemon_threads = True
+        server.fixtures = self.fixtures
+        server.by_id = {collection: {doc["_id"]: doc for doc in docs} for collection, docs in self.fixtures.items()}
+        for option in ("latency", "jitter", "page_size", "error_rate", "error_status"):
+            setattr(server, option, getattr(self, option))
+        server.random = random.Random(self.seed)
+        server.lock = threading.Lock()
+        server.requests = 0
+        server.errors = 0
+        server.not_modified = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._server = server
+        return self
+
+    def stop(self):
+        """
+        A function that stops the server and closes its socket.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def api(self) -> str:
+        """
+        The base url to configure the client with (i.e. client.configure(api=server.api)).
+        """
+        return f"http://127.0.0.1:{self._server.server_port}/v2/"
+
+    @property
+    def requests(self) -> int:
+        """
+        The number of requests served.
+        """
+        return self._server.requests
+
+    @property
+    def errors(self) -> int:
+        """
+        The number of injected errors.
+        """
+        return self._server.errors
+
+    @property
+    def not_modified(self) -> int:
+        """
+        The number of conditional requests answered with 304 Not Modified.
+        """
+        return self._server.not_modified
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve The One API from local fixtures.")
+    parser.add_argument("--snapshot", help="A snapshot file to serve instead of synthetic fixtures.")
+    parser.add_argument("--latency", type=float, default=0, help="The delay in seconds added to every response.")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="The number of docs per page.")
+    parser.add_argument("--error-rate", type=float, default=0, help="The share of requests answered with an error.")
+    parser.add_argument("--error-status", type=int, default=500, help="The status code of injected errors.")
+    args = parser.parse_args()
+    options = dict(latency=args.latency, page_size=args.page_size, error_rate=args.error_rate, error_status=args.error_status)
+    server = MockServer.from_snapshot(args.snapshot, **options) if args.snapshot else MockServer(**options)
+    with server:
+        print(f"Serving on {server.api}, press Ctrl+C to stop.")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
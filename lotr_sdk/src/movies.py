@@ -1,22 +1,40 @@
 from dataclasses import dataclass
 from typing import List
-import requests
-import logging
-
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s',
-    filename='lotr_sdk.log',
-    level=logging.INFO
-    )
+if __package__:
+    from .batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from .client import get_client
+    from .columnar import docs_to_columns, to_columns
+    from .decoding import decode, from_docs
+    from .filters import find, hold, is_complete
+    from .memo import id_cache
+    from .pagination import PaginationReport, get_all_docs
+    from .sdk_logging import get_logger
+    from .sorting import parse_sort, sort
+else:
+    from batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from client import get_client
+    from columnar import docs_to_columns, to_columns
+    from decoding import decode, from_docs
+    from filters import find, hold, is_complete
+    from memo import id_cache
+    from pagination import PaginationReport, get_all_docs
+    from sdk_logging import get_logger
+    from sorting import parse_sort, sort
+
+logger = get_logger(__name__)
 
 # Import api and header
 try:
-    from settings import API, AUTH_HEADER
+    if __package__:
+        from .settings import API
+    else:
+        from settings import API
 except ImportError as e:
-    logging.exception(e)
+    logger.exception(e)
 
 MOVIE_API = f"{API}movie/"
+ID_CACHE = id_cache("movie")
+SORT_FIELDS = ("_id", "name", "runtimeInMinutes", "budgetInMillions", "boxOfficeRevenueInMillions", "academyAwardNominations", "academyAwardWins", "rottenTomatoesScore")
 
 
 @dataclass
@@ -45,36 +63,53 @@ class Movie():
     rottenTomatoesScore: float = 0
 
 
-def get_all_movies(params:dict = {}) -> List:
+def movie_from_doc(doc: dict) -> Movie:
     """
-    A function that returns a list of all movies.
+    A function that receives a movie document from the API and returns a Movie object.
+
+    Arguments
+    ----------
+    doc (dict): The movie document.
+    """
+    return Movie(
+        id=doc["_id"],
+        name=doc["name"],
+        runtimeInMinutes=doc["runtimeInMinutes"],
+        budgetInMillions=doc["budgetInMillions"],
+        boxOfficeRevenueInMillions=doc["boxOfficeRevenueInMillions"],
+        academyAwardNominations=doc["academyAwardNominations"],
+        academyAwardWins=doc["academyAwardWins"],
+        rottenTomatoesScore=doc["rottenTomatoesScore"]
+    )
+
+
+def get_all_movies(params:dict = {}, max_workers: int = 1, report: PaginationReport = None, columnar: bool = False,
+                   limit: int = None) -> List:
+    """
+    A function that returns a list of all movies, following every page.
 
     Arguments
     ----------
     params (dict): A dictionary of parameters sent in the API call.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with per-page latency and total wall time.
+    columnar (bool): Whether to return a ColumnarResult with one column per Movie field.
+        The columns are built straight from the documents, so the Movies are not cached or held.
+    limit (int): The number of movies per page, a larger limit needs fewer requests.
     """
-    results = requests.get(url=MOVIE_API, params=params, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success! You have accessed {MOVIE_API}.")
-        results_json = results.json()
-        movies = []
-        total_movies = results_json["total"]
-        for i in range(total_movies):
-            movie = Movie(
-                id=results_json["docs"][i]["_id"],
-                name=results_json["docs"][i]["name"],
-                runtimeInMinutes=results_json["docs"][i]["runtimeInMinutes"],
-                budgetInMillions=results_json["docs"][i]["budgetInMillions"],
-                boxOfficeRevenueInMillions=results_json["docs"][i]["boxOfficeRevenueInMillions"],
-                academyAwardNominations=results_json["docs"][i]["academyAwardNominations"],
-                academyAwardWins=results_json["docs"][i]["academyAwardWins"],
-                rottenTomatoesScore=results_json["docs"][i]["rottenTomatoesScore"]
-            )
-            movies.append(movie)
+    status_code, docs = get_all_docs(MOVIE_API, params, max_workers, report, limit)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", MOVIE_API)
+        if columnar:
+            return docs_to_columns(docs, Movie)
+        movies = from_docs(docs, Movie, movie_from_doc)
+        ID_CACHE.put_many(movies)
+        if is_complete(params):
+            hold("movie", movies)
         return movies
     else:
-        logging.error(f"Status {results.status_code}. Failed to get movies.")
-        return []
+        logger.error("Status %s. Failed to get movies.", status_code)
+        return to_columns([], Movie) if columnar else []
 
 
 def get_movie_by_id(id:str = "") -> Movie:
@@ -85,27 +120,37 @@ def get_movie_by_id(id:str = "") -> Movie:
     ----------
     id (str): The id of the Movie
     """
+    cached = ID_CACHE.get(id)
+    if cached is not None:
+        return cached
     movie_api_id = f"{MOVIE_API}{id}"
-    results = requests.get(url=movie_api_id, headers=AUTH_HEADER)
+    results = get_client().get(movie_api_id)
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {movie_api_id}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Movie(
-            id=results_json["_id"],
-            name=results_json["name"],
-            runtimeInMinutes=results_json["runtimeInMinutes"],
-            budgetInMillions=results_json["budgetInMillions"],
-            boxOfficeRevenueInMillions=results_json["boxOfficeRevenueInMillions"],
-            academyAwardNominations=results_json["academyAwardNominations"],
-            academyAwardWins=results_json["academyAwardWins"],
-            rottenTomatoesScore=results_json["rottenTomatoesScore"]
-        )
+        logger.info("Success! You have accessed %s.", movie_api_id)
+        results_json = decode(results)
+        movie = movie_from_doc(results_json["docs"][0])
+        ID_CACHE.put(movie.id, movie)
+        return movie
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Movie from id {id}.")
+        logger.error("Failed with Status Code %s. Failed to get Movie from id %s.", results.status_code, id)
         return None
 
 
+def get_movies_by_ids(ids: List[str], max_workers: int = DEFAULT_MAX_WORKERS) -> List:
+    """
+    A function that receives a list of Movie ids and returns a list of Movie
+    objects in the same order, with None for ids that were not found.
+    Duplicate ids are fetched once, cached Movies are not fetched again and
+    the rest are pulled with as few requests as possible.
+
+    Arguments
+    ----------
+    ids (list): The ids of the Movies
+    max_workers (int): The number of threads used for the requests.
+    """
+    return get_by_ids(ids, ID_CACHE, get_all_movies, get_movie_by_id, max_workers)
+
+
 def get_movie_by_name(name:str = "") -> Movie:
     """
     A function that receives a Movie name and returns a Movie object.
@@ -114,58 +159,53 @@ def get_movie_by_name(name:str = "") -> Movie:
     ----------
     name (str): The name of the Movie
     """
-    results = requests.get(url=MOVIE_API, params={"name": name}, headers=AUTH_HEADER)
+    results = get_client().get(MOVIE_API, params={"name": name})
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {MOVIE_API}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        logging.info(f"{results_json}")
-        return Movie(
-            id=results_json["_id"],
-            name=results_json["name"],
-            runtimeInMinutes=results_json["runtimeInMinutes"],
-            budgetInMillions=results_json["budgetInMillions"],
-            boxOfficeRevenueInMillions=results_json["boxOfficeRevenueInMillions"],
-            academyAwardNominations=results_json["academyAwardNominations"],
-            academyAwardWins=results_json["academyAwardWins"],
-            rottenTomatoesScore=results_json["rottenTomatoesScore"]
-        )
+        logger.info("Success! You have accessed %s.", MOVIE_API)
+        results_json = decode(results)
+        return movie_from_doc(results_json["docs"][0])
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Movie from {name}.")
+        logger.error("Failed with Status Code %s. Failed to get Movie from %s.", results.status_code, name)
         return None
 
 
-def get_sorted_movies(sort_by:str, sort_type: str) -> List:
+def get_sorted_movies(sort_by:str, sort_type: str = "asc", limit: int = None) -> List:
     """
     A function that receives an argument to sort by (i.e. _id, name, 
     runtimeInMinutes, budgetInMillions, boxOfficeRevenueInMillions, 
     academyAwardNominations, academyAwardWins, rottenTomatoesScore)
     and a sort type (i.e. asc: ascending, desc: descending)
 
+    Several keys can be given with their own direction (i.e. name:asc,_id:desc),
+    sort_type being the direction of the keys without one. The held collection
+    is sorted locally, and fetched once when it isn't held, see sorting.sort.
+    Like the API, missing values come first in ascending sorts and last in descending ones.
+
     Arguments
     ----------
     sort_by (str): The Book argument to sort by (i.e. _id, name, 
     runtimeInMinutes, budgetInMillions, boxOfficeRevenueInMillions, 
     academyAwardNominations, academyAwardWins, rottenTomatoesScore)
     sort_type (str): The sort type (asc: ascending, desc: descending)
+    limit (int): The number of Movies to return, the first ones of the sort. All by default.
     """
-    # check if correct sort_by and sort_type have been passed:
-    if sort_by != "_id" and sort_by != "name" and sort_by != "runtimeInMinutes" and sort_by != "budgetInMillions" and sort_by != "academyAwardNominations" and sort_by != "academyAwardWins" and sort_by != "rottenTomatoesScore":
-        logging.error(f"{sort_by} is not a valid argument. Valid options: _id, name, runtimeInMinutes, budgetInMillions, boxOfficeRevenueInMillions, academyAwardNominations, academyAwardWins, rottenTomatoesScore")
-        return []
-    if sort_type != "asc" and sort_type != "desc":
-        logging.error(f"{sort_type} is not a valid argument. Valid options: asc, desc")
+    try:
+        keys = parse_sort(sort_by, sort_type)
+    except ValueError as e:
+        logger.error("%s", e)
         return []
+    for field, _ in keys:
+        if field not in SORT_FIELDS:
+            logger.error("%s is not a valid argument. Valid options: %s", field, ", ".join(SORT_FIELDS))
+            return []
 
-    params = {"sort": sort_by+":"+sort_type}
-    logging.info(params)
-    results = get_all_movies(params)
-    return results
+    return sort("movie", keys, limit)
 
 
 def get_movie_by_regex(movie_arg: str, regex: str) -> List:
     """
     A function that receives a Movie argument and matches to a regex expression.
+    The whole collection is matched locally once get_all_movies() fetched it, see filters.find.
 
     Arguments
     ----------
@@ -174,6 +214,4 @@ def get_movie_by_regex(movie_arg: str, regex: str) -> List:
     academyAwardNominations, academyAwardWins, rottenTomatoesScore).
     regex (str): The regex expression used to match with.
     """
-    params = {movie_arg: regex}
-    results = get_all_movies(params)
-    return results
\ No newline at end of file
+    return find("movie", {movie_arg: regex})
\ No newline at end of file
@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+if __package__:
+    from .client import get_client
+    from .decoding import decode
+    from .sdk_logging import get_logger
+else:
+    from client import get_client
+    from decoding import decode
+    from sdk_logging import get_logger
+import math
+import time
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PaginationReport():
+    """
+    A class to represent the timings of a paginated pull.
+
+    Attributes
+    ----------
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    pages (int): The number of pages fetched.
+    page_latencies (dict): The latency in seconds of each page, by page number.
+    failed_pages (list): The page numbers that did not return a 200.
+    total_time (float): The wall time in seconds of the whole pull.
+    """
+    max_workers: int = 1
+    pages: int = 0
+    page_latencies: Dict[int, float] = field(default_factory=dict)
+    failed_pages: List[int] = field(default_factory=list)
+    total_time: float = 0
+
+
+def _page_params(params: dict, limit: int) -> dict:
+    """
+    A function that copies the caller's params (filters and sort) and sets the page size.
+    A page or an offset is dropped, since every page is requested in turn from the first.
+    """
+    params = dict(params or {})
+    skipped = [key for key in ("page", "offset") if params.pop(key, None) is not None]
+    if skipped:
+        logger.warning("Ignoring %s, every page is pulled from the start.", " and ".join(skipped))
+    if limit is not None:
+        params["limit"] = limit
+    return params
+
+
+def _page_count(results_json: dict) -> int:
+    """
+    A function that returns the number of pages of a list response,
+    worked out from total and limit when the server doesn't send pages.
+    """
+    if results_json.get("pages"):
+        return results_json["pages"]
+    total = results_json.get("total", 0)
+    limit = results_json.get("limit") or len(results_json["docs"])
+    return max(math.ceil(total/limit), 1) if limit else 1
+
+
+def _get_page(url: str, params: dict, page: int) -> Tuple[int, int, List, float]:
+    """
+    A function that fetches one page and returns its page number,
+    status code, docs and latency.
+    """
+    start = time.perf_counter()
+    results = get_client().get(url, params={**params, "page": page})
+    latency = time.perf_counter() - start
+    if results.status_code == 200:
+        logger.info("Success! You have accessed %s page %s.", url, page)
+        return page, results.status_code, decode(results)["docs"], latency
+    logger.error("Status %s. Failed to get %s page %s.", results.status_code, url, page)
+    return page, results.status_code, [], latency
+
+
+def get_all_docs(url: str, params: dict = None, max_workers: int = 1, report: PaginationReport = None,
+                 limit: int = None) -> Tuple[int, List]:
+    """
+    A function that returns the status code of the first page and the docs
+    of every page of a list endpoint, in page order. Every page is sent the
+    same params, so filters and sort hold across pages, and the pull always
+    starts from the first page: a page or an offset in params is ignored. Pages 2..N are
+    fetched by a pool of max_workers threads. When a page fails, the status
+    code of the first failed page is returned with the docs of the others,
+    so that callers never take a partial pull for the whole collection.
+
+    Arguments
+    ----------
+    url (str): The url of the list endpoint.
+    params (dict): A dictionary of parameters sent with every page.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with the timings of the pull.
+    limit (int): The number of docs per page. Defaults to the server's page size.
+    """
+    params = _page_params(params, limit)
+    start = time.perf_counter()
+    results = get_client().get(url, params=params)
+    first_latency = time.perf_counter() - start
+    if results.status_code != 200:
+        return results.status_code, []
+    results_json = decode(results)
+    docs = list(results_json["docs"])
+    pages = _page_count(results_json)
+    latencies = {1: first_latency}
+    failed_pages = []
+    failed_status = None
+
+    # if there is more than 1 page, pull the rest of the pages
+    if pages > 1:
+        page_numbers = range(2, pages+1)
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched = list(executor.map(lambda page: _get_page(url, params, page), page_numbers))
+        else:
+            fetched = [_get_page(url, params, page) for page in page_numbers]
+        # executor.map keeps page order, so the docs can be appended as they come
+        for page, status_code, page_docs, latency in fetched:
+            latencies[page] = latency
+            if status_code != 200:
+                failed_pages.append(page)
+                failed_status = failed_status or status_code
+            docs.extend(page_docs)
+
+    if failed_pages:
+        logger.error("Failed to get %s pages %s of %s, returning %s docs of %s.", url,
+                     ", ".join(map(str, failed_pages)), pages, len(docs), results_json.get("total", "?"))
+    if report is not None:
+        report.max_workers = max_workers
+        report.pages = pages
+        report.page_latencies = latencies
+        report.failed_pages = failed_pages
+        report.total_time = time.perf_counter() - start
+    return failed_status or results.status_code, docs
+
+
+def iter_pages(url: str, params: dict = None, prefetch: bool = False, limit: int = None) -> Iterator[List]:
+    """
+    A generator that yields the docs of a list endpoint one page at a time,
+    as soon as each page is parsed, from the first page (a page or an offset
+    in params is ignored). With prefetch, the next page is fetched
+    in a background thread while the caller processes the current one.
+    It stops at the first page that fails, logging the pages left out,
+    rather than yield the pages after a gap.
+
+    Arguments
+    ----------
+    url (str): The url of the list endpoint.
+    params (dict): A dictionary of parameters sent with every page.
+    prefetch (bool): Whether to fetch the next page in the background.
+    limit (int): The number of docs per page. Defaults to the server's page size.
+    """
+    params = _page_params(params, limit)
+    results = get_client().get(url, params=params)
+    if results.status_code != 200:
+        logger.error("Status %s. Failed to get %s.", results.status_code, url)
+        return
+    logger.info("Success! You have accessed %s.", url)
+    results_json = decode(results)
+    pages = _page_count(results_json)
+    docs = results_json["docs"]
+    del results, results_json
+
+    if not prefetch:
+        yield docs
+        for page in range(2, pages+1):
+            _, status_code, docs, _ = _get_page(url, params, page)
+            if status_code != 200:
+                _log_stopped(url, page, pages)
+                return
+            yield docs
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(_get_page, url, params, 2) if pages > 1 else None
+        yield docs
+        for page in range(2, pages+1):
+            _, status_code, docs, _ = next_page.result()
+            if status_code != 200:
+                _log_stopped(url, page, pages)
+                return
+            next_page = executor.submit(_get_page, url, params, page+1) if page < pages else None
+            yield docs
+
+
+def _log_stopped(url: str, page: int, pages: int):
+    logger.error("Stopped iterating %s at page %s of %s, pages %s to %s were not yielded.", url, page, pages, page, pages)
@@ -1,22 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List
-import requests
-import logging
-
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s',
-    filename='lotr_sdk.log',
-    level=logging.INFO
-    )
+from typing import Callable, Iterable, Iterator, List
+if __package__:
+    from .batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from .client import get_client
+    from .columnar import docs_to_columns, to_columns
+    from .decoding import decode, from_docs
+    from .filters import find, hold, is_complete
+    from .memo import id_cache
+    from .pagination import PaginationReport, get_all_docs, iter_pages
+    from .sdk_logging import get_logger
+    from .sorting import parse_sort, sort
+else:
+    from batch import DEFAULT_MAX_WORKERS, get_by_ids
+    from client import get_client
+    from columnar import docs_to_columns, to_columns
+    from decoding import decode, from_docs
+    from filters import find, hold, is_complete
+    from memo import id_cache
+    from pagination import PaginationReport, get_all_docs, iter_pages
+    from sdk_logging import get_logger
+    from sorting import parse_sort, sort
+import copy
+import threading
+
+logger = get_logger(__name__)
 
 # Import api and header
 try:
-    from settings import API, AUTH_HEADER
+    if __package__:
+        from .settings import API
+    else:
+        from settings import API
 except ImportError as e:
-    logging.exception(e)
+    logger.exception(e)
 
 QUOTE_API = f"{API}quote/"
+ID_CACHE = id_cache("quote")
+SORT_FIELDS = ("id", "dialog", "movie", "character")
+# the id fields of a Quote that expand_quotes can resolve to objects
+EXPAND_FIELDS = ("character", "movie")
+
+_subscribers = []
+_subscribers_lock = threading.Lock()
 
 
 @dataclass
@@ -30,11 +56,71 @@ class Quote():
     dialog (str): The quote itself.
     movie (str): The id of the movie that the quote is from.
     character (str): The id of the character that said the quote.
+    character_obj (Character): The character that said the quote, set by expand_quotes.
+    movie_obj (Movie): The movie that the quote is from, set by expand_quotes.
     """
     id: str = ""
     dialog: str = ""
     movie: str = ""
     character: str = ""
+    # not dataclass fields, so records, columns and comparisons only see the ids
+    character_obj = None
+    movie_obj = None
+
+
+
+def quote_from_doc(doc: dict) -> Quote:
+    """
+    A function that receives a quote document from the API and returns a Quote object.
+
+    Arguments
+    ----------
+    doc (dict): The quote document.
+    """
+    return Quote(
+        doc.get("id"),
+        doc.get("dialog"),
+        doc.get("movie"),
+        doc.get("character")
+    )
+
+def subscribe(callback: Callable[[List[Quote]], None]):
+    """
+    A function that registers a callback called with every list of Quotes
+    fetched from the API (a page, a whole pull or a single Quote), i.e. to
+    keep a search.QuoteIndex up to date.
+
+    Arguments
+    ----------
+    callback (function): The function to call with the fetched Quotes.
+    """
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = _subscribers + [callback]
+
+
+def unsubscribe(callback: Callable[[List[Quote]], None]):
+    """
+    A function that unregisters a callback.
+
+    Arguments
+    ----------
+    callback (function): The function registered with subscribe.
+    """
+    global _subscribers
+    with _subscribers_lock:
+        # compared by equality, so that a bound method can be unsubscribed
+        _subscribers = [registered for registered in _subscribers if registered != callback]
+
+
+def _publish(quotes: List[Quote]):
+    # a failing subscriber is logged and never breaks the request
+    for callback in _subscribers:
+        try:
+            callback(quotes)
+        except Exception as e:
+            logger.exception(e)
+
 
 def get_quote_by_id(id:str = "") -> Quote:
     """
@@ -44,101 +130,183 @@ def get_quote_by_id(id:str = "") -> Quote:
     ----------
     id (str): The id of the Quote
     """
+    cached = ID_CACHE.get(id)
+    if cached is not None:
+        return cached
     quote_api_id = f"{QUOTE_API}{id}"
-    results = requests.get(url=quote_api_id, headers=AUTH_HEADER)
+    results = get_client().get(quote_api_id)
     if results.status_code == 200:
-        logging.info(f"Success! You have accessed {quote_api_id}.")
-        results_json = results.json()
-        results_json = results_json["docs"][0]
-        return Quote(
-            results_json.get("id"),
-            results_json.get("dialog"),
-            results_json.get("movie"),
-            results_json.get("character")
-        )
+        logger.info("Success! You have accessed %s.", quote_api_id)
+        results_json = decode(results)
+        quote = quote_from_doc(results_json["docs"][0])
+        ID_CACHE.put(quote.id, quote)
+        if _subscribers:
+            _publish([quote])
+        return quote
     else:
-        logging.error(f"Failed with Status Code {results_json.status_code}. Failed to get Quote from id {id}.")
+        logger.error("Failed with Status Code %s. Failed to get Quote from id %s.", results.status_code, id)
         return None
 
 
-def get_all_quotes(params:dict = {}) -> List:
+def get_quotes_by_ids(ids: List[str], max_workers: int = DEFAULT_MAX_WORKERS) -> List:
+    """
+    A function that receives a list of Quote ids and returns a list of Quote
+    objects in the same order, with None for ids that were not found.
+    Duplicate ids are fetched once, cached Quotes are not fetched again and
+    the rest are pulled with as few requests as possible.
+
+    Arguments
+    ----------
+    ids (list): The ids of the Quotes
+    max_workers (int): The number of threads used for the requests.
+    """
+    return get_by_ids(ids, ID_CACHE, get_all_quotes, get_quote_by_id, max_workers)
+
+
+def _resolvers() -> dict:
+    # characters and movies are only imported when quotes are expanded
+    if __package__:
+        from .characters import get_characters_by_ids
+        from .movies import get_movies_by_ids
+    else:
+        from characters import get_characters_by_ids
+        from movies import get_movies_by_ids
+    return {"character": get_characters_by_ids, "movie": get_movies_by_ids}
+
+
+def expand_quotes(quotes: List[Quote], expand: Iterable[str] = EXPAND_FIELDS, max_workers: int = DEFAULT_MAX_WORKERS) -> List[Quote]:
     """
-    A function that returns a list of all quotes.
+    A function that returns copies of a list of Quotes with their Character
+    and Movie objects attached (as character_obj and movie_obj). Each
+    distinct id is resolved once, from the id cache or with bulk requests
+    filtered on _id, so the number of requests does not grow with the
+    number of quotes. Ids that are not found are attached as None. The
+    Quotes passed in and held by the id cache are shared, so they are left as they are.
+
+    Arguments
+    ----------
+    quotes (list): The Quotes to expand.
+    expand (list): The fields to resolve (character, movie).
+    max_workers (int): The number of threads used for the requests.
+    """
+    expand = list(dict.fromkeys(expand))
+    for name in expand:
+        if name not in EXPAND_FIELDS:
+            raise ValueError(f"{name} is not a valid expand field. Valid options: {', '.join(EXPAND_FIELDS)}")
+    if not quotes or not expand:
+        return quotes
+    resolvers = _resolvers()
+
+    def resolve(name: str) -> dict:
+        ids = list(dict.fromkeys(getattr(quote, name) for quote in quotes if getattr(quote, name)))
+        return dict(zip(ids, resolvers[name](ids, max_workers)))
+
+    # characters and movies are resolved at the same time
+    with ThreadPoolExecutor(max_workers=len(expand)) as executor:
+        resolved = dict(zip(expand, executor.map(resolve, expand)))
+    expanded = [copy.copy(quote) for quote in quotes]
+    for name, objects in resolved.items():
+        attribute = f"{name}_obj"
+        for quote in expanded:
+            setattr(quote, attribute, objects.get(getattr(quote, name)))
+    return expanded
+
+
+def get_all_quotes(params:dict = {}, max_workers: int = 1, report: PaginationReport = None, columnar: bool = False,
+                   limit: int = None, expand: List[str] = None) -> List:
+    """
+    A function that returns a list of all quotes, following every page.
 
     Arguments
     ----------
     params (dict): A dictionary of parameters sent in the API call.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    report (PaginationReport): An optional report filled with per-page latency and total wall time.
+    columnar (bool): Whether to return a ColumnarResult with one column per Quote field.
+    limit (int): The number of quotes per page, a larger limit needs fewer requests.
+    expand (list): The related objects to attach to every Quote (character, movie), see expand_quotes.
+        Columnar results only hold the ids and are not expanded. Their columns are built straight
+        from the documents, so the Quotes are not cached or held.
     """
-    results = requests.get(url=QUOTE_API, params=params, headers=AUTH_HEADER)
-    if results.status_code == 200:
-        logging.info(f"Success! You have accessed {QUOTE_API}.")
-        results_json = results.json()
-        quotes = []
-        for quote in results_json["docs"]:
-            quotes.append(
-                Quote(
-                    quote.get("id"),
-                    quote.get("dialog"),
-                    quote.get("movie"),
-                    quote.get("character")
-                )
-            )
-        # check for more pages to load
-        pages = results_json["pages"]
-        # if there are more than 1 page of chapters, pull the rest of the pages
-        if pages > 1:
-            for page in range(2,pages+1):
-                addl_results = requests.get(QUOTE_API,params={"page": page}, headers=AUTH_HEADER)
-                if addl_results.status_code == 200:
-                    logging.info(f"Success! You have accessed {QUOTE_API} page {page}.")
-                    results_json = addl_results.json()
-                    for quote in results_json["docs"]:
-                        quotes.append(
-                            Quote(
-                                quote.get("id"),
-                                quote.get("dialog"),
-                                quote.get("movie"),
-                                quote.get("character")
-                            )
-                        )
-                else:
-                    logging.error(f"Status {addl_results.status_code}. Failed to get quotes page {page}.")
+    status_code, docs = get_all_docs(QUOTE_API, params, max_workers, report, limit)
+    if status_code == 200:
+        logger.info("Success! You have accessed %s.", QUOTE_API)
+        if columnar:
+            if _subscribers:
+                _publish(from_docs(docs, Quote, quote_from_doc, "id"))
+            return docs_to_columns(docs, Quote, {"id": "id"})
+        quotes = from_docs(docs, Quote, quote_from_doc, "id")
+        ID_CACHE.put_many(quotes)
+        if is_complete(params):
+            hold("quote", quotes)
+        if _subscribers:
+            _publish(quotes)
+        if expand:
+            quotes = expand_quotes(quotes, expand)
         return quotes
     else:
-        logging.error(f"Status {results.status_code}. Failed to get quotes.")
-        return []
+        logger.error("Status %s. Failed to get quotes.", status_code)
+        return to_columns([], Quote) if columnar else []
 
-def get_sorted_quotes(sort_by:str, sort_type: str) -> List:
+
+def iter_quotes(params: dict = {}, prefetch: bool = False, limit: int = None, expand: List[str] = None) -> Iterator[Quote]:
+    """
+    A generator that yields Quote objects page by page, as soon as each
+    page is parsed, instead of building the whole list first.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    prefetch (bool): Whether to fetch the next page in the background.
+    limit (int): The number of quotes per page.
+    expand (list): The related objects to attach to every Quote (character, movie), resolved once per page.
+    """
+    for docs in iter_pages(QUOTE_API, params, prefetch, limit):
+        quotes = from_docs(docs, Quote, quote_from_doc, "id")
+        ID_CACHE.put_many(quotes)
+        if _subscribers:
+            _publish(quotes)
+        if expand:
+            quotes = expand_quotes(quotes, expand)
+        yield from quotes
+
+
+def get_sorted_quotes(sort_by:str, sort_type: str = "asc", limit: int = None) -> List:
     """
     A function that receives an argument to sort by (i.e. id, dialog, movie, character)
     and a sort type (i.e. asc: ascending, desc: descending)
 
+    Several keys can be given with their own direction (i.e. name:asc,_id:desc),
+    sort_type being the direction of the keys without one. The held collection
+    is sorted locally, and fetched once when it isn't held, see sorting.sort.
+    Like the API, missing values come first in ascending sorts and last in descending ones.
+
     Arguments
     ----------
     sort_by (str): The Quote argument to sort by (id, dialog, movie, character)
     sort_type (str): The sort type (asc: ascending, desc: descending)
+    limit (int): The number of Quotes to return, the first ones of the sort. All by default.
     """
-    # check if correct sort_by and sort_type have been passed:
-    if sort_by != "id" and sort_by != "dialog" and sort_by != "movie" and sort_by != "character":
-        logging.error(f"{sort_by} is not a valid argument. Valid options: id, dialog, movie, character")
-        return []
-    if sort_type != "asc" and sort_type != "desc":
-        logging.error(f"{sort_type} is not a valid argument. Valid options: asc, desc")
+    try:
+        keys = parse_sort(sort_by, sort_type)
+    except ValueError as e:
+        logger.error("%s", e)
         return []
+    for field, _ in keys:
+        if field not in SORT_FIELDS:
+            logger.error("%s is not a valid argument. Valid options: %s", field, ", ".join(SORT_FIELDS))
+            return []
 
-    params = {"sort": sort_by+":"+sort_type}
-    results = get_all_quotes(params)
-    return results
+    return sort("quote", keys, limit)
 
 def get_quote_by_regex(quote_arg: str, regex: str) -> List:
     """
     A function that receives a Quotte argument and matches to a regex expression.
+    The whole collection is matched locally once get_all_quotes() fetched it, see filters.find.
 
     Arguments
     ----------
     quote_arg (str): The Quote class argument to match by (i.e. id, dialog, movie, character).
     regex (str): The regex expression used to match with.
     """
-    params = {quote_arg: regex}
-    results = get_all_quotes(params)
-    return results
\ No newline at end of file
+    return find("quote", {quote_arg: regex})
\ No newline at end of file
@@ -0,0 +1,147 @@
+from collections import deque
+from typing import Dict
+import threading
+import random
+import time
+
+# The One API allows 100 requests every 10 minutes per token
+DEFAULT_RATE = 100/600
+DEFAULT_CAPACITY = 100
+THROUGHPUT_WINDOW = 60
+BACKOFF_BASE = 1
+BACKOFF_CAP = 60
+
+
+class RateLimiter():
+    """
+    A class that implements a token bucket shared by every request of a client.
+    Tokens refill at rate per second up to capacity, and each request takes one.
+    When the server answers 429 the whole bucket is paused, so that parallel
+    callers stop together instead of each hitting the limit.
+
+    Attributes
+    ----------
+    rate (float): The number of requests allowed per second.
+    capacity (float): The maximum burst of requests.
+    throttled_time (float): The total time in seconds callers waited for a token.
+    """
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: float = DEFAULT_CAPACITY):
+        self.rate = rate
+        self.capacity = capacity
+        self.throttled_time = 0
+        self.requests = 0
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._resume_at = 0
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at)*self.rate)
+        self._updated_at = now
+
+    def _try_acquire(self, waited: float) -> float:
+        """
+        A function that takes a token if one is available and returns None,
+        or returns how long to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._resume_at:
+                return self._resume_at - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.requests += 1
+                self.throttled_time += waited
+                self._sent.append(now)
+                return None
+            return (1 - self._tokens)/self.rate
+
+    def acquire(self) -> float:
+        """
+        A function that blocks until a request may be sent and returns the time waited.
+        """
+        waited = 0
+        while True:
+            delay = self._try_acquire(waited)
+            if delay is None:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire_async(self) -> float:
+        """
+        A coroutine that waits until a request may be sent, without blocking
+        the event loop, and returns the time waited. It takes its tokens from
+        the same bucket as acquire, so a limiter shared by a Client and an
+        aio.AsyncClient keeps both within one quota.
+        """
+        # asyncio is only imported by the callers of the async API
+        import asyncio
+        waited = 0
+        while True:
+            delay = self._try_acquire(waited)
+            if delay is None:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """
+        A function that stops every caller from sending requests for a number of seconds.
+
+        Arguments
+        ----------
+        seconds (float): The time to pause for.
+        """
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def throughput(self) -> float:
+        """
+        A function that returns the number of requests per second over the last minute.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] > THROUGHPUT_WINDOW:
+                self._sent.popleft()
+            return len(self._sent)/THROUGHPUT_WINDOW
+
+    def stats(self) -> Dict[str, float]:
+        """
+        A function that returns the requests sent, the current throughput and the time spent throttled.
+        """
+        return {
+            "requests": self.requests,
+            "throughput": self.throughput(),
+            "throttled_time": self.throttled_time,
+        }
+
+
+def retry_delay(attempt: int, retry_after: str = None, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """
+    A function that returns how long to wait before retrying a 429 response.
+    The Retry-After header is honored when the server sends one, otherwise
+    the delay is an exponential backoff with full jitter.
+
+    Arguments
+    ----------
+    attempt (int): The number of retries already made.
+    retry_after (str): The Retry-After header, in seconds or as an HTTP date.
+    base (float): The delay in seconds of the first retry.
+    cap (float): The maximum delay in seconds.
+    """
+    if retry_after:
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        # HTTP dates are rare, email.utils is only imported for them
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(cap, base*2**attempt))
@@ -0,0 +1,118 @@
+from typing import Iterable, List
+import dataclasses
+import sys
+if __package__:
+    from .books import Book
+    from .chapters import Chapter
+    from .characters import Character
+    from .movies import Movie
+    from .quotes import Quote
+else:
+    from books import Book
+    from chapters import Chapter
+    from characters import Character
+    from movies import Movie
+    from quotes import Quote
+
+# fields whose values repeat across many objects and are worth interning
+INTERNED_FIELDS = frozenset(("race", "realm", "gender", "hair", "movie", "character", "book"))
+
+
+def _intern_fields(self):
+    for name in self.__slots__:
+        if name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                object.__setattr__(self, name, sys.intern(value))
+
+
+def _getstate(self):
+    return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _setstate(self, state):
+    # frozen records can't use setattr, so restore the slots directly
+    for name, value in state.items():
+        object.__setattr__(self, name, value)
+
+
+def slotted(cls, frozen: bool = False):
+    """
+    A function that returns a variant of a model dataclass (i.e. Character)
+    that stores its fields in __slots__ instead of a per-instance __dict__,
+    interns repeated values (i.e. race, realm, movie and character ids)
+    and is optionally frozen.
+
+    Arguments
+    ----------
+    cls (class): The model dataclass.
+    frozen (bool): Whether the instances are immutable.
+    """
+    name = f"{'Frozen' if frozen else ''}{cls.__name__}Record"
+    fields = []
+    for field in dataclasses.fields(cls):
+        fields.append((field.name, field.type, dataclasses.field(default=field.default, default_factory=field.default_factory)))
+    record = dataclasses.make_dataclass(
+        name, fields, frozen=frozen,
+        namespace={"__post_init__": _intern_fields, "__getstate__": _getstate, "__setstate__": _setstate}
+    )
+    # rebuild the class with __slots__, the same way dataclass(slots=True) does on Python 3.10+
+    namespace = dict(record.__dict__)
+    field_names = tuple(field[0] for field in fields)
+    for field_name in field_names:
+        namespace.pop(field_name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = field_names
+    namespace["__doc__"] = cls.__doc__
+    namespace["__module__"] = __name__
+    record = type(record)(name, record.__bases__, namespace)
+    record.__qualname__ = name
+    return record
+
+
+CharacterRecord = slotted(Character)
+QuoteRecord = slotted(Quote)
+MovieRecord = slotted(Movie)
+ChapterRecord = slotted(Chapter)
+BookRecord = slotted(Book)
+FrozenCharacterRecord = slotted(Character, frozen=True)
+FrozenQuoteRecord = slotted(Quote, frozen=True)
+FrozenMovieRecord = slotted(Movie, frozen=True)
+FrozenChapterRecord = slotted(Chapter, frozen=True)
+FrozenBookRecord = slotted(Book, frozen=True)
+
+_RECORDS = {
+    (Character, False): CharacterRecord, (Character, True): FrozenCharacterRecord,
+    (Quote, False): QuoteRecord, (Quote, True): FrozenQuoteRecord,
+    (Movie, False): MovieRecord, (Movie, True): FrozenMovieRecord,
+    (Chapter, False): ChapterRecord, (Chapter, True): FrozenChapterRecord,
+    (Book, False): BookRecord, (Book, True): FrozenBookRecord,
+}
+
+
+def to_record(obj, frozen: bool = False):
+    """
+    A function that converts a model object (i.e. Character, Quote) to its slotted record.
+
+    Arguments
+    ----------
+    obj: The model object.
+    frozen (bool): Whether the record is immutable.
+    """
+    # lazy objects are subclasses of their model, so look the model up along the mro
+    model = next(cls for cls in type(obj).__mro__ if (cls, frozen) in _RECORDS)
+    record = _RECORDS[(model, frozen)]
+    return record(**{field: getattr(obj, field) for field in record.__slots__})
+
+
+def to_records(objects: Iterable, frozen: bool = False) -> List:
+    """
+    A function that converts a list of model objects to slotted records.
+
+    Arguments
+    ----------
+    objects (list): The model objects (i.e. the result of get_all_quotes()).
+    frozen (bool): Whether the records are immutable.
+    """
+    return [to_record(obj, frozen) for obj in objects]
@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING
+import threading
+import logging
+import atexit
+import queue
+
+LOGGER_NAME = "lotr_sdk"
+DEFAULT_LOG_FILE = "lotr_sdk.log"
+LOG_FORMAT = "%(asctime)s,%(msecs)03d %(levelname)-8s [%(filename)s:%(lineno)d] %(message)s"
+
+# a library only adds a NullHandler, the application decides where records go
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+if TYPE_CHECKING:
+    from logging.handlers import QueueListener
+
+_listener = None
+_queue_handler = None
+_listener_lock = threading.Lock()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    A function that returns the logger of an SDK module (i.e. lotr_sdk.characters),
+    a child of the lotr_sdk logger.
+
+    Arguments
+    ----------
+    name (str): The name of the module (i.e. __name__).
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name.rsplit('.', 1)[-1]}")
+
+
+def enable_file_logging(filename: str = DEFAULT_LOG_FILE, level: int = logging.INFO, format: str = LOG_FORMAT) -> "QueueListener":
+    """
+    A function that writes the SDK's log records to a file from a background
+    thread. Callers only put records on a queue, so requests never wait on
+    disk I/O. Replaces the writer of a previous call.
+
+    Arguments
+    ----------
+    filename (str): The path of the log file.
+    level (int): The minimum level written (i.e. logging.INFO).
+    format (str): The format of each line.
+    """
+    global _listener, _queue_handler
+    from logging.handlers import QueueHandler, QueueListener
+    disable_file_logging()
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(format))
+    records = queue.SimpleQueue()
+    with _listener_lock:
+        _queue_handler = QueueHandler(records)
+        _listener = QueueListener(records, file_handler)
+        _listener.start()
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.addHandler(_queue_handler)
+        logger.setLevel(level)
+    return _listener
+
+
+def disable_file_logging():
+    """
+    A function that stops the background log writer, after writing the records already queued.
+    """
+    global _listener, _queue_handler
+    with _listener_lock:
+        if _listener is None:
+            return
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
+
+
+atexit.register(disable_file_logging)
@@ -0,0 +1,394 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set
+import threading
+import json
+import os
+import re
+if __package__:
+    from .decoding import loads
+    from .quotes import Quote, get_all_quotes, subscribe, unsubscribe
+    from .sdk_logging import get_logger
+else:
+    from decoding import loads
+    from quotes import Quote, get_all_quotes, subscribe, unsubscribe
+    from sdk_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "lotr_sdk", "quote_index.json")
+INDEX_VERSION = 1
+# words, keeping their inner apostrophes (i.e. don't, Sméagol's)
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    A function that splits a text into case folded words.
+
+    Arguments
+    ----------
+    text (str): The text to split (i.e. the dialog of a Quote).
+    """
+    return TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+
+def ngrams(text: str, size: int) -> Set[str]:
+    """
+    A function that returns the distinct character n-grams of a case folded text.
+
+    Arguments
+    ----------
+    text (str): The text to split.
+    size (int): The length of the n-grams (i.e. 3 for trigrams).
+    """
+    text = text.casefold()
+    return {text[i:i+size] for i in range(len(text) - size + 1)}
+
+
+def _positions(value) -> tuple:
+    return (value,) if isinstance(value, int) else tuple(value)
+
+
+class QuoteIndex():
+    """
+    A class that keeps an inverted index of the dialog of Quotes in memory,
+    so that searches are answered without a request. Every word maps to the
+    Quotes containing it and its positions in each of them, which answers
+    term, phrase and prefix queries. Substring queries look for the words
+    containing the text, through an index of the character n-grams of every
+    distinct word when ngram_size is set. Quotes are numbered in the order
+    they were added and results keep that order.
+
+    Attributes
+    ----------
+    ngram_size (int): The length of the character n-grams of the words indexed for contains(), or 0 to index none.
+    """
+    def __init__(self, quotes: Iterable[Quote] = (), ngram_size: int = 0):
+        self.ngram_size = ngram_size
+        self._lock = threading.RLock()
+        self._quotes: List[Quote] = []
+        self._texts: List[str] = []
+        self._numbers: Dict[str, int] = {}
+        # word: {quote number: position}, a tuple of positions when the word is repeated,
+        # so that the usual single position is an int rather than one more list for the gc to track
+        self._postings: Dict[str, Dict[int, object]] = {}
+        # n-gram: the words containing it, so each distinct word is split once
+        self._grams: Dict[str, Set[str]] = {}
+        # the words in order for prefix queries, sorted again after a change
+        self._terms: List[str] = None
+        self.add(quotes)
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._numbers
+
+    def add(self, quotes: Iterable[Quote]):
+        """
+        A function that adds Quotes to the index, or updates them when their
+        id is already indexed. It can be passed to quotes.subscribe (see watch).
+
+        Arguments
+        ----------
+        quotes (list): The Quotes to index.
+        """
+        with self._lock:
+            for quote in quotes:
+                number = self._numbers.get(quote.id)
+                text = (quote.dialog or "").casefold()
+                if number is None:
+                    number = len(self._quotes)
+                    self._numbers[quote.id] = number
+                    self._quotes.append(quote)
+                    self._texts.append("")
+                else:
+                    self._quotes[number] = quote
+                    if self._texts[number] == text:
+                        continue
+                    self._unindex(number)
+                self._index(number, text)
+
+    def remove(self, ids: Iterable[str]):
+        """
+        A function that removes Quotes from the index.
+
+        Arguments
+        ----------
+        ids (list): The ids of the Quotes to remove.
+        """
+        with self._lock:
+            for id in ids:
+                number = self._numbers.pop(id, None)
+                if number is not None:
+                    self._unindex(number)
+                    self._quotes[number] = None
+
+    def _index(self, number: int, text: str):
+        self._texts[number] = text
+        for position, word in enumerate(TOKEN_PATTERN.findall(text)):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                self._terms = None
+                self._index_word(word)
+            previous = postings.get(number)
+            if previous is None:
+                postings[number] = position
+            else:
+                postings[number] = _positions(previous) + (position,)
+
+    def _index_word(self, word: str):
+        if self.ngram_size:
+            for gram in ngrams(word, self.ngram_size):
+                self._grams.setdefault(gram, set()).add(word)
+
+    def _unindex(self, number: int):
+        for word in set(TOKEN_PATTERN.findall(self._texts[number])):
+            postings = self._postings[word]
+            postings.pop(number, None)
+            if not postings:
+                del self._postings[word]
+                self._terms = None
+                if self.ngram_size:
+                    for gram in ngrams(word, self.ngram_size):
+                        words = self._grams[gram]
+                        words.discard(word)
+                        if not words:
+                            del self._grams[gram]
+        self._texts[number] = ""
+
+    def _results(self, numbers: Iterable[int], limit: int = None) -> List[Quote]:
+        numbers = sorted(numbers)
+        if limit is not None:
+            numbers = numbers[:limit]
+        return [self._quotes[number] for number in numbers]
+
+    def _prefixed(self, prefix: str) -> Set[int]:
+        # every word starting with prefix is in one run of the sorted words
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        numbers = set()
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(prefix):
+                break
+            numbers.update(self._postings[term])
+        return numbers
+
+    def _containing(self, fragment: str) -> Set[int]:
+        # the words holding every n-gram of the fragment, or every word for a short fragment
+        if self.ngram_size and len(fragment) >= self.ngram_size:
+            grams = sorted((self._grams.get(gram, set()) for gram in ngrams(fragment, self.ngram_size)), key=len)
+            words = grams[0].intersection(*grams[1:])
+        else:
+            words = self._postings
+        numbers = set()
+        for word in words:
+            if fragment in word:
+                numbers.update(self._postings[word])
+        return numbers
+
+    def term(self, word: str, limit: int = None) -> List[Quote]:
+        """
+        A function that returns the Quotes containing every word of a query, in any order.
+
+        Arguments
+        ----------
+        word (str): The word or words to find (i.e. precious).
+        limit (int): The maximum number of Quotes returned.
+        """
+        words = tokenize(word)
+        if not words:
+            return []
+        with self._lock:
+            postings = sorted((self._postings.get(word, {}) for word in words), key=len)
+            numbers = set(postings[0]).intersection(*postings[1:])
+            return self._results(numbers, limit)
+
+    def phrase(self, text: str, limit: int = None) -> List[Quote]:
+        """
+        A function that returns the Quotes containing the words of a phrase next to each other and in order.
+
+        Arguments
+        ----------
+        text (str): The phrase to find (i.e. you shall not pass).
+        limit (int): The maximum number of Quotes returned.
+        """
+        words = tokenize(text)
+        if not words:
+            return []
+        with self._lock:
+            postings = [self._postings.get(word, {}) for word in words]
+            candidates = set(min(postings, key=len)).intersection(*postings)
+            numbers = []
+            for number in candidates:
+                positions = [set(_positions(posting[number])) for posting in postings[1:]]
+                starts = _positions(postings[0][number])
+                if any(all(start + i + 1 in positions[i] for i in range(len(positions))) for start in starts):
+                    numbers.append(number)
+            return self._results(numbers, limit)
+
+    def prefix(self, prefix: str, limit: int = None) -> List[Quote]:
+        """
+        A function that returns the Quotes containing a word that starts with a prefix.
+
+        Arguments
+        ----------
+        prefix (str): The start of the word (i.e. prec).
+        limit (int): The maximum number of Quotes returned.
+        """
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return []
+        with self._lock:
+            return self._results(self._prefixed(prefix), limit)
+
+    def search(self, query: str, limit: int = None) -> List[Quote]:
+        """
+        A function that answers a search box as it is typed: the Quotes
+        containing every word of the query, the last word being matched as
+        a prefix since it may not be complete yet.
+
+        Arguments
+        ----------
+        query (str): The text typed so far (i.e. my prec).
+        limit (int): The maximum number of Quotes returned.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        # a trailing space means the last word is complete
+        last = None if query[-1:].isspace() else words.pop()
+        with self._lock:
+            sets = [set(self._postings.get(word, ())) for word in words]
+            if last is not None:
+                sets.append(self._prefixed(last))
+            sets.sort(key=len)
+            return self._results(sets[0].intersection(*sets[1:]), limit)
+
+    def contains(self, text: str, limit: int = None) -> List[Quote]:
+        """
+        A function that returns the Quotes whose dialog contains a text,
+        also inside words (i.e. recio matches precious). Only the Quotes
+        holding a word that contains each word of the text are compared.
+
+        Arguments
+        ----------
+        text (str): The text to find.
+        limit (int): The maximum number of Quotes returned.
+        """
+        text = text.casefold()
+        words = tokenize(text)
+        if not words:
+            return []
+        with self._lock:
+            # the first and last words may be cut, the ones between are whole
+            sets = [self._containing(words[0])]
+            if len(words) > 1:
+                sets.append(self._containing(words[-1]))
+                sets.extend(set(self._postings.get(word, ())) for word in words[1:-1])
+            sets.sort(key=len)
+            candidates = sets[0].intersection(*sets[1:])
+            return self._results((number for number in candidates if text in self._texts[number]), limit)
+
+    def watch(self):
+        """
+        A function that keeps the index up to date with every Quote fetched from the API from now on.
+        """
+        subscribe(self.add)
+
+    def unwatch(self):
+        """
+        A function that stops updating the index with fetched Quotes.
+        """
+        unsubscribe(self.add)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "QuoteIndex":
+        """
+        A function that loads an index saved with save(), without tokenizing the Quotes again.
+
+        Arguments
+        ----------
+        path (str): The path of the index file.
+        """
+        with open(path, "rb") as index_file:
+            stored = loads(index_file.read())
+        if stored.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path} was saved by another version of the index, build it again.")
+        index = cls(ngram_size=stored["ngram_size"])
+        for number, fields in enumerate(stored["quotes"]):
+            quote = Quote(*fields) if fields is not None else None
+            index._quotes.append(quote)
+            index._texts.append((quote.dialog or "").casefold() if quote is not None else "")
+            if quote is not None:
+                index._numbers[quote.id] = number
+        # repeated positions come back as lists, which _positions reads like tuples
+        index._postings = {word: dict(zip(*entries)) for word, entries in stored["postings"].items()}
+        for word in index._postings:
+            index._index_word(word)
+        return index
+
+    def save(self, path: str = DEFAULT_INDEX_PATH):
+        """
+        A function that writes the index to disk as json, with its postings so that
+        loading skips tokenizing. The n-grams are rebuilt from the words on load.
+
+        Arguments
+        ----------
+        path (str): The path of the index file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            stored = {
+                "version": INDEX_VERSION,
+                "ngram_size": self.ngram_size,
+                "quotes": [
+                    [quote.id, quote.dialog, quote.movie, quote.character] if quote is not None else None
+                    for quote in self._quotes
+                ],
+                # word: [quote numbers, positions]
+                "postings": {
+                    word: [list(postings), list(postings.values())] for word, postings in self._postings.items()
+                },
+            }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(stored, index_file, separators=(",", ":"), ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def build_quote_index(params: dict = {}, ngram_size: int = 0, max_workers: int = 1) -> QuoteIndex:
+    """
+    A function that fetches all quotes and returns their QuoteIndex.
+
+    Arguments
+    ----------
+    params (dict): A dictionary of parameters sent in the API call.
+    ngram_size (int): The length of the character n-grams indexed, or 0 to index none.
+    max_workers (int): The number of threads used to fetch pages 2..N.
+    """
+    return QuoteIndex(get_all_quotes(params, max_workers), ngram_size)
+
+
+def load_quote_index(path: str = DEFAULT_INDEX_PATH, ngram_size: int = 0, max_workers: int = 1) -> QuoteIndex:
+    """
+    A function that loads the QuoteIndex saved at path, or builds it from
+    all quotes and saves it there when there is none.
+
+    Arguments
+    ----------
+    path (str): The path of the index file.
+    ngram_size (int): The length of the character n-grams indexed when the index is built.
+    max_workers (int): The number of threads used to fetch pages 2..N when the index is built.
+    """
+    if os.path.exists(path):
+        return QuoteIndex.load(path)
+    index = build_quote_index(ngram_size=ngram_size, max_workers=max_workers)
+    if len(index):
+        index.save(path)
+    logger.info("Indexed %s quotes to %s.", len(index), path)
+    return index
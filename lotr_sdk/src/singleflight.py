@@ -0,0 +1,74 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+import threading
+
+
+class _Flight():
+    """
+    A class that holds the outcome of one call in flight, for the callers waiting on it.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight():
+    """
+    A class that lets concurrent calls with the same key share one call:
+    the first caller runs it, and the callers arriving before it returns
+    wait and receive its result, or its exception. Calls made after it
+    returned run again, so nothing is cached.
+
+    Attributes
+    ----------
+    calls (int): The number of calls that ran.
+    coalesced (int): The number of calls that received the result of another one.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        A function that returns the result of func and whether it was shared
+        with a call already in flight under the same key.
+
+        Arguments
+        ----------
+        key (hashable): The key of identical calls (i.e. the url plus params).
+        func (function): The call to run when none is in flight.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def stats(self) -> Dict[str, int]:
+        """
+        A function that returns the number of calls that ran, that were coalesced and that are in flight.
+        """
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._flights)}
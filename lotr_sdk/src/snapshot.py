@@ -0,0 +1,612 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Tuple
+import argparse
+import hashlib
+import gzip
+import json
+import logging
+import math
+import time
+import os
+if __package__:
+    from .books import BOOK_API, Book, book_from_doc, SORT_FIELDS as BOOK_SORT_FIELDS
+    from .chapters import CHAPTER_API, Chapter, chapter_from_doc, SORT_FIELDS as CHAPTER_SORT_FIELDS
+    from .characters import CHARACTER_API, Character, character_from_doc, SORT_FIELDS as CHARACTER_SORT_FIELDS
+    from .movies import MOVIE_API, Movie, movie_from_doc, SORT_FIELDS as MOVIE_SORT_FIELDS
+    from .quotes import QUOTE_API, Quote, quote_from_doc, SORT_FIELDS as QUOTE_SORT_FIELDS
+    from .client import get_client
+    from .decoding import decode, loads
+    from .filters import compile_regex
+    from .sdk_logging import LOG_FORMAT, get_logger
+    from .sorting import sort_key
+else:
+    from books import BOOK_API, Book, book_from_doc, SORT_FIELDS as BOOK_SORT_FIELDS
+    from chapters import CHAPTER_API, Chapter, chapter_from_doc, SORT_FIELDS as CHAPTER_SORT_FIELDS
+    from characters import CHARACTER_API, Character, character_from_doc, SORT_FIELDS as CHARACTER_SORT_FIELDS
+    from movies import MOVIE_API, Movie, movie_from_doc, SORT_FIELDS as MOVIE_SORT_FIELDS
+    from quotes import QUOTE_API, Quote, quote_from_doc, SORT_FIELDS as QUOTE_SORT_FIELDS
+    from client import get_client
+    from decoding import decode, loads
+    from filters import compile_regex
+    from sdk_logging import LOG_FORMAT, get_logger
+    from sorting import sort_key
+
+logger = get_logger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "lotr_sdk", "snapshot.json.gz")
+SNAPSHOT_VERSION = 2
+# the number of docs per page compared by a sync
+SYNC_PAGE_SIZE = 1000
+# the number of sync reports kept in the snapshot file
+SYNC_HISTORY = 30
+
+# collection: (url, from_doc, name field, sort fields)
+COLLECTIONS = {
+    "book": (BOOK_API, book_from_doc, "name", BOOK_SORT_FIELDS),
+    "chapter": (CHAPTER_API, chapter_from_doc, "chapterName", CHAPTER_SORT_FIELDS),
+    "character": (CHARACTER_API, character_from_doc, "name", CHARACTER_SORT_FIELDS),
+    "movie": (MOVIE_API, movie_from_doc, "name", MOVIE_SORT_FIELDS),
+    "quote": (QUOTE_API, quote_from_doc, None, QUOTE_SORT_FIELDS),
+}
+
+
+def _checksum(docs: List[dict]) -> str:
+    # compares the docs of a page downloaded again, as its ETag also covers the total
+    return hashlib.sha1(json.dumps(docs, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CollectionSync():
+    """
+    A class to represent the sync of one collection of a Snapshot.
+
+    Attributes
+    ----------
+    collection (str): The collection (i.e. character, movie).
+    status_code (int): 200, or the status code of the request that failed, in which case the collection was kept as it was.
+    total (int): The number of documents on the server.
+    pages (int): The number of pages compared.
+    fetched_pages (int): The number of pages downloaded, the others being answered 304 Not Modified.
+    changed_pages (int): The number of pages whose documents changed.
+    inserted (int): The number of documents added.
+    updated (int): The number of documents changed.
+    deleted (int): The number of documents removed.
+    bytes (int): The size of the response bodies downloaded.
+    total_time (float): The wall time in seconds of the sync of the collection.
+    """
+    collection: str = ""
+    status_code: int = 200
+    total: int = 0
+    pages: int = 0
+    fetched_pages: int = 0
+    changed_pages: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    bytes: int = 0
+    total_time: float = 0
+
+
+@dataclass
+class SyncReport():
+    """
+    A class to represent one sync of a Snapshot with the server.
+
+    Attributes
+    ----------
+    started_at (float): The time the sync started.
+    collections (list): The CollectionSync of each collection.
+    total_time (float): The wall time in seconds of the whole sync, including rebuilding the indexes.
+    """
+    started_at: float = 0
+    collections: List[CollectionSync] = field(default_factory=list)
+    total_time: float = 0
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether every collection was synced.
+        """
+        return all(result.status_code == 200 for result in self.collections)
+
+
+class Snapshot():
+    """
+    A class that holds a local copy of the five collections and answers
+    the resource modules' queries from it, using hash indexes on id and name
+    and a pre-sorted index per sortable field.
+
+    Attributes
+    ----------
+    docs (dict): The documents of each collection (i.e. {"character": [...]}).
+    created_at (float): The time the snapshot was taken.
+    pages (dict): The page size, ETags and checksums of each collection's pages as of the last sync.
+    syncs (list): The reports of the last syncs, as dictionaries.
+    """
+    def __init__(self, docs: Dict[str, List[dict]], created_at: float = None, pages: Dict[str, dict] = None,
+                 syncs: List[dict] = None):
+        self.docs = docs
+        self.created_at = created_at if created_at is not None else time.time()
+        self.pages = pages if pages is not None else {}
+        self.syncs = syncs if syncs is not None else []
+        self._objects = {}
+        self._by_id = {}
+        self._by_name = {}
+        self._sorted = {}
+        self._build_indexes()
+
+    def _build_indexes(self, collections: List[str] = None):
+        """
+        A function that builds the objects, hash indexes and sort indexes of the given collections, every one by default.
+        """
+        for collection, (url, from_doc, name_field, sort_fields) in COLLECTIONS.items():
+            if collections is not None and collection not in collections:
+                continue
+            docs = self.docs.get(collection, [])
+            objects = [from_doc(doc) for doc in docs]
+            self._objects[collection] = objects
+            self._by_id[collection] = {obj.id: i for i, obj in enumerate(objects)}
+            names = {}
+            if name_field is not None:
+                for i, doc in enumerate(docs):
+                    names.setdefault(doc.get(name_field), i)
+            self._by_name[collection] = names
+            self._sorted[collection] = {
+                field: sorted(range(len(docs)), key=lambda i: sort_key(docs[i].get(field)))
+                for field in sort_fields
+            }
+        if collections is None or "chapter" in collections:
+            chapters_by_book = {}
+            for i, doc in enumerate(self.docs.get("chapter", [])):
+                chapters_by_book.setdefault(doc.get("book"), []).append(i)
+            self._chapters_by_book = chapters_by_book
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SNAPSHOT_PATH) -> "Snapshot":
+        """
+        A function that loads a snapshot from disk.
+
+        Arguments
+        ----------
+        path (str): The path of the snapshot file.
+        """
+        with gzip.open(path, "rb") as snapshot_file:
+            stored = loads(snapshot_file.read())
+        return cls(stored["collections"], stored.get("created_at"), stored.get("pages"), stored.get("syncs"))
+
+    def save(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        """
+        A function that writes the snapshot to disk as gzipped json.
+
+        Arguments
+        ----------
+        path (str): The path of the snapshot file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stored = {
+            "version": SNAPSHOT_VERSION, "created_at": self.created_at, "collections": self.docs,
+            "pages": self.pages, "syncs": self.syncs,
+        }
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as snapshot_file:
+            json.dump(stored, snapshot_file, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def sync(self, max_workers: int = 4, limit: int = SYNC_PAGE_SIZE) -> SyncReport:
+        """
+        A function that brings every collection up to date with the server,
+        downloading only the pages that changed since the last sync. Each page
+        is requested with the ETag it had, so unchanged pages are answered 304
+        without a body; pages of servers without ETags are compared by checksum.
+        Changed pages are applied as upserts and deletes by id, and only the
+        indexes of the collections that changed are rebuilt. A collection whose
+        requests fail is kept as it was.
+
+        Arguments
+        ----------
+        max_workers (int): The number of threads used to fetch the pages of each collection.
+        limit (int): The number of docs per page. Pages of another size are all downloaded again.
+        """
+        report = SyncReport(started_at=time.time())
+        start = time.perf_counter()
+        changed = []
+        for collection, (url, from_doc, name_field, sort_fields) in COLLECTIONS.items():
+            result = self._sync_collection(collection, url, max_workers, limit)
+            report.collections.append(result)
+            if result.inserted or result.updated or result.deleted:
+                changed.append(collection)
+            logger.info("Synced %s %ss: %s of %s pages fetched, %s inserted, %s updated, %s deleted in %.2f seconds.",
+                        result.total, collection, result.fetched_pages, result.pages, result.inserted, result.updated,
+                        result.deleted, result.total_time)
+        if changed:
+            self._build_indexes(changed)
+        report.total_time = time.perf_counter() - start
+        self.syncs = (self.syncs + [asdict(report)])[-SYNC_HISTORY:]
+        return report
+
+    def _sync_collection(self, collection: str, url: str, max_workers: int, limit: int) -> CollectionSync:
+        """
+        A function that syncs one collection and returns what changed.
+        """
+        start = time.perf_counter()
+        result = CollectionSync(collection)
+        client = get_client()
+        # a one doc page gives the number of docs, and so of pages; requests
+        # with headers skip the response cache, which could hold an old total
+        probe = client.get(url, params={"limit": 1}, headers={"Cache-Control": "no-cache"})
+        if probe.status_code != 200:
+            logger.error("Status %s. Failed to sync %ss.", probe.status_code, collection)
+            result.status_code = probe.status_code
+            result.total_time = time.perf_counter() - start
+            return result
+        result.bytes += len(probe.content)
+        result.total = decode(probe).get("total", 0)
+        result.pages = max(math.ceil(result.total/limit), 1)
+        stored = self.pages.get(collection)
+        if stored is None or stored.get("limit") != limit:
+            stored = {"limit": limit, "etags": [], "checksums": []}
+        etags = stored["etags"]
+
+        def fetch(page: int):
+            etag = etags[page-1] if page <= len(etags) else ""
+            return client.get(url, params={"limit": limit, "page": page}, headers={"If-None-Match": etag} if etag else None)
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            responses = list(executor.map(fetch, range(1, result.pages+1)))
+
+        old_docs = self.docs.get(collection, [])
+        docs = []
+        changed_docs = []
+        pages = {"limit": limit, "etags": [], "checksums": []}
+        for page, response in enumerate(responses, start=1):
+            if response.status_code == 304:
+                docs.extend(old_docs[(page-1)*limit:page*limit])
+                pages["etags"].append(etags[page-1])
+                pages["checksums"].append(stored["checksums"][page-1])
+                continue
+            if response.status_code != 200:
+                logger.error("Status %s. Failed to sync %ss page %s.", response.status_code, collection, page)
+                result.status_code = response.status_code
+                result.total_time = time.perf_counter() - start
+                return result
+            result.fetched_pages += 1
+            result.bytes += len(response.content)
+            page_docs = decode(response)["docs"]
+            checksum = _checksum(page_docs)
+            if page > len(stored["checksums"]) or stored["checksums"][page-1] != checksum:
+                result.changed_pages += 1
+                changed_docs.extend(page_docs)
+            docs.extend(page_docs)
+            pages["etags"].append(response.headers.get("ETag", ""))
+            pages["checksums"].append(checksum)
+
+        if changed_docs or len(docs) != len(old_docs):
+            old_by_id = {doc["_id"]: doc for doc in old_docs}
+            for doc in changed_docs:
+                old = old_by_id.get(doc["_id"])
+                if old is None:
+                    result.inserted += 1
+                elif old != doc:
+                    result.updated += 1
+            result.deleted = len(old_by_id.keys() - {doc["_id"] for doc in docs})
+        self.docs[collection] = docs
+        self.pages[collection] = pages
+        result.total_time = time.perf_counter() - start
+        return result
+
+    def count(self, collection: str) -> int:
+        """
+        A function that returns the number of documents in a collection.
+        """
+        return len(self.docs.get(collection, []))
+
+    # Generic queries
+
+    def all(self, collection: str) -> List:
+        """
+        A function that returns every object of a collection.
+
+        Arguments
+        ----------
+        collection (str): The collection (i.e. character, movie).
+        """
+        return list(self._objects[collection])
+
+    def by_id(self, collection: str, id: str):
+        """
+        A function that returns the object of a collection with the given id, or None.
+
+        Arguments
+        ----------
+        collection (str): The collection (i.e. character, movie).
+        id (str): The id of the object.
+        """
+        i = self._by_id[collection].get(id)
+        return self._objects[collection][i] if i is not None else None
+
+    def by_name(self, collection: str, name: str):
+        """
+        A function that returns the object of a collection with the given name, or None.
+
+        Arguments
+        ----------
+        collection (str): The collection (i.e. character, movie).
+        name (str): The name of the object.
+        """
+        i = self._by_name[collection].get(name)
+        return self._objects[collection][i] if i is not None else None
+
+    def sorted(self, collection: str, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns the objects of a collection sorted by sort_by
+        and sort_type (asc, desc), or an empty list if either is invalid.
+
+        Arguments
+        ----------
+        collection (str): The collection (i.e. character, movie).
+        sort_by (str): The argument to sort by (i.e. _id, name).
+        sort_type (str): The sort type (asc: ascending, desc: descending).
+        """
+        index = self._sorted[collection].get(sort_by)
+        if index is None:
+            logger.error("%s is not a valid argument. Valid options: %s", sort_by, ', '.join(self._sorted[collection]))
+            return []
+        if sort_type != "asc" and sort_type != "desc":
+            logger.error("%s is not a valid argument. Valid options: asc, desc", sort_type)
+            return []
+        objects = self._objects[collection]
+        if sort_type == "desc":
+            index = reversed(index)
+        return [objects[i] for i in index]
+
+    def by_regex(self, collection: str, arg: str, regex: str) -> List:
+        """
+        A function that returns the objects of a collection whose argument matches a regex expression.
+
+        Arguments
+        ----------
+        collection (str): The collection (i.e. character, movie).
+        arg (str): The argument to match by (i.e. name, race).
+        regex (str): The regex expression used to match with (i.e. /Belem/i).
+        """
+        pattern = compile_regex(regex)
+        docs = self.docs.get(collection, [])
+        objects = self._objects[collection]
+        return [objects[i] for i, doc in enumerate(docs) if arg in doc and pattern.search(str(doc[arg]))]
+
+    # Books
+
+    def get_all_books(self) -> List:
+        """
+        A function that returns a list of all books from the snapshot.
+        """
+        return self.all("book")
+
+    def get_book_by_id(self, id: str = "") -> Book:
+        """
+        A function that receives a Book id and returns a Book object from the snapshot.
+        """
+        return self.by_id("book", id)
+
+    def get_chapters_by_book_id(self, id: str = "") -> List:
+        """
+        A function that receives a Book id and returns a list of Chapters from the snapshot.
+        """
+        return [self._objects["chapter"][i] for i in self._chapters_by_book.get(id, [])]
+
+    def get_book_by_name(self, name: str = "") -> Book:
+        """
+        A function that receives a Book name and returns a Book object from the snapshot.
+        """
+        return self.by_name("book", name)
+
+    def get_sorted_books(self, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns a list of books from the snapshot sorted by sort_by and sort_type (asc, desc).
+        """
+        return self.sorted("book", sort_by, sort_type)
+
+    def get_book_by_regex(self, book_arg: str, regex: str) -> List:
+        """
+        A function that returns a list of Book objects from the snapshot matching a regex expression.
+        """
+        return self.by_regex("book", book_arg, regex)
+
+    # Chapters
+
+    def get_all_chapters(self) -> List:
+        """
+        A function that returns a list of all chapters from the snapshot.
+        """
+        return self.all("chapter")
+
+    def get_chapter_by_id(self, id: str = "") -> Chapter:
+        """
+        A function that receives a Chapter id and returns a Chapter object from the snapshot.
+        """
+        return self.by_id("chapter", id)
+
+    def get_chapter_by_name(self, name: str = "") -> Chapter:
+        """
+        A function that receives a Chapter name and returns a Chapter object from the snapshot.
+        """
+        return self.by_name("chapter", name)
+
+    def get_sorted_chapters(self, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns a list of chapters from the snapshot sorted by sort_by and sort_type (asc, desc).
+        """
+        return self.sorted("chapter", sort_by, sort_type)
+
+    def get_chapter_by_regex(self, chapter_arg: str, regex: str) -> List:
+        """
+        A function that returns a list of Chapter objects from the snapshot matching a regex expression.
+        """
+        return self.by_regex("chapter", chapter_arg, regex)
+
+    # Characters
+
+    def get_all_characters(self) -> List:
+        """
+        A function that returns a list of all characters from the snapshot.
+        """
+        return self.all("character")
+
+    def get_character_by_id(self, id: str = "") -> Character:
+        """
+        A function that receives a Character id and returns a Character object from the snapshot.
+        """
+        return self.by_id("character", id)
+
+    def get_character_by_name(self, name: str = "") -> Character:
+        """
+        A function that receives a Character name and returns a Character object from the snapshot.
+        """
+        return self.by_name("character", name)
+
+    def get_sorted_characters(self, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns a list of characters from the snapshot sorted by sort_by and sort_type (asc, desc).
+        """
+        return self.sorted("character", sort_by, sort_type)
+
+    def get_character_by_regex(self, char_arg: str, regex: str) -> List:
+        """
+        A function that returns a list of Character objects from the snapshot matching a regex expression.
+        """
+        return self.by_regex("character", char_arg, regex)
+
+    # Movies
+
+    def get_all_movies(self) -> List:
+        """
+        A function that returns a list of all movies from the snapshot.
+        """
+        return self.all("movie")
+
+    def get_movie_by_id(self, id: str = "") -> Movie:
+        """
+        A function that receives a Movie id and returns a Movie object from the snapshot.
+        """
+        return self.by_id("movie", id)
+
+    def get_movie_by_name(self, name: str = "") -> Movie:
+        """
+        A function that receives a Movie name and returns a Movie object from the snapshot.
+        """
+        return self.by_name("movie", name)
+
+    def get_sorted_movies(self, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns a list of movies from the snapshot sorted by sort_by and sort_type (asc, desc).
+        """
+        return self.sorted("movie", sort_by, sort_type)
+
+    def get_movie_by_regex(self, movie_arg: str, regex: str) -> List:
+        """
+        A function that returns a list of Movie objects from the snapshot matching a regex expression.
+        """
+        return self.by_regex("movie", movie_arg, regex)
+
+    # Quotes
+
+    def get_all_quotes(self) -> List:
+        """
+        A function that returns a list of all quotes from the snapshot.
+        """
+        return self.all("quote")
+
+    def get_quote_by_id(self, id: str = "") -> Quote:
+        """
+        A function that receives a Quote id and returns a Quote object from the snapshot.
+        """
+        return self.by_id("quote", id)
+
+    def get_sorted_quotes(self, sort_by: str, sort_type: str) -> List:
+        """
+        A function that returns a list of quotes from the snapshot sorted by sort_by and sort_type (asc, desc).
+        """
+        return self.sorted("quote", sort_by, sort_type)
+
+    def get_quote_by_regex(self, quote_arg: str, regex: str) -> List:
+        """
+        A function that returns a list of Quote objects from the snapshot matching a regex expression.
+        """
+        return self.by_regex("quote", quote_arg, regex)
+
+
+def create_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, max_workers: int = 4) -> Snapshot:
+    """
+    A function that downloads all five collections, saves them to disk
+    and returns the Snapshot. Returns None if a collection fails to download.
+
+    Arguments
+    ----------
+    path (str): The path of the snapshot file.
+    max_workers (int): The number of threads used to fetch the pages of each collection.
+    """
+    snapshot = Snapshot({})
+    if not snapshot.sync(max_workers).ok:
+        return None
+    for collection in COLLECTIONS:
+        logger.info("Success! You have snapshotted %s %ss.", snapshot.count(collection), collection)
+    snapshot.save(path)
+    return snapshot
+
+
+def sync_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, max_workers: int = 4, limit: int = SYNC_PAGE_SIZE) -> Tuple[Snapshot, SyncReport]:
+    """
+    A function that loads the snapshot saved at path, or starts an empty one,
+    downloads only the pages that changed on the server (see Snapshot.sync)
+    and saves it with the sync report. Returns the Snapshot and the SyncReport.
+
+    Arguments
+    ----------
+    path (str): The path of the snapshot file.
+    max_workers (int): The number of threads used to fetch the pages of each collection.
+    limit (int): The number of docs per page.
+    """
+    snapshot = Snapshot.load(path) if os.path.exists(path) else Snapshot({})
+    report = snapshot.sync(max_workers, limit)
+    snapshot.save(path)
+    return snapshot, report
+
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> Snapshot:
+    """
+    A function that loads a snapshot from disk.
+
+    Arguments
+    ----------
+    path (str): The path of the snapshot file.
+    """
+    return Snapshot.load(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot all five collections of The One API to a local file.")
+    parser.add_argument("--path", default=DEFAULT_SNAPSHOT_PATH, help="The path of the snapshot file.")
+    parser.add_argument("--max-workers", type=int, default=4, help="The number of threads used to fetch pages.")
+    parser.add_argument("--sync", action="store_true", help="Only download the pages that changed since the saved snapshot.")
+    parser.add_argument("--limit", type=int, default=SYNC_PAGE_SIZE, help="The number of docs per page compared by --sync.")
+    args = parser.parse_args()
+    # the SDK only logs to a NullHandler, so the command line shows its warnings and errors
+    logging.basicConfig(level=logging.WARNING, format=LOG_FORMAT)
+    if args.sync:
+        snapshot, report = sync_snapshot(args.path, args.max_workers, args.limit)
+        for result in report.collections:
+            print(f"{result.collection}: {result.total} docs, {result.fetched_pages}/{result.pages} pages fetched, "
+                  f"+{result.inserted} ~{result.updated} -{result.deleted}, {result.bytes/1024:.0f} KiB, {result.total_time:.2f}s"
+                  + ("" if result.status_code == 200 else f", failed with status {result.status_code}"))
+        print(f"Synced in {report.total_time:.2f}s, saved to {args.path}")
+        if not report.ok:
+            raise SystemExit("Failed to sync every collection, see the errors above.")
+    else:
+        snapshot = create_snapshot(args.path, args.max_workers)
+        if snapshot is None:
+            raise SystemExit("Failed to create the snapshot, see the errors above.")
+        for collection in COLLECTIONS:
+            print(f"{collection}: {snapshot.count(collection)}")
+        print(f"Saved to {args.path}")
@@ -0,0 +1,212 @@
+from typing import Dict, List, Tuple, Union
+import heapq
+if __package__:
+    from .filters import FETCHERS, _is_number, fetcher, held
+    from .memo import LRUCache
+    from .sdk_logging import get_logger
+else:
+    from filters import FETCHERS, _is_number, fetcher, held
+    from memo import LRUCache
+    from sdk_logging import get_logger
+import threading
+
+logger = get_logger(__name__)
+
+ORDER_CACHE_SIZE = 64
+DIRECTIONS = ("asc", "desc")
+
+
+def sort_key(value):
+    """
+    A function that returns the sort key of a field value: missing values,
+    then numbers, then strings, as the API orders them, so that missing values
+    come first in ascending sorts and last in descending ones. The mock server
+    and Snapshot sort with it too.
+
+    Arguments
+    ----------
+    value: The field value.
+    """
+    return (value is not None, isinstance(value, str), value if value is not None else 0)
+
+
+def parse_sort(keys: Union[str, List[Tuple[str, str]]], sort_type: str = "asc") -> List[Tuple[str, bool]]:
+    """
+    A function that returns the (field, descending) pairs of a sort in the
+    syntax of the API, extended to several keys (i.e. race:asc,name:desc).
+    Pairs it already returned are kept as they are.
+
+    Arguments
+    ----------
+    keys (str or list): The sort keys, as a string or a list of (field, direction) or (field, descending) pairs.
+    sort_type (str): The direction of the keys that don't name one (asc, desc).
+    """
+    if isinstance(keys, str):
+        keys = [key.strip().partition(":")[::2] for key in keys.split(",")]
+    parsed = []
+    for field, direction in keys:
+        if not isinstance(direction, bool):
+            direction = direction or sort_type
+            if not field or direction not in DIRECTIONS:
+                raise ValueError(f"{field}:{direction} is not a valid sort key. Examples: name:asc, race:asc,name:desc")
+            direction = direction == "desc"
+        parsed.append((field, direction))
+    return parsed
+
+
+def _values(objects: List, field: str) -> List:
+    # the models keep the API's _id as id
+    attribute = "id" if field == "_id" else field
+    return [getattr(obj, attribute, None) for obj in objects]
+
+
+def ranks(objects: List, field: str) -> Tuple[List[int], List[int]]:
+    """
+    A function that returns the ascending permutation of a field, as the
+    positions of the objects in sorted order, and the rank of every object,
+    equal values sharing a rank.
+
+    Arguments
+    ----------
+    objects (list): The model objects (i.e. Characters).
+    field (str): The field to sort by (i.e. name).
+    """
+    values = _values(objects, field)
+    try:
+        distinct = set(values)
+        # fields holding only strings or only numbers don't need sort_key
+        if all(isinstance(value, str) for value in distinct) or all(_is_number(value) for value in distinct):
+            distinct = sorted(distinct)
+        else:
+            distinct = sorted(distinct, key=sort_key)
+        position = {value: i for i, value in enumerate(distinct)}
+        rank = [position[value] for value in values]
+    except TypeError:
+        # unhashable values (i.e. lists) are ranked by comparing their sort keys
+        keys = [sort_key(value) for value in values]
+        rank = [0]*len(keys)
+        current = -1
+        previous = None
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            if current < 0 or keys[i] != previous:
+                current += 1
+                previous = keys[i]
+            rank[i] = current
+    return sorted(range(len(rank)), key=rank.__getitem__), rank
+
+
+def _order(n: int, keys: List[Tuple[str, bool]], field_ranks: Dict[str, Tuple[List[int], List[int]]],
+           limit: int = None) -> List[int]:
+    if len(keys) == 1 and not keys[0][1]:
+        order = field_ranks[keys[0][0]][0]
+        return order[:limit] if limit is not None else order
+    # the ranks of every key are packed into one integer per object, so that
+    # objects are compared by a list lookup instead of a tuple built per object
+    combined = [0]*n
+    for field, descending in keys:
+        rank = field_ranks[field][1]
+        width = max(rank, default=0) + 1
+        if descending:
+            combined = [value*width + width - 1 - r for value, r in zip(combined, rank)]
+        else:
+            combined = [value*width + r for value, r in zip(combined, rank)]
+    if limit is not None and limit < n:
+        # partial selection keeps a heap of limit objects instead of sorting all n
+        return heapq.nsmallest(limit, range(n), key=combined.__getitem__)
+    return sorted(range(n), key=combined.__getitem__)
+
+
+def sort_objects(objects: List, keys: Union[str, List[Tuple[str, str]]], limit: int = None) -> List:
+    """
+    A function that returns objects sorted by one or more keys, or only the
+    first limit of them. Objects with equal keys keep their order.
+
+    Arguments
+    ----------
+    objects (list): The model objects (i.e. Characters).
+    keys (str or list): The sort keys (i.e. race:asc,name:desc).
+    limit (int): The number of objects to return, all by default.
+    """
+    keys = parse_sort(keys)
+    field_ranks = {field: ranks(objects, field) for field, _ in keys}
+    return [objects[i] for i in _order(len(objects), keys, field_ranks, limit)]
+
+
+class _SortIndex():
+    """
+    A class that holds the permutations and ranks of the fields of one held
+    collection, computed on first use, and the orders of recent sorts.
+    """
+    def __init__(self, objects: List):
+        self.objects = objects
+        self.fields = {}
+        self.orders = LRUCache(ORDER_CACHE_SIZE)
+        self.lock = threading.Lock()
+
+    def field_ranks(self, fields: List[str]) -> Dict[str, Tuple[List[int], List[int]]]:
+        with self.lock:
+            missing = [field for field in fields if field not in self.fields]
+        for field in missing:
+            computed = ranks(self.objects, field)
+            with self.lock:
+                self.fields.setdefault(field, computed)
+        return {field: self.fields[field] for field in fields}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _index(resource: str, objects: List) -> _SortIndex:
+    with _indexes_lock:
+        index = _indexes.get(resource)
+        # a new list is held every time the collection is fetched again
+        if index is None or index.objects is not objects:
+            index = _SortIndex(objects)
+            _indexes[resource] = index
+        return index
+
+
+def sort(resource: str, keys: Union[str, List[Tuple[str, str]]], limit: int = None) -> List:
+    """
+    A function that returns the objects of a collection sorted by one or more
+    keys (i.e. race:asc,name:desc), or only the first limit of them. The held
+    collection is sorted with cached per-field permutations; when none is held,
+    the whole collection is fetched once, which holds it for the next sorts.
+
+    Arguments
+    ----------
+    resource (str): The name of the resource (i.e. character, movie).
+    keys (str or list): The sort keys, as a string or a list of (field, direction) pairs, see parse_sort.
+    limit (int): The number of objects to return, all by default.
+    """
+    if resource not in FETCHERS:
+        raise ValueError(f"{resource} is not a valid resource. Valid options: {', '.join(FETCHERS)}")
+    keys = parse_sort(keys)
+    if limit is not None and limit < 0:
+        raise ValueError(f"{limit} is not a valid limit. It should be 0 or more")
+    objects = held(resource)
+    if objects is None:
+        fetched = fetcher(resource)()
+        objects = held(resource)
+        if objects is None:
+            # holding is turned off, see filters.configure
+            return sort_objects(fetched, keys, limit)
+    index = _index(resource, objects)
+    spec = ",".join(f"{field}:{'desc' if descending else 'asc'}" for field, descending in keys)
+    order = index.orders.get(spec)
+    if order is None:
+        if limit is not None and limit < len(objects):
+            order = _order(len(objects), keys, index.field_ranks([field for field, _ in keys]), limit)
+            return [objects[i] for i in order]
+        order = _order(len(objects), keys, index.field_ranks([field for field, _ in keys]))
+        index.orders.put(spec, order)
+    return [objects[i] for i in order[:limit]]
+
+
+def clear():
+    """
+    A function that drops every cached permutation, rank and order.
+    """
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,171 @@
+import unittest
+import threading
+import asyncio
+import json
+import os
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import aio
+import memo
+from cache import DiskCache
+from ratelimit import RateLimiter
+
+MOVIE = {
+    "_id": "5cd95395de30eff6ebccde5d",
+    "name": "The Return of the King",
+    "runtimeInMinutes": 201,
+    "budgetInMillions": 94,
+    "boxOfficeRevenueInMillions": 1120,
+    "academyAwardNominations": 11,
+    "academyAwardWins": 11,
+    "rottenTomatoesScore": 95
+}
+
+CHARACTER = {
+    "_id": "c1", "height": "1.06m", "race": "Hobbit", "gender": "Male", "birth": "22 September ,TA 2968",
+    "spouse": "", "death": "Unknown", "realm": "", "hair": "Brown", "name": "Frodo Baggins",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that serves one movie by id and three pages of quotes,
+    and answers every other request for a character with 429.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.requests += 1
+        if url.path.startswith("/v2/character/"):
+            self.server.character_requests += 1
+            if self.server.character_requests % 2:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            results_json = {"docs": [CHARACTER], "total": 1, "pages": 1}
+        elif url.path.startswith("/v2/movie/"):
+            results_json = {"docs": [MOVIE], "total": 1, "pages": 1}
+        else:
+            page = int(query.get("page", ["1"])[0])
+            docs = [{"_id": f"{page}", "id": f"{page}", "dialog": query.get("dialog", [""])[0]}]
+            results_json = {"docs": docs, "total": 3, "pages": 3}
+        body = json.dumps(results_json).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAio(unittest.TestCase):
+    """
+    Testing suite for aio.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = 0
+        self.server.character_requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api = f"http://127.0.0.1:{self.server.server_port}/v2/"
+        memo.configure()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        memo.configure()
+
+    def _run(self, coroutine_function, **kwargs):
+        """
+        Run coroutine_function against the local server with a fresh AsyncClient.
+        """
+        async def main():
+            client = await aio.configure(api=self.api, headers={}, max_concurrency=4, **kwargs)
+            try:
+                return await coroutine_function()
+            finally:
+                await client.close()
+        return asyncio.run(main())
+
+    def test_get_movie_by_id(self):
+        """
+        Test aio.get_movie_by_id().
+        """
+        movie = self._run(lambda: aio.get_movie_by_id(MOVIE["_id"]))
+        self.assertEqual(movie.id, MOVIE["_id"])
+        self.assertEqual(movie.name, "The Return of the King")
+        self.assertEqual(movie.academyAwardWins, 11)
+
+    def test_get_all_pages_concurrently(self):
+        """
+        Test that the async list functions return every page in order.
+        """
+        async def many():
+            return await asyncio.gather(*[aio.get_quote_by_regex("dialog", "/Mama/i") for _ in range(20)])
+        results = self._run(many)
+        self.assertEqual(len(results), 20)
+        for quotes in results:
+            self.assertEqual([quote.id for quote in quotes], ["1", "2", "3"])
+            self.assertTrue(all(quote.dialog == "/Mama/i" for quote in quotes))
+
+    def test_rate_limit_and_retry(self):
+        """
+        Test that async requests take their tokens from a shared RateLimiter and retry 429 responses.
+        """
+        limiter = RateLimiter(rate=1000, capacity=10)
+
+        async def get():
+            return await aio.get_character_by_id("c1"), aio.get_async_client().retries
+        character, retries = self._run(get, rate_limiter=limiter, max_retries=2)
+        self.assertEqual(character.name, "Frodo Baggins")
+        self.assertEqual(retries, 1)
+        self.assertEqual(self.server.character_requests, 2)
+        self.assertEqual(limiter.stats()["requests"], 2)
+
+    def test_cache(self):
+        """
+        Test that async requests are answered from a DiskCache.
+        """
+        async def twice():
+            client = aio.get_async_client()
+            first = await client.get(f"{self.api}movie/{MOVIE['_id']}")
+            second = await client.get(f"{self.api}movie/{MOVIE['_id']}")
+            return first, second
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(os.path.join(directory, "cache.sqlite3"))
+            first, second = self._run(twice, cache=cache)
+            self.assertEqual(cache.stats()["hits"], 1)
+            cache.close()
+        self.assertEqual(first, second)
+        self.assertEqual(second[1]["docs"][0]["name"], "The Return of the King")
+        self.assertEqual(self.server.requests, 1)
+
+    def test_new_loop_closes_old_client(self):
+        """
+        Test that the shared AsyncClient of an earlier event loop is closed when another loop replaces it.
+        """
+        async def first():
+            await aio.configure(api=self.api, headers={})
+            await aio.get_movie_by_id(MOVIE["_id"])
+            return aio.get_async_client()
+
+        async def second():
+            return aio.get_async_client()
+        old_client = asyncio.run(first())
+        self.assertFalse(old_client.session.closed)
+        new_client = asyncio.run(second())
+        self.assertIsNot(new_client, old_client)
+        self.assertTrue(old_client.session.closed)
+        aio._discard(new_client)
+        self.assertTrue(new_client.session.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import client
+import memo
+from characters import ID_CACHE, Character, get_characters_by_ids
+
+KNOWN_IDS = ["c1", "c2", "c3", "c4"]
+
+
+def _character(id: str) -> dict:
+    return {
+        "_id": id, "height": "", "race": "Hobbit", "gender": "Male", "birth": "",
+        "spouse": "", "death": "", "realm": "", "hair": "", "name": f"Character {id}"
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that filters characters on _id and serves single characters by id.
+    Ids in self.server.unlisted are left out of list responses.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.paths.append(url.path)
+        last = url.path.rstrip("/").split("/")[-1]
+        if last == "character":
+            ids = parse_qs(url.query).get("_id", [""])[0].split(",")
+            docs = [_character(id) for id in ids if id in KNOWN_IDS and id not in self.server.unlisted]
+        elif last in KNOWN_IDS:
+            docs = [_character(last)]
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"docs": docs, "total": len(docs), "pages": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestBatch(unittest.TestCase):
+    """
+    Testing suite for batch.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.paths = []
+        self.server.unlisted = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        client.configure(api=f"http://127.0.0.1:{self.server.server_port}/v2/", headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        client.configure()
+        memo.configure()
+
+    def test_get_characters_by_ids(self):
+        """
+        Test that get_characters_by_ids() keeps input order, dedupes and uses the cache.
+        """
+        ID_CACHE.put("c1", Character(id="c1", name="Cached"))
+        characters = get_characters_by_ids(["c2", "c1", "c3", "c2", "c9"])
+        self.assertEqual([c.id if c else None for c in characters], ["c2", "c1", "c3", "c2", None])
+        self.assertEqual(characters[1].name, "Cached")
+        self.assertIs(characters[0], characters[3])
+        # one list pull for c2, c3, c9 and one by id fetch for c9
+        self.assertEqual(sorted(self.server.paths), ["/v2/character/", "/v2/character/c9"])
+
+    def test_missing_from_list_pull_fetched_by_id(self):
+        """
+        Test that ids left out of the list pull are fetched one by one.
+        """
+        self.server.unlisted = {"c4"}
+        characters = get_characters_by_ids(["c3", "c4"])
+        self.assertEqual([c.id for c in characters], ["c3", "c4"])
+        self.assertIn("/v2/character/c4", self.server.paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 import os
 import sys
+import client
+import memo
+from mock_server import MockServer
 from books import (
     Book,
     get_all_books,
@@ -8,8 +11,11 @@ from books import (
     get_chapters_by_book_id,
     get_book_by_name,
     get_book_by_regex,
-    get_sorted_books
+    get_sorted_books,
+    hydrate_books
 )
+from chapters import get_chapter_by_id
+from filters import find
 
 
 class TestBooks(unittest.TestCase):
@@ -79,8 +85,66 @@ class TestBooks(unittest.TestCase):
         test_books = get_book_by_regex("name", "/Fellowship/i")
         self.assertIn("Fellowship",test_books[0].name)
 
-    
+
+class TestBookChapters(unittest.TestCase):
+    """
+    Testing suite for hydrating books with their chapters, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer().start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+
+    def test_get_all_books_with_chapters(self):
+        """
+        Test that get_all_books(chapters=True) hydrates every book with one request for all chapters.
+        """
+        books = get_all_books(chapters=True)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(sum(len(book.chapters) for book in books), 62)
+        for book in books:
+            expected = [doc["_id"] for doc in self.server.fixtures["chapter"] if doc["book"] == book.id]
+            self.assertEqual([chapter.id for chapter in book.chapters], expected)
+            for chapter in book.chapters:
+                self.assertEqual(chapter.book, book.id)
+                self.assertIs(chapter.book_obj, book)
+        self.assertEqual(get_all_books()[0].chapters, [])
+
+    def test_hydrate_leaves_cached_objects(self):
+        """
+        Test that hydrating returns copies, leaving the books and chapters held by the id caches as they were.
+        """
+        books = get_all_books(chapters=True)
+        cached = get_book_by_id(books[0].id)
+        self.assertIsNot(cached, books[0])
+        self.assertEqual(cached.chapters, [])
+        chapter = get_chapter_by_id(books[0].chapters[0].id)
+        self.assertIsNone(chapter.book_obj)
+        self.assertEqual(find("book", "_id=" + books[0].id)[0].chapters, [])
+
+    def test_hydrate_filtered_books(self):
+        """
+        Test that hydrating some of the books only pulls their chapters.
+        """
+        book = get_book_by_id(self.server.fixtures["book"][1]["_id"])
+        hydrated = hydrate_books([book])
+        self.assertEqual(len(hydrated[0].chapters), 21)
+        self.assertEqual(hydrate_books([]), [])
+
+    def test_get_chapters_by_book_id_sets_book(self):
+        """
+        Test that get_chapters_by_book_id() sets the book of every Chapter.
+        """
+        id = self.server.fixtures["book"][0]["_id"]
+        chapters = get_chapters_by_book_id(id)
+        self.assertEqual(len(chapters), 21)
+        self.assertTrue(all(chapter.book == id for chapter in chapters))
+
+
 if __name__ == "__main__":
     unittest.main()
-
-    
\ No newline at end of file
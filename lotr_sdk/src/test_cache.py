@@ -0,0 +1,117 @@
+import unittest
+import threading
+import tempfile
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cache import DiskCache, resource_of
+from client import Client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that serves one page of characters with an ETag and
+    answers 304 when the ETag is sent back.
+    """
+    protocol_version = "HTTP/1.1"
+    etag = '"v1"'
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"docs": [{"_id": "1", "path": self.path}], "total": 1, "pages": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCache(unittest.TestCase):
+    """
+    Testing suite for cache.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api = f"http://127.0.0.1:{self.server.server_port}/v2/"
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_resource_of(self):
+        """
+        Test resource_of().
+        """
+        self.assertEqual(resource_of("https://the-one-api.dev/v2/character/5cd99d4bde30eff6ebccfbbf"), "character")
+        self.assertEqual(resource_of("https://the-one-api.dev/v2/book/1/chapter"), "book")
+        self.assertEqual(resource_of("https://the-one-api.dev/v2/"), "")
+
+    def test_warm_restart_makes_no_requests(self):
+        """
+        Test that a new Client on the same cache file serves fresh entries from disk.
+        """
+        cache = DiskCache(self.path)
+        client = Client(api=self.api, headers={}, cache=cache)
+        first = client.get(f"{self.api}character/", params={"name": "Adanel"})
+        client.close()
+        cache.close()
+        self.assertEqual(self.server.requests, 1)
+
+        cache = DiskCache(self.path)
+        client = Client(api=self.api, headers={}, cache=cache)
+        second = client.get(f"{self.api}character/", params={"name": "Adanel"})
+        client.close()
+        self.assertEqual(self.server.requests, 1)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(cache.stats()["hits"], 1)
+        cache.close()
+
+    def test_stale_entry_is_revalidated(self):
+        """
+        Test that an expired entry is revalidated with If-None-Match.
+        """
+        cache = DiskCache(self.path, ttl={"quote": 0})
+        client = Client(api=self.api, headers={}, cache=cache)
+        client.get(f"{self.api}quote/")
+        results = client.get(f"{self.api}quote/")
+        client.close()
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(results.status_code, 200)
+        self.assertEqual(results.json()["docs"][0]["_id"], "1")
+        self.assertEqual(cache.stats()["revalidations"], 1)
+        cache.close()
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entries are evicted past max_size.
+        """
+        cache = DiskCache(self.path, max_size=300)
+        client = Client(api=self.api, headers={}, cache=cache)
+        for page in range(1, 6):
+            client.get(f"{self.api}quote/", params={"page": page})
+        client.close()
+        stats = cache.stats()
+        self.assertLessEqual(stats["size"], 300)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNotNone(cache.get(f"{self.api}quote/", {"page": 5}))
+        self.assertIsNone(cache.get(f"{self.api}quote/", {"page": 1}))
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
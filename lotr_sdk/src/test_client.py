@@ -0,0 +1,65 @@
+import unittest
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from client import Client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that answers every GET with an empty page of docs.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"docs": [], "total": 0, "pages": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestClient(unittest.TestCase):
+    """
+    Testing suite for client.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.api = f"http://127.0.0.1:{self.server.server_port}/v2/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_client_reuses_connections(self):
+        """
+        Test that sequential requests share one keep-alive connection.
+        """
+        client = Client(api=self.api, headers={}, pool_size=2)
+        for _ in range(5):
+            results = client.get(f"{self.api}character/")
+            self.assertEqual(results.status_code, 200)
+        stats = client.stats()
+        client.close()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["connections_reused"], 4)
+
+    def test_client_sends_headers(self):
+        """
+        Test that the Client sends its headers with every request.
+        """
+        client = Client(api=self.api, headers={"Authorization": "Bearer abc"})
+        results = client.get(f"{self.api}movie/")
+        client.close()
+        self.assertEqual(results.request.headers["Authorization"], "Bearer abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
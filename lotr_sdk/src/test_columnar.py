@@ -0,0 +1,124 @@
+import unittest
+import math
+import numpy
+import client
+import memo
+from array import array
+from books import Book
+from columnar import ColumnarResult, docs_to_columns, to_columns
+from mock_server import MockServer
+from movies import ID_CACHE, Movie, get_all_movies
+from quotes import Quote
+
+
+MOVIES = [
+    Movie("m1", "The Fellowship of the Ring", 178, 93, 871.5, 13, 4, 91),
+    Movie("m2", "The Two Towers", 179, 94, 926, 6, 2, 96),
+    Movie("m3", "The Return of the King", 201, 94, 1120, 11, 11, 95),
+    Movie("m4", "The Unexpected Journey", 169, 200, 1021, 3, 1, 64),
+]
+
+
+class TestColumnar(unittest.TestCase):
+    """
+    Testing suite for columnar.py.
+    """
+    def test_columns(self):
+        """
+        Test that numeric fields become float64 columns and the rest stay lists.
+        """
+        result = to_columns(MOVIES, Movie)
+        self.assertEqual(len(result), 4)
+        self.assertIsInstance(result["budgetInMillions"], numpy.ndarray)
+        self.assertEqual(result["budgetInMillions"].dtype, numpy.float64)
+        self.assertEqual(result["name"][1], "The Two Towers")
+        self.assertEqual(len(to_columns([], Movie)), 0)
+
+    def test_where_sort_aggregate(self):
+        """
+        Test filtering, sorting and aggregating with and without numpy.
+        """
+        for use_numpy in (True, False):
+            result = to_columns(MOVIES, Movie, use_numpy=use_numpy)
+            expensive = result.where("budgetInMillions", ">", 93)
+            self.assertEqual(list(expensive["id"]), ["m2", "m3", "m4"])
+            ranked = expensive.sort("boxOfficeRevenueInMillions", descending=True)
+            self.assertEqual(list(ranked["id"]), ["m3", "m4", "m2"])
+            self.assertEqual(result.aggregate("academyAwardWins", "sum"), 18)
+            self.assertEqual(result.aggregate("runtimeInMinutes", "max"), 201)
+            self.assertAlmostEqual(result.aggregate("budgetInMillions", "mean"), 120.25)
+            self.assertEqual(result.aggregate("id", "count"), 4)
+            with self.assertRaises(ValueError):
+                result.aggregate("academyAwardWins", "median")
+
+    def test_docs(self):
+        """
+        Test that columns built from API documents match the columns of their model objects.
+        """
+        docs = [{"_id": movie.id, **{key: value for key, value in vars(movie).items() if key != "id"}} for movie in MOVIES]
+        del docs[3]["rottenTomatoesScore"]
+        for use_numpy in (True, False):
+            result = docs_to_columns(docs, Movie, use_numpy=use_numpy)
+            expected = to_columns(MOVIES, Movie, use_numpy=use_numpy)
+            self.assertEqual(list(result["id"]), list(expected["id"]))
+            self.assertEqual(list(result["budgetInMillions"]), list(expected["budgetInMillions"]))
+            self.assertTrue(math.isnan(result["rottenTomatoesScore"][3]))
+            self.assertEqual(result.rows()[:3], MOVIES[:3])
+        quotes = docs_to_columns([{"id": "q1", "dialog": "Po-tay-toes"}, {"id": "q2"}], Quote, {"id": "id"})
+        self.assertEqual(quotes["id"], ["q1", "q2"])
+        self.assertEqual(quotes["dialog"], ["Po-tay-toes", ""])
+        self.assertEqual(docs_to_columns([{"_id": "b1"}], Book)["chapters"], [[]])
+
+    def test_get_all_columnar(self):
+        """
+        Test that get_all_movies(columnar=True) returns the columns of the movies without caching them.
+        """
+        memo.configure()
+        with MockServer() as server:
+            client.configure(api=server.api, headers={})
+            try:
+                result = get_all_movies(columnar=True)
+                self.assertIsNone(ID_CACHE.get(result["id"][0]))
+                self.assertEqual(result.rows(), get_all_movies())
+            finally:
+                client.configure()
+                memo.configure()
+
+    def test_empty_aggregate(self):
+        """
+        Test that aggregates of an empty result are nan, and count is 0.
+        """
+        for use_numpy in (True, False):
+            empty = to_columns(MOVIES, Movie, use_numpy=use_numpy).where("budgetInMillions", ">", 1000)
+            self.assertEqual(len(empty), 0)
+            for func in ("sum", "mean", "min", "max"):
+                self.assertTrue(math.isnan(empty.aggregate("budgetInMillions", func)))
+            self.assertEqual(empty.aggregate("budgetInMillions", "count"), 0)
+            self.assertTrue(math.isnan(to_columns([], Movie, use_numpy=use_numpy).aggregate("runtimeInMinutes", "mean")))
+
+    def test_rows(self):
+        """
+        Test that rows materialize back to equal model objects.
+        """
+        for use_numpy in (True, False):
+            rows = to_columns(MOVIES, Movie, use_numpy=use_numpy).rows()
+            self.assertEqual(rows, MOVIES)
+            self.assertIsInstance(rows[0].runtimeInMinutes, int)
+            self.assertEqual(rows[0].boxOfficeRevenueInMillions, 871.5)
+
+    def test_to_numpy(self):
+        """
+        Test that numeric columns are handed to numpy without copying.
+        """
+        result = to_columns(MOVIES, Movie)
+        arrays = result.to_numpy()
+        self.assertIs(arrays["budgetInMillions"], result["budgetInMillions"])
+        fallback = ColumnarResult.from_objects(MOVIES, Movie, use_numpy=False)
+        self.assertIsInstance(fallback["budgetInMillions"], array)
+        arrays = fallback.to_numpy()
+        self.assertTrue(numpy.shares_memory(arrays["budgetInMillions"], numpy.frombuffer(fallback["budgetInMillions"])))
+        self.assertEqual(arrays["name"].dtype, object)
+
+
+if __name__ == "__main__":
+    unittest.main()
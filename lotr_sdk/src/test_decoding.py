@@ -0,0 +1,91 @@
+import unittest
+import dataclasses
+import pickle
+import decoding
+from decoding import configure, decode, from_docs, lazy_model, loads
+from characters import Character, character_from_doc
+from quotes import Quote, quote_from_doc
+from records import CharacterRecord, to_record
+
+
+DOC = {
+    "_id": "5cd99d4bde30eff6ebccfbbe", "height": "", "race": "Human", "gender": "Female",
+    "birth": "", "spouse": "Belemir", "death": "", "realm": "", "hair": "", "name": "Adanel"
+}
+
+
+class _Response():
+    """
+    A stand-in for requests.Response that only has a body.
+    """
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+class TestDecoding(unittest.TestCase):
+    """
+    Testing suite for decoding.py.
+    """
+    def tearDown(self):
+        configure(backend=decoding.DEFAULT_BACKEND, lazy=False)
+
+    def test_backends(self):
+        """
+        Test that every backend parses the same bytes and unknown ones are refused.
+        """
+        content = '{"docs": [{"name": "Éowyn"}], "total": 1}'.encode("utf-8")
+        for backend in decoding.BACKENDS:
+            configure(backend=backend)
+            self.assertEqual(decoding.backend(), backend)
+            self.assertEqual(loads(content)["docs"][0]["name"], "Éowyn")
+            self.assertEqual(decode(_Response(content))["total"], 1)
+        with self.assertRaises(ValueError):
+            configure(backend="simdjson")
+
+    def test_lazy_object(self):
+        """
+        Test that a lazy object only keeps its document until a field is read.
+        """
+        character = lazy_model(Character, character_from_doc)(DOC)
+        self.assertIsInstance(character, Character)
+        self.assertEqual(character.id, DOC["_id"])
+        self.assertIn("_doc", character.__dict__)
+        self.assertEqual(character.name, "Adanel")
+        self.assertNotIn("_doc", character.__dict__)
+        self.assertEqual(character, character_from_doc(DOC))
+        self.assertEqual(character_from_doc(DOC), character)
+        self.assertEqual(dataclasses.asdict(character), dataclasses.asdict(character_from_doc(DOC)))
+
+    def test_set_before_build(self):
+        """
+        Test that fields set before the object is built are kept.
+        """
+        character = lazy_model(Character, character_from_doc)(DOC)
+        character.name = "Adanel of the House of Hador"
+        self.assertEqual(character.race, "Human")
+        self.assertEqual(character.name, "Adanel of the House of Hador")
+
+    def test_from_docs(self):
+        """
+        Test that from_docs is eager by default and lazy once configured.
+        """
+        docs = [{"_id": "q1", "id": "q1", "dialog": "Deagol!", "movie": "m1", "character": "c1"}]
+        self.assertIs(type(from_docs(docs, Quote, quote_from_doc, "id")[0]), Quote)
+        configure(lazy=True)
+        quote = from_docs(docs, Quote, quote_from_doc, "id")[0]
+        self.assertIsNot(type(quote), Quote)
+        self.assertEqual(quote, Quote("q1", "Deagol!", "m1", "c1"))
+
+    def test_lazy_pickle_and_records(self):
+        """
+        Test that lazy objects pickle as their model and convert to records.
+        """
+        character = lazy_model(Character, character_from_doc)(DOC)
+        restored = pickle.loads(pickle.dumps(character))
+        self.assertIs(type(restored), Character)
+        self.assertEqual(restored, character)
+        self.assertIsInstance(to_record(character), CharacterRecord)
+
+
+if __name__ == "__main__":
+    unittest.main()
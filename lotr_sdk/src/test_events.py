@@ -0,0 +1,100 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import client
+import events
+import aio
+from cache import DiskCache
+from events import RequestEvent, add_hook, remove_hook
+from mock_server import MockServer
+from characters import CHARACTER_API, get_all_characters, get_character_by_id
+
+
+class TestEvents(unittest.TestCase):
+    """
+    Testing suite for events.py.
+    """
+    def setUp(self):
+        self.server = MockServer(page_size=400).start()
+        client.configure(api=self.server.api, headers={})
+        self.events = []
+        add_hook(self.events.append)
+
+    def tearDown(self):
+        remove_hook(self.events.append)
+        self.server.stop()
+        client.configure()
+
+    def test_list_events(self):
+        """
+        Test that every page of a list call emits an event with its timings.
+        """
+        characters = get_all_characters()
+        self.assertEqual([event.page for event in self.events], [1, 2, 3])
+        first, second = self.events[0], self.events[1]
+        self.assertEqual(first.resource, "character")
+        self.assertEqual(first.status, 200)
+        self.assertGreater(first.bytes, 0)
+        self.assertGreater(first.connect_time, 0)
+        self.assertGreater(first.ttfb, 0)
+        self.assertGreaterEqual(first.total_time, first.ttfb)
+        # the pooled connection is reused for the next pages
+        self.assertEqual(second.connect_time, 0)
+        self.assertEqual(second.dns_time, 0)
+        get_character_by_id(characters[0].id + "x")
+        self.assertIsNone(self.events[-1].page)
+        self.assertEqual(self.events[-1].status, 404)
+
+    def test_retries_and_cache(self):
+        """
+        Test that retries and cache outcomes are recorded.
+        """
+        self.server.stop()
+        with tempfile.TemporaryDirectory() as directory, MockServer(error_rate=0.5, error_status=429, seed=3) as server:
+            cache = DiskCache(os.path.join(directory, "cache.sqlite3"))
+            client.configure(api=server.api, headers={}, cache=cache, max_retries=20)
+            client.get_client().get(CHARACTER_API, {"limit": 5})
+            client.get_client().get(CHARACTER_API, {"limit": 5})
+            cache.close()
+            errors = server.errors
+        self.assertGreater(errors, 0)
+        self.assertEqual(self.events[0].cache, "miss")
+        self.assertEqual(self.events[0].retries, errors)
+        self.assertEqual(self.events[1].cache, "hit")
+        self.assertEqual(self.events[1].retries, 0)
+
+    def test_failing_hook(self):
+        """
+        Test that a failing hook does not break the request.
+        """
+        def broken(event: RequestEvent):
+            raise ValueError("broken hook")
+
+        add_hook(broken)
+        try:
+            self.assertEqual(client.get_client().get(CHARACTER_API).status_code, 200)
+        finally:
+            remove_hook(broken)
+        self.assertEqual(len(self.events), 1)
+        self.assertNotIn(broken, events.hooks())
+
+    def test_async_events(self):
+        """
+        Test that the async client emits events too.
+        """
+        async def run():
+            await aio.configure(api=self.server.api, headers={})
+            characters = await aio.get_all_characters()
+            await aio.get_async_client().close()
+            return characters
+
+        characters = asyncio.run(run())
+        self.assertEqual(len(characters), len(self.server.fixtures["character"]))
+        self.assertEqual(sorted(event.page for event in self.events), [1, 2, 3])
+        self.assertTrue(all(event.status == 200 and event.bytes > 0 for event in self.events))
+        self.assertGreater(self.events[0].connect_time, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
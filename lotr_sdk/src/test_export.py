@@ -0,0 +1,125 @@
+import unittest
+import json
+import os
+import tempfile
+import pyarrow
+import pyarrow.parquet
+import requests
+import client
+from export import RESOURCES, export, export_schema
+from mock_server import MockServer, synthetic_fixtures
+from movies import Movie
+
+
+class _ResetClient(client.Client):
+    """
+    A Client whose request for page 2 of quotes raises a ConnectionError.
+    """
+    def get(self, url, params=None, headers=None):
+        if "/quote/" in url and params and params.get("page") == 2:
+            raise requests.ConnectionError("Connection reset by peer")
+        return super().get(url, params, headers)
+
+
+class TestExport(unittest.TestCase):
+    """
+    Testing suite for export.py, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer(synthetic_fixtures({"character": 250, "quote": 420})).start()
+        client.configure(api=self.server.api, headers={})
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.server.stop()
+        client.configure()
+
+    def test_schema(self):
+        """
+        Test that numeric fields are exported as float64 and the lists of other resources are left out.
+        """
+        schema = export_schema(Movie)
+        self.assertEqual(schema.field("budgetInMillions").type, pyarrow.float64())
+        self.assertEqual(schema.field("name").type, pyarrow.string())
+        self.assertNotIn("chapters", export_schema(RESOURCES["book"][1]).names)
+
+    def test_parquet(self):
+        """
+        Test that every resource is written to a Parquet file in page order, with the rows of each stage.
+        """
+        report = export(self.directory.name, processes=2, max_pending=2, limit=100)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.rows, sum(len(docs) for docs in self.server.fixtures.values()))
+        quotes = report.resources["quote"]
+        self.assertEqual((quotes.pages, quotes.rows), (5, 420))
+        table = pyarrow.parquet.read_table(quotes.path)
+        self.assertEqual(table.column("id").to_pylist(), [doc["_id"] for doc in self.server.fixtures["quote"]])
+        movies = pyarrow.parquet.read_table(report.resources["movie"].path)
+        self.assertEqual(movies.column("runtimeInMinutes").to_pylist(),
+                         [doc["runtimeInMinutes"] for doc in self.server.fixtures["movie"]])
+        for stage in ("fetch", "convert", "write"):
+            self.assertEqual(report.stages[stage].rows, report.rows)
+            self.assertGreater(report.stages[stage].rows_per_second, 0)
+
+    def test_arrow_and_ndjson(self):
+        """
+        Test that the Arrow IPC and NDJSON files hold the same rows.
+        """
+        report = export(self.directory.name, "arrow", ["character"], processes=2, limit=100)
+        with pyarrow.ipc.open_file(report.resources["character"].path) as reader:
+            table = reader.read_all()
+        self.assertEqual(list(report.resources), ["character"])
+        self.assertEqual(table.num_rows, 250)
+        report = export(self.directory.name, "ndjson", ["character"], processes=2, limit=100)
+        with open(report.resources["character"].path, encoding="utf-8") as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEqual(rows, table.to_pylist())
+        self.assertEqual(rows[3]["name"], self.server.fixtures["character"][3]["name"])
+
+    def test_failed_resource(self):
+        """
+        Test that a resource failing to export is reported, and invalid options raise a ValueError.
+        """
+        self.server.fixtures.pop("book")
+        report = export(self.directory.name, "ndjson", ["book", "movie"], processes=1)
+        self.assertFalse(report.ok)
+        self.assertEqual(report.resources["book"].status_code, 404)
+        self.assertEqual(report.resources["movie"].rows, 8)
+        self.assertTrue(os.path.exists(report.resources["movie"].path))
+        with self.assertRaises(ValueError):
+            export(self.directory.name, "csv")
+        with self.assertRaises(ValueError):
+            export(self.directory.name, resources=["song"])
+
+    def test_transport_error(self):
+        """
+        Test that a request raising an exception fails its resource instead of leaving a truncated file reported as exported.
+        """
+        client._client = _ResetClient(api=self.server.api, headers={})
+        with self.assertLogs("lotr_sdk.export", "ERROR"):
+            report = export(self.directory.name, "ndjson", ["quote", "movie"], processes=1, limit=100)
+        self.assertFalse(report.ok)
+        quotes = report.resources["quote"]
+        self.assertEqual((quotes.status_code, quotes.rows), (0, 100))
+        self.assertIn("ConnectionError", quotes.error)
+        self.assertEqual(report.resources["movie"].status_code, 200)
+
+    def test_conversion_error(self):
+        """
+        Test that a page failing to convert fails its resource, and the other resources still finish.
+        """
+        del self.server.fixtures["character"][150]["height"]
+        with self.assertLogs("lotr_sdk.export", "ERROR"):
+            report = export(self.directory.name, "parquet", ["character", "movie"], processes=2, max_pending=2, limit=100)
+        self.assertFalse(report.ok)
+        characters = report.resources["character"]
+        self.assertEqual((characters.status_code, characters.pages, characters.rows), (0, 1, 100))
+        self.assertIn("KeyError", characters.error)
+        self.assertEqual(pyarrow.parquet.read_table(characters.path).num_rows, 100)
+        self.assertEqual(report.resources["movie"].status_code, 200)
+        self.assertEqual(report.resources["movie"].rows, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+import client
+import filters
+import memo
+from characters import Character, get_all_characters, get_character_by_regex, get_sorted_characters
+from filters import compile_filter, evaluate, find, to_expressions, to_params
+from mock_server import MockServer
+from movies import Movie, get_all_movies
+
+CHARACTERS = [
+    Character("c1", "", "Hobbit", "Male", "", "", "", "Shire", "", "Frodo Baggins"),
+    Character("c2", "", "Elf", "Female", "", "", "", "Lothlórien", "", "Galadriel"),
+    Character("c3", "", "Human", "Female", "", "", "", "", "", "Belemir"),
+    Character("c4", "", None, "Male", "", "", "", "", "", "Gandalf"),
+]
+MOVIES = [
+    Movie("m1", "The Two Towers", 179, 94, 926.0, 6, 2, 96),
+    Movie("m2", "The Return of the King", 201, 94.0, 1120.0, 11, 11, 95),
+    Movie("m3", "The Unexpected Journey", 169, 200, 1021.0, 3, 1, 64),
+]
+
+
+class TestFilters(unittest.TestCase):
+    """
+    Testing suite for filters.py.
+    """
+    def ids(self, objects: list) -> list:
+        return [obj.id for obj in objects]
+
+    def test_operators(self):
+        """
+        Test every operator of the API syntax on model objects.
+        """
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "name=/bel/i")), ["c3"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "name!=/bel/i")), ["c1", "c2", "c4"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "race=Hobbit,Elf")), ["c1", "c2"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "race!=Hobbit,Elf")), ["c3", "c4"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "name=Gandalf")), ["c4"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "name=Gand")), [])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "race")), ["c1", "c2", "c3"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "!race")), ["c4"])
+        self.assertEqual(self.ids(evaluate(CHARACTERS, "_id=c2")), ["c2"])
+        self.assertEqual(self.ids(evaluate(MOVIES, "budgetInMillions>100")), ["m3"])
+        self.assertEqual(self.ids(evaluate(MOVIES, "budgetInMillions=94")), ["m1", "m2"])
+        self.assertEqual(self.ids(evaluate(MOVIES, "runtimeInMinutes>=179")), ["m1", "m2"])
+        self.assertEqual(self.ids(evaluate(MOVIES, "runtimeInMinutes<179")), ["m3"])
+        self.assertEqual(self.ids(evaluate(MOVIES, "academyAwardWins<=2", "rottenTomatoesScore>90")), ["m1"])
+        self.assertEqual(self.ids(evaluate(MOVIES, {"name": "/the r/i"})), ["m2"])
+        self.assertEqual(len(evaluate(MOVIES)), 3)
+
+    def test_docs(self):
+        """
+        Test that filters match API documents by their API field names.
+        """
+        doc = {"_id": "m1", "name": "The Two Towers", "budgetInMillions": 94}
+        self.assertTrue(compile_filter("_id=m1").matches_doc(doc))
+        self.assertTrue(compile_filter("budgetInMillions<=94").matches_doc(doc))
+        self.assertFalse(compile_filter("name>Z").matches_doc(doc))
+        self.assertFalse(compile_filter("name=/towers/").matches_doc(doc))
+
+    def test_params(self):
+        """
+        Test that to_params() and to_expressions() convert filters both ways and that filters are cached.
+        """
+        expressions = ["name=/Belem/i", "race!=Orc,Goblin", "budgetInMillions>=100", "academyAwardWins>0", "!spouse"]
+        params = to_params(expressions)
+        self.assertEqual(params, {
+            "name": "/Belem/i", "race!": "Orc,Goblin", "budgetInMillions>": "100", "academyAwardWins>0": "", "!spouse": "",
+        })
+        self.assertEqual(to_expressions({**params, "limit": 10, "sort": "name:asc"}), expressions)
+        self.assertIs(compile_filter("name=/Belem/i"), compile_filter("name=/Belem/i"))
+        for invalid in ("", "name=/(/", "!name=Frodo", "name~Frodo"):
+            with self.assertRaises(ValueError):
+                compile_filter(invalid)
+
+
+class _FailingPageClient(client.Client):
+    """
+    A Client whose requests for page 3 go to an unknown url while failing is True.
+    """
+    failing = True
+
+    def get(self, url, params=None, headers=None):
+        if self.failing and params and params.get("page") == 3:
+            url = url.replace("/character/", "/unknown/")
+        return super().get(url, params, headers)
+
+
+class TestFiltersLocal(unittest.TestCase):
+    """
+    Testing suite for answering filters from held collections, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer().start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+        filters.configure()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+        filters.configure()
+
+    def test_find(self):
+        """
+        Test that filters go to the server until the collection is held, and then match the same objects locally.
+        """
+        queries = [("name=/character 1\\d$/i",), ("race=Hobbit,Elf", "realm!=Shire"), ("death",), ("height>=200cm",)]
+        expected = [[character.id for character in find("character", *query)] for query in queries]
+        self.assertEqual(filters.stats()["server"], 4)
+        requests = self.server.requests
+        get_all_characters()
+        for query, ids in zip(queries, expected):
+            self.assertEqual([character.id for character in find("character", *query)], ids)
+        self.assertEqual(len(get_character_by_regex("name", "/^character 1\\d$/i")), 10)
+        self.assertEqual(self.server.requests, requests + 1)
+        self.assertEqual(filters.stats()["local"], 5)
+        self.assertEqual(len(find("movie", "budgetInMillions>100")), len(get_all_movies({"budgetInMillions>100": ""})))
+
+    def test_invalidation(self):
+        """
+        Test that held collections are only used with the Client that fetched them and while they are fresh.
+        """
+        get_all_characters({"limit": 500})
+        self.assertEqual(len(filters.held("character")), 933)
+        get_all_characters({"race": "Hobbit"})
+        self.assertEqual(len(filters.held("character")), 933)
+        client.configure(api=self.server.api, headers={})
+        self.assertIsNone(filters.held("character"))
+        filters.configure(max_age=0)
+        get_all_characters()
+        self.assertIsNone(filters.held("character"))
+        with self.assertRaises(ValueError):
+            find("wizard", "name=Gandalf")
+
+    def test_server_regex(self):
+        """
+        Test that a regex Python can't compile is sent to the server, whether the collection is held or not.
+        """
+        self.assertEqual(to_params(["name=/\\p{Lu}haracter/u"]), {"name": "/\\p{Lu}haracter/u"})
+        get_all_characters()
+        for held in (True, False):
+            if not held:
+                filters.release()
+            requests = self.server.requests
+            with self.assertLogs("lotr_sdk.characters", "ERROR"):
+                get_character_by_regex("name", "/\\p{Lu}haracter/u")
+            self.assertEqual(self.server.requests, requests + 1)
+        with self.assertRaises(ValueError):
+            find("character", "name~Frodo")
+
+    def test_partial_pull_not_held(self):
+        """
+        Test that a pull with an offset or a page is not held, so later filters and sorts see every object.
+        """
+        self.assertFalse(filters.is_complete({"offset": 900}))
+        self.assertFalse(filters.is_complete({"page": 2}))
+        self.assertTrue(filters.is_complete({"limit": 100, "sort": "name:asc"}))
+        get_all_characters({"offset": 900})
+        get_all_characters({"page": 2, "limit": 100})
+        self.assertIsNone(filters.held("character"))
+        self.assertEqual(len(get_character_by_regex("name", "/^Character 1\\d$/")), 10)
+        self.assertEqual(len(get_sorted_characters("name")), 933)
+
+    def test_failed_page_not_held(self):
+        """
+        Test that a pull missing a page is not held, so later filters and sorts see every object.
+        """
+        self.server.stop()
+        self.server.page_size = 100
+        self.server.start()
+        failing = _FailingPageClient(api=self.server.api, headers={})
+        client._client = failing
+        self.assertEqual(get_all_characters(), [])
+        self.assertIsNone(filters.held("character"))
+        failing.failing = False
+        self.assertEqual(len(get_character_by_regex("name", "/^Character 25\\d$/")), 10)
+        self.assertEqual(len(get_sorted_characters("name")), 933)
+        self.assertEqual(len(filters.held("character")), 933)
+
+
+if __name__ == "__main__":
+    unittest.main()
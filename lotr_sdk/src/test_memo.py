@@ -0,0 +1,96 @@
+import unittest
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import client
+import memo
+from memo import LRUCache
+from movies import get_all_movies, get_movie_by_id
+
+
+def _movie(id: str) -> dict:
+    return {
+        "_id": id,
+        "name": f"Movie {id}",
+        "runtimeInMinutes": 100,
+        "budgetInMillions": 10,
+        "boxOfficeRevenueInMillions": 20,
+        "academyAwardNominations": 1,
+        "academyAwardWins": 0,
+        "rottenTomatoesScore": 50
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that serves a list of two movies and single movies by id.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        movie_id = self.path.split("?")[0].rstrip("/").split("/")[-1]
+        docs = [_movie("m1"), _movie("m2")] if movie_id == "movie" else [_movie(movie_id)]
+        body = json.dumps({"docs": docs, "total": len(docs), "pages": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestMemo(unittest.TestCase):
+    """
+    Testing suite for memo.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        client.configure(api=f"http://127.0.0.1:{self.server.server_port}/v2/", headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        client.configure()
+        memo.configure()
+
+    def test_lru_cache(self):
+        """
+        Test LRUCache hits, misses and evictions.
+        """
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2})
+
+    def test_get_by_id_is_memoized(self):
+        """
+        Test that a second get_movie_by_id() is served from memory.
+        """
+        first = get_movie_by_id("m3")
+        second = get_movie_by_id("m3")
+        self.assertEqual(self.server.requests, 1)
+        self.assertIs(first, second)
+
+    def test_get_all_warms_id_cache(self):
+        """
+        Test that get_all_movies() warms the cache used by get_movie_by_id().
+        """
+        get_all_movies()
+        movie = get_movie_by_id("m2")
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(movie.name, "Movie m2")
+        self.assertEqual(memo.stats()["movie"]["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import json
+from events import RequestEvent
+from metrics import Histogram, MetricsAggregator
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Testing suite for metrics.py.
+    """
+    def test_histogram(self):
+        """
+        Test bucket counts and quantile estimates.
+        """
+        histogram = Histogram(buckets=(0.1, 0.2, 0.4))
+        for value in (0.05, 0.15, 0.15, 0.3, 1):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.sum, 1.65)
+        self.assertAlmostEqual(histogram.quantile(0.5), 0.175)
+        self.assertEqual(histogram.quantile(0.99), 0.4)
+        self.assertEqual(Histogram().quantile(0.5), 0)
+        self.assertEqual(histogram.to_dict()["buckets"], {"0.1": 1, "0.2": 3, "0.4": 4, "+Inf": 5})
+
+    def test_aggregator(self):
+        """
+        Test that events are aggregated by resource and exported as json and Prometheus text.
+        """
+        metrics = MetricsAggregator()
+        metrics(RequestEvent(resource="quote", page=1, status=200, bytes=1000, cache="miss", connect_time=0.02, ttfb=0.05, total_time=0.08))
+        metrics(RequestEvent(resource="quote", page=2, status=200, bytes=500, retries=2, ttfb=0.03, total_time=0.6))
+        metrics(RequestEvent(resource="movie", status=404, bytes=20, total_time=0.01))
+        exported = json.loads(metrics.to_json())
+        self.assertEqual(exported["quote"]["requests"], {"200": 2})
+        self.assertEqual(exported["quote"]["bytes"], 1500)
+        self.assertEqual(exported["quote"]["retries"], 2)
+        self.assertEqual(exported["quote"]["cache"], {"miss": 1})
+        self.assertEqual(exported["quote"]["latency"]["total_time"]["count"], 2)
+        self.assertEqual(exported["movie"]["requests"], {"404": 1})
+
+        text = metrics.to_prometheus()
+        self.assertIn('lotr_sdk_request_duration_seconds_bucket{resource="quote",phase="total",le="0.1"} 1', text)
+        self.assertIn('lotr_sdk_request_duration_seconds_bucket{resource="quote",phase="total",le="+Inf"} 2', text)
+        self.assertIn('lotr_sdk_request_duration_seconds_count{resource="quote",phase="ttfb"} 2', text)
+        self.assertIn('lotr_sdk_requests_total{resource="movie",status="404"} 1', text)
+        self.assertIn('lotr_sdk_response_bytes_total{resource="quote"} 1500', text)
+        self.assertIn('lotr_sdk_cache_total{resource="quote",outcome="miss"} 1', text)
+
+        metrics.reset()
+        self.assertEqual(metrics.to_dict(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import client
+import memo
+from mock_server import FIXTURE_SIZES, MockServer
+from pagination import PaginationReport
+from books import get_all_books, get_chapters_by_book_id
+from characters import get_all_characters, get_character_by_id, get_character_by_name, get_sorted_characters, get_character_by_regex
+from movies import get_movies_by_ids
+from quotes import get_all_quotes
+
+
+MOVIES = [
+    {"_id": "m1", "name": "The Two Towers", "budgetInMillions": 94, "academyAwardWins": 2},
+    {"_id": "m2", "name": "The Return of the King", "budgetInMillions": 94.0, "academyAwardWins": 11},
+    {"_id": "m3", "name": "The Unexpected Journey", "budgetInMillions": 200, "academyAwardWins": 1},
+    {"_id": "m4", "name": "The Desolation of Smaug", "budgetInMillions": 217},
+]
+# params as they reach the server once decoded: ids expected from the API
+FILTERS = [
+    ({"name": "The Two Towers"}, ["m1"]),
+    ({"name!": "The Two Towers"}, ["m2", "m3", "m4"]),
+    ({"_id": "m1,m3"}, ["m1", "m3"]),
+    ({"_id!": "m1,m3"}, ["m2", "m4"]),
+    ({"name": "/the r/i"}, ["m2"]),
+    ({"name!": "/the r/i"}, ["m1", "m3", "m4"]),
+    ({"budgetInMillions": "94"}, ["m1", "m2"]),
+    ({"budgetInMillions>100": ""}, ["m3", "m4"]),
+    ({"budgetInMillions<200": ""}, ["m1", "m2"]),
+    ({"budgetInMillions>": "200"}, ["m3", "m4"]),
+    ({"budgetInMillions<": "94"}, ["m1", "m2"]),
+    ({"academyAwardWins": ""}, ["m1", "m2", "m3"]),
+    ({"!academyAwardWins": ""}, ["m4"]),
+    ({"budgetInMillions": "94", "academyAwardWins>5": ""}, ["m2"]),
+]
+
+
+class TestMockServer(unittest.TestCase):
+    """
+    Testing suite for mock_server.py, running the SDK against it.
+    """
+    def setUp(self):
+        self.server = MockServer(page_size=200).start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+
+    def test_get_all_paginates(self):
+        """
+        Test that every character is returned across pages of the server's page size.
+        """
+        characters = get_all_characters()
+        self.assertEqual(len(characters), FIXTURE_SIZES["character"])
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(len(get_all_quotes(max_workers=4, limit=1000)), FIXTURE_SIZES["quote"])
+
+    def test_lookups(self):
+        """
+        Test id, name, sort, regex and nested lookups.
+        """
+        characters = self.server.fixtures["character"]
+        self.assertEqual(get_character_by_id(characters[5]["_id"]).name, characters[5]["name"])
+        self.assertEqual(get_character_by_name("Character 7").id, characters[7]["_id"])
+        names = [character.name for character in get_sorted_characters("name", "desc")]
+        self.assertEqual(names, sorted(names, reverse=True))
+        self.assertEqual(len(get_character_by_regex("name", "/^character 1\\d$/i")), 10)
+        book = get_all_books()[0]
+        chapters = get_chapters_by_book_id(book.id)
+        self.assertEqual(len(chapters), len([doc for doc in self.server.fixtures["chapter"] if doc["book"] == book.id]))
+        movie_ids = [doc["_id"] for doc in self.server.fixtures["movie"]][:3]
+        self.assertEqual([movie.id for movie in get_movies_by_ids(movie_ids)], movie_ids)
+
+    def test_filters(self):
+        """
+        Test the mock server's answer to every filter operator against hand-written ids.
+        """
+        with MockServer({"movie": MOVIES}) as server:
+            for params, ids in FILTERS:
+                results = client.get_client().get(f"{server.api}movie/", params=params)
+                self.assertEqual([doc["_id"] for doc in results.json()["docs"]], ids, params)
+            self.assertEqual(client.get_client().get(f"{server.api}movie/", params={"name": "/(/"}).status_code, 400)
+
+    def test_error_injection(self):
+        """
+        Test that injected errors reach the SDK, and that 429s are retried.
+        """
+        self.server.stop()
+        with MockServer(error_rate=1) as server:
+            client.configure(api=server.api, headers={})
+            self.assertEqual(get_all_characters(), [])
+            self.assertEqual(server.errors, 1)
+        with MockServer(error_rate=0.5, error_status=429, seed=1) as server:
+            client.configure(api=server.api, headers={}, max_retries=20)
+            self.assertEqual(len(get_all_characters(limit=100)), FIXTURE_SIZES["character"])
+            self.assertGreater(server.errors, 0)
+
+    def test_latency(self):
+        """
+        Test that latency is added to every response.
+        """
+        self.server.stop()
+        with MockServer(latency=0.05) as server:
+            client.configure(api=server.api, headers={})
+            report = PaginationReport()
+            get_all_quotes(report=report, limit=1000)
+            self.assertEqual(server.requests, 3)
+            self.assertGreaterEqual(report.total_time, 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+# imports lotr_sdk/src as the lotr_sdk package, as an installed copy would be imported
+LOAD_PACKAGE = f"""
+import importlib.util, json, sys
+spec = importlib.util.spec_from_file_location("lotr_sdk", {os.path.join(SRC, "__init__.py")!r}, submodule_search_locations=[{SRC!r}])
+package = importlib.util.module_from_spec(spec)
+sys.modules["lotr_sdk"] = package
+spec.loader.exec_module(package)
+"""
+HEAVY_MODULES = ("requests", "urllib3", "numpy", "sqlite3", "logging.handlers", "orjson", "aiohttp")
+
+
+def run(code: str) -> dict:
+    """
+    Run code in a fresh interpreter without src on sys.path and return the json it prints.
+    """
+    output = subprocess.run([sys.executable, "-c", LOAD_PACKAGE + code], capture_output=True, text=True, check=True, cwd="/")
+    return json.loads(output.stdout)
+
+
+class TestPackage(unittest.TestCase):
+    """
+    Testing suite for the lotr_sdk package (__init__.py).
+    """
+    def test_import_is_light(self):
+        """
+        Test that importing the package and a resource module loads none of the heavy dependencies.
+        """
+        loaded = run(f"""
+import lotr_sdk
+from lotr_sdk import characters
+print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))
+""")
+        self.assertEqual(loaded, [])
+
+    def test_lazy_attributes(self):
+        """
+        Test that the resource functions, models and submodules resolve on first access.
+        """
+        result = run("""
+import lotr_sdk
+before = "lotr_sdk.characters" in sys.modules
+function = lotr_sdk.get_all_characters
+print(json.dumps({
+    "before": before,
+    "module": function.__module__,
+    "same": function is sys.modules["lotr_sdk.characters"].get_all_characters,
+    "model": lotr_sdk.Book.__module__,
+    "submodule": lotr_sdk.client.__name__,
+    "listed": "get_all_quotes" in dir(lotr_sdk) and "snapshot" in dir(lotr_sdk),
+    "flat": [name for name in ("characters", "client", "settings") if name in sys.modules],
+}))
+""")
+        self.assertFalse(result["before"])
+        self.assertEqual(result["module"], "lotr_sdk.characters")
+        self.assertTrue(result["same"])
+        self.assertEqual(result["model"], "lotr_sdk.books")
+        self.assertEqual(result["submodule"], "lotr_sdk.client")
+        self.assertTrue(result["listed"])
+        self.assertEqual(result["flat"], [])
+
+    def test_unknown_attribute(self):
+        """
+        Test that an unknown name raises AttributeError.
+        """
+        result = run("""
+try:
+    package.get_all_dragons
+    print(json.dumps(False))
+except AttributeError:
+    print(json.dumps(True))
+""")
+        self.assertTrue(result)
+
+    def test_first_request_imports_requests(self):
+        """
+        Test that requests is imported when the first client is created.
+        """
+        loaded = run("""
+from lotr_sdk import client
+before = "requests" in sys.modules
+client.get_client()
+print(json.dumps([before, "requests" in sys.modules]))
+""")
+        self.assertEqual(loaded, [False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
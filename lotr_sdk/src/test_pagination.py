@@ -0,0 +1,160 @@
+import unittest
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import client
+from pagination import PaginationReport, get_all_docs, iter_pages
+from quotes import iter_quotes
+from characters import get_all_characters
+
+PAGES = 5
+CHARACTERS = 7
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that serves PAGES pages with two quotes each and echoes the sort param,
+    and CHARACTERS characters split by the limit param without a pages field.
+    Chapters are served like quotes, except that page 3 fails.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        sort = query.get("sort", [""])[0]
+        if url.path.endswith("/chapter/") and page == 3:
+            body = json.dumps({"success": False, "message": "Injected error"}).encode()
+            self.send_response(500)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if url.path.endswith("/character/"):
+            self.server.limits.append(query.get("limit", [None])[0])
+            limit = int(query.get("limit", ["3"])[0])
+            docs = [
+                {"_id": f"c{i}", "height": "", "race": query.get("race", [""])[0], "gender": "", "birth": "",
+                 "spouse": "", "death": "", "realm": "", "hair": "", "name": f"Character {i}"}
+                for i in range((page - 1)*limit, min(page*limit, CHARACTERS))
+            ]
+            body = json.dumps({"docs": docs, "total": CHARACTERS, "limit": limit, "page": page}).encode()
+        else:
+            docs = [{"_id": f"{page}-{i}", "id": f"{page}-{i}", "dialog": f"line {page}-{i}", "sort": sort} for i in range(2)]
+            body = json.dumps({"docs": docs, "total": PAGES*2, "page": page, "pages": PAGES}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestPagination(unittest.TestCase):
+    """
+    Testing suite for pagination.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.limits = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v2/quote/"
+        client.configure(headers={})
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        client.configure()
+
+    def test_get_all_docs_sequential(self):
+        """
+        Test get_all_docs() with one worker.
+        """
+        status_code, docs = get_all_docs(self.url)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(len(docs), PAGES*2)
+
+    def test_get_all_docs_parallel_keeps_order(self):
+        """
+        Test that get_all_docs() with several workers returns docs in page order.
+        """
+        report = PaginationReport()
+        status_code, docs = get_all_docs(self.url, {"sort": "dialog:asc"}, max_workers=4, report=report)
+        self.assertEqual(status_code, 200)
+        self.assertEqual([doc["_id"] for doc in docs], [f"{page}-{i}" for page in range(1, PAGES+1) for i in range(2)])
+        self.assertTrue(all(doc["sort"] == "dialog:asc" for doc in docs))
+        self.assertEqual(report.pages, PAGES)
+        self.assertEqual(sorted(report.page_latencies), list(range(1, PAGES+1)))
+        self.assertEqual(report.failed_pages, [])
+        self.assertGreater(report.total_time, 0)
+
+    def test_iter_pages_prefetch(self):
+        """
+        Test that iter_pages() yields one list of docs per page, with and without prefetch.
+        """
+        for prefetch in (False, True):
+            pages = list(iter_pages(self.url, {"sort": "dialog:asc"}, prefetch=prefetch))
+            self.assertEqual(len(pages), PAGES)
+            self.assertEqual([docs[0]["_id"] for docs in pages], [f"{page}-0" for page in range(1, PAGES+1)])
+
+    def test_failed_page(self):
+        """
+        Test that a failed page is reported by get_all_docs() and stops iter_pages().
+        """
+        url = self.url.replace("/quote/", "/chapter/")
+        report = PaginationReport()
+        with self.assertLogs("lotr_sdk.pagination", "ERROR") as logs:
+            status_code, docs = get_all_docs(url, max_workers=2, report=report)
+        self.assertEqual(status_code, 500)
+        self.assertEqual(len(docs), (PAGES - 1)*2)
+        self.assertEqual(report.failed_pages, [3])
+        self.assertTrue(any("pages 3 of 5" in line for line in logs.output))
+        for prefetch in (False, True):
+            self.assertEqual(len(list(iter_pages(url, prefetch=prefetch))), 2)
+
+    def test_iter_quotes_stops_early(self):
+        """
+        Test that iter_quotes() yields Quote objects lazily and can be stopped early.
+        """
+        client.configure(api=self.url[:-len("quote/")], headers={})
+        quotes = iter_quotes(prefetch=True)
+        first = next(quotes)
+        quotes.close()
+        self.assertEqual(first.id, "1-0")
+        self.assertEqual(first.dialog, "line 1-0")
+
+    def test_get_all_characters_follows_pages(self):
+        """
+        Test that get_all_characters() pulls every page, with the caller's filter and limit on each.
+        """
+        client.configure(api=self.url[:-len("quote/")], headers={})
+        characters = get_all_characters({"race": "Hobbit"})
+        self.assertEqual([character.id for character in characters], [f"c{i}" for i in range(CHARACTERS)])
+        self.assertTrue(all(character.race == "Hobbit" for character in characters))
+        self.server.limits.clear()
+        characters = get_all_characters({"race": "Hobbit"}, max_workers=2, limit=5)
+        self.assertEqual(len(characters), CHARACTERS)
+        self.assertEqual(self.server.limits, ["5", "5"])
+
+    def test_page_and_offset_ignored(self):
+        """
+        Test that a page or an offset in params doesn't clash with the page of each request, the pull starting from the first page.
+        """
+        client.configure(api=self.url[:-len("quote/")], headers={})
+        expected = [f"c{i}" for i in range(CHARACTERS)]
+        for params in ({"page": 2}, {"offset": 4}, {"page": 2, "offset": 4}):
+            with self.assertLogs("lotr_sdk.pagination", "WARNING"):
+                characters = get_all_characters(params, max_workers=2, limit=3)
+            self.assertEqual([character.id for character in characters], expected)
+        with self.assertLogs("lotr_sdk.pagination", "WARNING"):
+            pages = list(iter_pages(self.url, {"page": 3}))
+        self.assertEqual([docs[0]["_id"] for docs in pages], [f"{page}-0" for page in range(1, PAGES+1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,17 @@
 import unittest
 import os
 import sys
+import client
+import memo
+from mock_server import MockServer, synthetic_fixtures
 from quotes import (
     Quote,
+    expand_quotes,
     get_quote_by_id,
     get_all_quotes,
     get_sorted_quotes,
-    get_quote_by_regex
+    get_quote_by_regex,
+    iter_quotes
 )
 
 
@@ -68,5 +73,66 @@ class TestQuotes(unittest.TestCase):
         test_quotes = get_quote_by_regex("dialog", "/Mama/i")
         self.assertIn("Mama",test_quotes[0].dialog)
 
+
+class TestQuoteExpand(unittest.TestCase):
+    """
+    Testing suite for expanding quotes with their characters and movies, against a mock server.
+    """
+    def setUp(self):
+        fixtures = synthetic_fixtures({"character": 250})
+        fixtures["quote"][0]["character"] = "missing"
+        self.server = MockServer(fixtures).start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+
+    def test_expand(self):
+        """
+        Test that get_all_quotes(expand=...) attaches every character and movie with a constant number of requests.
+        """
+        quotes = get_all_quotes(expand=["character", "movie"])
+        self.assertEqual(len(quotes), 2384)
+        # 3 pages of quotes, 3 pulls of 100 characters, the missing character by id and 1 pull of movies
+        self.assertEqual(self.server.requests, 8)
+        self.assertIsNone(quotes[0].character_obj)
+        for quote in quotes[1:]:
+            self.assertEqual(quote.character_obj.id, quote.character)
+            self.assertEqual(quote.movie_obj.id, quote.movie)
+        # a character shared by several quotes is one object
+        first = quotes[1]
+        same = next(quote for quote in quotes[2:] if quote.character == first.character)
+        self.assertIs(same.character_obj, first.character_obj)
+        self.assertIsNone(Quote().character_obj)
+        # the quotes held by the id cache are not expanded
+        cached = get_quote_by_id(first.id)
+        self.assertIsNot(cached, first)
+        self.assertIsNone(cached.character_obj)
+        self.assertIsNot(expand_quotes([cached], ["movie"])[0], cached)
+        self.assertIsNone(cached.movie_obj)
+
+    def test_expand_uses_cache(self):
+        """
+        Test that expanding again only resolves the ids not already cached.
+        """
+        quotes = get_all_quotes(expand=["movie"])
+        self.assertIsNone(quotes[1].character_obj)
+        requests = self.server.requests
+        expand_quotes(quotes, ["movie"])
+        self.assertEqual(self.server.requests, requests)
+        page = list(iter_quotes(limit=100, expand=["movie"]))
+        self.assertEqual(page[5].movie_obj.id, page[5].movie)
+
+    def test_expand_invalid(self):
+        """
+        Test that an unknown expand field raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            expand_quotes([Quote()], ["book"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import threading
+import time
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ratelimit import RateLimiter, retry_delay
+from client import Client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    A handler that answers 429 to the first self.server.limited requests.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.requests <= self.server.limited:
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"docs": [], "total": 0, "pages": 1}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRateLimit(unittest.TestCase):
+    """
+    Testing suite for ratelimit.py.
+    """
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = 0
+        self.server.limited = 2
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api = f"http://127.0.0.1:{self.server.server_port}/v2/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_token_bucket(self):
+        """
+        Test that the bucket allows a burst of capacity and then refills at rate.
+        """
+        limiter = RateLimiter(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(7):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.09)
+        stats = limiter.stats()
+        self.assertEqual(stats["requests"], 7)
+        self.assertGreater(stats["throttled_time"], 0)
+        self.assertGreater(stats["throughput"], 0)
+
+    def test_retry_delay(self):
+        """
+        Test that Retry-After is honored and backoff stays under its cap.
+        """
+        self.assertEqual(retry_delay(0, "3"), 3)
+        self.assertEqual(retry_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT"), 0)
+        for attempt in range(10):
+            self.assertLessEqual(retry_delay(attempt, None, base=1, cap=8), 8)
+
+    def test_client_retries_429(self):
+        """
+        Test that the Client retries 429 responses and then succeeds.
+        """
+        client = Client(api=self.api, headers={}, rate_limiter=RateLimiter(rate=1000, capacity=10))
+        results = client.get(f"{self.api}quote/")
+        stats = client.stats()
+        client.close()
+        self.assertEqual(results.status_code, 200)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(stats["retries"], 2)
+        self.assertGreater(stats["rate_limiter"]["throttled_time"], 0)
+
+    def test_client_gives_up_after_max_retries(self):
+        """
+        Test that the Client returns the 429 once max_retries is reached.
+        """
+        self.server.limited = 10
+        client = Client(api=self.api, headers={}, max_retries=1)
+        results = client.get(f"{self.api}quote/")
+        client.close()
+        self.assertEqual(results.status_code, 429)
+        self.assertEqual(self.server.requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import dataclasses
+import pickle
+from characters import Character
+from quotes import Quote
+from records import (
+    CharacterRecord,
+    FrozenQuoteRecord,
+    BookRecord,
+    to_record,
+    to_records
+)
+
+
+class TestRecords(unittest.TestCase):
+    """
+    Testing suite for records.py.
+    """
+    def test_record_class(self):
+        """
+        Test the creation of a slotted record with the model's defaults.
+        """
+        character = CharacterRecord()
+        self.assertFalse(hasattr(character, "__dict__"))
+        self.assertEqual(character.id, "")
+        self.assertEqual(character.name, "")
+        self.assertEqual(BookRecord().chapters, [])
+        self.assertIsNot(BookRecord().chapters, BookRecord().chapters)
+
+    def test_to_record(self):
+        """
+        Test converting a model object to a record.
+        """
+        character = Character(id="5cd99d4bde30eff6ebccfbbf", race="Human", gender="Male", name="Adrahil I")
+        record = to_record(character)
+        self.assertIsInstance(record, CharacterRecord)
+        self.assertEqual(dataclasses.asdict(record), dataclasses.asdict(character))
+
+    def test_interning(self):
+        """
+        Test that repeated values share one string.
+        """
+        races = ["".join(["Hob", "bit"]) for _ in range(2)]
+        self.assertIsNot(races[0], races[1])
+        first, second = to_records([Character(race=race) for race in races])
+        self.assertIs(first.race, second.race)
+
+    def test_frozen_record(self):
+        """
+        Test that frozen records can't be changed and survive pickling.
+        """
+        quote = to_record(Quote("q1", "Yes, Mama.", "m1", "c1"), frozen=True)
+        self.assertIsInstance(quote, FrozenQuoteRecord)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            quote.dialog = "No."
+        self.assertEqual(pickle.loads(pickle.dumps(quote)), quote)
+        self.assertEqual(hash(quote), hash(to_record(Quote("q1", "Yes, Mama.", "m1", "c1"), frozen=True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import logging
+import os
+import tempfile
+import sdk_logging
+from sdk_logging import LOGGER_NAME, disable_file_logging, enable_file_logging, get_logger
+import characters
+
+
+class _Counted():
+    """
+    An argument that counts how many times it is formatted.
+    """
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "counted"
+
+
+class TestSdkLogging(unittest.TestCase):
+    """
+    Testing suite for sdk_logging.py.
+    """
+    def tearDown(self):
+        disable_file_logging()
+        logging.getLogger(LOGGER_NAME).setLevel(logging.NOTSET)
+
+    def test_library_logger(self):
+        """
+        Test that the SDK logs through the lotr_sdk logger and leaves the root logger alone.
+        """
+        self.assertEqual(characters.logger.name, "lotr_sdk.characters")
+        self.assertEqual(get_logger("lotr_sdk.quotes").name, "lotr_sdk.quotes")
+        handlers = logging.getLogger(LOGGER_NAME).handlers
+        self.assertTrue(any(isinstance(handler, logging.NullHandler) for handler in handlers))
+        root_files = [getattr(handler, "baseFilename", "") for handler in logging.getLogger().handlers]
+        self.assertFalse(any(path.endswith("lotr_sdk.log") for path in root_files))
+
+    def test_deferred_formatting(self):
+        """
+        Test that arguments are not formatted when the level is disabled.
+        """
+        argument = _Counted()
+        logging.getLogger(LOGGER_NAME).setLevel(logging.WARNING)
+        characters.logger.info("Success! You have accessed %s.", argument)
+        self.assertEqual(argument.formatted, 0)
+
+    def test_file_logging(self):
+        """
+        Test that the background writer writes queued records to the file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sdk.log")
+            enable_file_logging(path, level=logging.INFO)
+            characters.logger.info("Success! You have accessed %s.", "the shire")
+            characters.logger.debug("not written")
+            disable_file_logging()
+            self.assertIsNone(sdk_logging._listener)
+            with open(path) as log_file:
+                lines = log_file.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("INFO", lines[0])
+        self.assertIn("Success! You have accessed the shire.", lines[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+import tempfile
+import client
+import memo
+from mock_server import MockServer, synthetic_fixtures
+from quotes import Quote, get_all_quotes, get_quote_by_id
+from search import QuoteIndex, load_quote_index, ngrams, tokenize
+
+QUOTES = [
+    Quote("q1", "You shall not pass!", "m1", "c1"),
+    Quote("q2", "My precious. Yes, my PRECIOUS.", "m2", "c2"),
+    Quote("q3", "I don't know, Mr. Frodo. Shall we pass?", "m2", "c3"),
+    Quote("q4", "Precisely, Sméagol's precious", "m3", "c2"),
+]
+
+
+class TestSearch(unittest.TestCase):
+    """
+    Testing suite for search.py.
+    """
+    def ids(self, quotes: list) -> list:
+        return [quote.id for quote in quotes]
+
+    def test_tokenize(self):
+        """
+        Test that tokenize() case folds and keeps inner apostrophes.
+        """
+        self.assertEqual(tokenize("I don't know, Mr. FRODO."), ["i", "don't", "know", "mr", "frodo"])
+        self.assertEqual(tokenize(""), [])
+        self.assertEqual(ngrams("Ring", 3), {"rin", "ing"})
+
+    def test_queries(self):
+        """
+        Test term, phrase, prefix, search and contains queries.
+        """
+        index = QuoteIndex(QUOTES, ngram_size=3)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(self.ids(index.term("Precious")), ["q2", "q4"])
+        self.assertEqual(self.ids(index.term("shall pass")), ["q1", "q3"])
+        self.assertEqual(self.ids(index.phrase("shall not pass")), ["q1"])
+        self.assertEqual(self.ids(index.phrase("pass shall")), [])
+        # repeated words keep every position
+        self.assertEqual(self.ids(index.phrase("yes, my precious")), ["q2"])
+        self.assertEqual(self.ids(index.prefix("prec")), ["q2", "q4"])
+        self.assertEqual(self.ids(index.prefix("PRE", limit=1)), ["q2"])
+        self.assertEqual(self.ids(index.search("my prec")), ["q2"])
+        self.assertEqual(self.ids(index.search("sha")), ["q1", "q3"])
+        # a trailing space completes the last word
+        self.assertEqual(self.ids(index.search("sh ")), [])
+        self.assertEqual(self.ids(index.contains("RECIO")), ["q2", "q4"])
+        self.assertEqual(self.ids(index.contains("t p")), ["q1"])
+        self.assertEqual(self.ids(QuoteIndex(QUOTES).contains("recio")), ["q2", "q4"])
+        self.assertEqual(index.term(""), [])
+
+    def test_updates(self):
+        """
+        Test that quotes are updated and removed incrementally.
+        """
+        index = QuoteIndex(QUOTES, ngram_size=3)
+        index.add([Quote("q1", "One ring to rule them all", "m1", "c1"), Quote("q5", "Fly, you fools!", "m1", "c1")])
+        self.assertEqual(len(index), 5)
+        self.assertEqual(self.ids(index.term("pass")), ["q3"])
+        self.assertEqual(self.ids(index.prefix("rul")), ["q1"])
+        self.assertEqual(self.ids(index.term("you")), ["q5"])
+        index.remove(["q2", "missing"])
+        self.assertNotIn("q2", index)
+        self.assertEqual(self.ids(index.term("precious")), ["q4"])
+        self.assertEqual(index.prefix("my"), [])
+        self.assertEqual(self.ids(index.contains("fools")), ["q5"])
+
+    def test_save_and_load(self):
+        """
+        Test that a saved index answers the same queries once loaded.
+        """
+        index = QuoteIndex(QUOTES, ngram_size=3)
+        index.remove(["q3"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            index.save(path)
+            loaded = QuoteIndex.load(path)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.ngram_size, 3)
+        self.assertEqual(self.ids(loaded.phrase("you shall not")), ["q1"])
+        self.assertEqual(self.ids(loaded.search("my prec")), ["q2"])
+        self.assertEqual(self.ids(loaded.phrase("yes my precious")), ["q2"])
+        self.assertEqual(self.ids(loaded.contains("méag")), ["q4"])
+        self.assertEqual(loaded.term("frodo"), [])
+        loaded.add([Quote("q6", "My precious", "m1", "c2")])
+        self.assertEqual(self.ids(loaded.term("precious")), ["q2", "q4", "q6"])
+
+
+class TestSearchWatch(unittest.TestCase):
+    """
+    Testing suite for keeping a QuoteIndex up to date with fetched quotes, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer(synthetic_fixtures({"quote": 300})).start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+
+    def test_watch(self):
+        """
+        Test that a watching index receives every quote fetched.
+        """
+        index = QuoteIndex()
+        index.watch()
+        try:
+            get_all_quotes({"dialog": "/Quote 1/"})
+            self.assertEqual(len(index), 111)
+            quote = self.server.fixtures["quote"][250]
+            get_quote_by_id(quote["_id"])
+            self.assertIn(quote["_id"], index)
+        finally:
+            index.unwatch()
+        get_all_quotes()
+        self.assertEqual(len(index), 112)
+        self.assertEqual([found.id for found in index.phrase(quote["dialog"])], [quote["_id"]])
+
+    def test_load_quote_index(self):
+        """
+        Test that load_quote_index() builds and saves the index once, then loads it.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            built = load_quote_index(path)
+            requests = self.server.requests
+            loaded = load_quote_index(path)
+            self.assertEqual(self.server.requests, requests)
+        self.assertEqual(len(built), 300)
+        self.assertEqual(len(loaded), 300)
+        self.assertEqual(self.ids(loaded.term("precious")), self.ids(built.term("precious")))
+
+    def ids(self, quotes: list) -> list:
+        return [quote.id for quote in quotes]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import client
+import events
+import filters
+import memo
+from characters import get_character_by_id
+from metrics import MetricsAggregator
+from mock_server import MockServer
+from movies import get_all_movies
+from singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Testing suite for singleflight.py.
+    """
+    def test_do(self):
+        """
+        Test that calls arriving while one is in flight share its result, and later calls run again.
+        """
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        runs = []
+
+        def call():
+            runs.append(1)
+            started.set()
+            release.wait()
+            return len(runs)
+        with ThreadPoolExecutor(8) as executor:
+            leader = executor.submit(flight.do, "key", call)
+            started.wait()
+            followers = [executor.submit(flight.do, "key", call) for _ in range(7)]
+            while flight.stats()["coalesced"] < 7:
+                time.sleep(0.001)
+            release.set()
+            self.assertEqual(leader.result(), (1, False))
+            self.assertEqual([future.result() for future in followers], [(1, True)]*7)
+        self.assertEqual(flight.do("key", call), (2, False))
+        self.assertEqual(flight.do("other", call), (3, False))
+        self.assertEqual(flight.stats(), {"calls": 3, "coalesced": 7, "in_flight": 0})
+
+    def test_errors(self):
+        """
+        Test that the exception of a call is raised in every caller sharing it.
+        """
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def call():
+            started.set()
+            release.wait()
+            raise ValueError("failed")
+        with ThreadPoolExecutor(2) as executor:
+            leader = executor.submit(flight.do, "key", call)
+            started.wait()
+            follower = executor.submit(flight.do, "key", call)
+            while flight.stats()["coalesced"] < 1:
+                time.sleep(0.001)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaises(ValueError):
+                    future.result()
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+class TestSingleFlightClient(unittest.TestCase):
+    """
+    Testing suite for coalescing the requests of the Client, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer(latency=0.2).start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+        filters.configure()
+        self.metrics = MetricsAggregator()
+        events.add_hook(self.metrics)
+
+    def tearDown(self):
+        events.remove_hook(self.metrics)
+        self.server.stop()
+        client.configure()
+        memo.configure()
+        filters.configure()
+
+    def test_concurrent_calls(self):
+        """
+        Test that concurrent identical calls send one request and all receive its objects.
+        """
+        character = self.server.fixtures["character"][3]
+        with ThreadPoolExecutor(10) as executor:
+            movies = list(executor.map(lambda _: get_all_movies(), range(10)))
+            characters = list(executor.map(lambda _: get_character_by_id(character["_id"]), range(5)))
+        self.assertEqual(self.server.requests, 2)
+        self.assertTrue(all(result == movies[0] and len(result) == 8 for result in movies))
+        self.assertTrue(all(found.id == character["_id"] for found in characters))
+        stats = client.get_client().stats()["single_flight"]
+        self.assertEqual(stats, {"calls": 2, "coalesced": 13, "in_flight": 0})
+        resources = self.metrics.to_dict()
+        self.assertEqual(resources["movie"]["coalesced"], 9)
+        self.assertEqual(resources["movie"]["requests"], {"200": 1})
+        self.assertEqual(resources["character"]["coalesced"], 4)
+        self.assertIn('lotr_sdk_coalesced_total{resource="movie"} 9', self.metrics.to_prometheus())
+
+    def test_without_coalescing(self):
+        """
+        Test that every call sends its own request when coalesce is False.
+        """
+        client.configure(api=self.server.api, headers={}, coalesce=False)
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda _: get_all_movies(), range(4)))
+        self.assertEqual(self.server.requests, 4)
+        self.assertNotIn("single_flight", client.get_client().stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import tempfile
+import os
+import client
+import memo
+from mock_server import MockServer, synthetic_fixtures
+from snapshot import Snapshot, compile_regex, sync_snapshot
+
+DOCS = {
+    "book": [
+        {"_id": "b1", "name": "The Fellowship Of The Ring"},
+        {"_id": "b2", "name": "The Two Towers"},
+    ],
+    "chapter": [
+        {"_id": "ch1", "chapterName": "A Long-expected Party", "book": "b1"},
+        {"_id": "ch2", "chapterName": "The Shadow of the Past", "book": "b1"},
+        {"_id": "ch3", "chapterName": "The Departure of Boromir", "book": "b2"},
+    ],
+    "character": [
+        {"_id": "c2", "height": "", "race": "Human", "gender": "Male", "birth": "", "spouse": "",
+         "death": "", "realm": "", "hair": "", "name": "Belemir"},
+        {"_id": "c1", "height": "", "race": "Human", "gender": "Female", "birth": "", "spouse": "Belemir",
+         "death": "", "realm": "", "hair": "", "name": "Adanel"},
+        {"_id": "c3", "height": "", "race": "Hobbit", "birth": "", "spouse": "",
+         "death": "", "realm": "", "hair": "", "name": "Frodo Baggins"},
+    ],
+    "movie": [
+        {"_id": "m1", "name": "The Two Towers", "runtimeInMinutes": 179, "budgetInMillions": 94,
+         "boxOfficeRevenueInMillions": 926, "academyAwardNominations": 6, "academyAwardWins": 2, "rottenTomatoesScore": 96},
+        {"_id": "m2", "name": "The Return of the King", "runtimeInMinutes": 201, "budgetInMillions": 94,
+         "boxOfficeRevenueInMillions": 1120, "academyAwardNominations": 11, "academyAwardWins": 11, "rottenTomatoesScore": 95},
+    ],
+    "quote": [
+        {"_id": "q1", "id": "q1", "dialog": "Yes, Mama.", "movie": "m1", "character": "c3"},
+        {"_id": "q2", "id": "q2", "dialog": "Gondor calls for aid.", "movie": "m2", "character": "c2"},
+    ],
+}
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Testing suite for snapshot.py.
+    """
+    def setUp(self):
+        self.snapshot = Snapshot(DOCS)
+
+    def test_compile_regex(self):
+        """
+        Test compile_regex() with API style regexes and plain values.
+        """
+        self.assertTrue(compile_regex("/belem/i").search("Belemir"))
+        self.assertFalse(compile_regex("/belem/").search("Belemir"))
+        self.assertTrue(compile_regex("Adanel").search("Adanel"))
+        self.assertFalse(compile_regex("Adan").search("Adanel"))
+
+    def test_hash_indexes(self):
+        """
+        Test lookups by id and name.
+        """
+        self.assertEqual(self.snapshot.get_character_by_id("c1").name, "Adanel")
+        self.assertEqual(self.snapshot.get_character_by_name("Frodo Baggins").gender, "")
+        self.assertEqual(self.snapshot.get_chapter_by_name("The Shadow of the Past").id, "ch2")
+        self.assertIsNone(self.snapshot.get_movie_by_id("missing"))
+        self.assertEqual([c.id for c in self.snapshot.get_chapters_by_book_id("b1")], ["ch1", "ch2"])
+
+    def test_sorted_indexes(self):
+        """
+        Test sorting ascending and descending, and invalid arguments.
+        """
+        self.assertEqual([c.id for c in self.snapshot.get_sorted_characters("_id", "asc")], ["c1", "c2", "c3"])
+        self.assertEqual([m.name for m in self.snapshot.get_sorted_movies("academyAwardWins", "desc")],
+                         ["The Return of the King", "The Two Towers"])
+        self.assertEqual(self.snapshot.get_sorted_books("height", "asc"), [])
+        self.assertEqual(self.snapshot.get_sorted_books("name", "up"), [])
+
+    def test_regex(self):
+        """
+        Test regex queries.
+        """
+        self.assertEqual([c.name for c in self.snapshot.get_character_by_regex("name", "/Belem/i")], ["Belemir"])
+        self.assertEqual([q.id for q in self.snapshot.get_quote_by_regex("dialog", "/mama/i")], ["q1"])
+
+    def test_save_and_load(self):
+        """
+        Test that a saved snapshot loads back with the same data.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "snapshot.json.gz")
+            self.snapshot.save(path)
+            loaded = Snapshot.load(path)
+        self.assertEqual(loaded.docs, DOCS)
+        self.assertEqual(loaded.created_at, self.snapshot.created_at)
+        self.assertEqual(loaded.get_book_by_name("The Two Towers").id, "b2")
+
+
+class TestSnapshotSync(unittest.TestCase):
+    """
+    Testing suite for syncing a snapshot with the server, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer(synthetic_fixtures({"character": 250, "quote": 420})).start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "snapshot.json.gz")
+
+    def tearDown(self):
+        self.directory.cleanup()
+        self.server.stop()
+        client.configure()
+        memo.configure()
+
+    def test_first_sync(self):
+        """
+        Test that syncing without a saved snapshot downloads every collection and saves it.
+        """
+        snapshot, report = sync_snapshot(self.path, limit=100)
+        self.assertTrue(report.ok)
+        self.assertEqual(snapshot.docs, self.server.fixtures)
+        quotes = next(result for result in report.collections if result.collection == "quote")
+        self.assertEqual((quotes.total, quotes.pages, quotes.fetched_pages, quotes.inserted), (420, 5, 5, 420))
+        self.assertEqual(Snapshot.load(self.path).docs, self.server.fixtures)
+
+    def test_unchanged(self):
+        """
+        Test that syncing an unchanged mirror is answered with 304s and changes nothing.
+        """
+        sync_snapshot(self.path, limit=100)
+        snapshot, report = sync_snapshot(self.path, limit=100)
+        self.assertEqual(sum(result.fetched_pages for result in report.collections), 0)
+        # one page of books, chapters and movies, 3 of characters and 5 of quotes
+        self.assertEqual(self.server.not_modified, 11)
+        self.assertEqual(sum(result.inserted + result.updated + result.deleted for result in report.collections), 0)
+        self.assertEqual(snapshot.docs, self.server.fixtures)
+        self.assertEqual(len(snapshot.syncs), 2)
+
+    def test_changes(self):
+        """
+        Test that only the changed pages are fetched, and are applied as inserts, updates and deletes.
+        """
+        sync_snapshot(self.path, limit=100)
+        characters = self.server.fixtures["character"]
+        characters[220] = {**characters[220], "name": "Renamed"}
+        quotes = self.server.fixtures["quote"]
+        quotes[10] = {**quotes[10], "dialog": "Edited"}
+        quotes.append({**quotes[0], "_id": "new", "id": "new"})
+        removed = quotes.pop(0)
+        self.server.stop()
+        self.server.start()
+        client.configure(api=self.server.api, headers={})
+
+        snapshot, report = sync_snapshot(self.path, limit=100)
+        results = {result.collection: result for result in report.collections}
+        character = results["character"]
+        self.assertEqual((character.fetched_pages, character.changed_pages, character.updated), (1, 1, 1))
+        # a delete shifts the docs of every later page
+        quote = results["quote"]
+        self.assertEqual((quote.changed_pages, quote.inserted, quote.updated, quote.deleted), (5, 1, 1, 1))
+        self.assertEqual(results["movie"].fetched_pages, 0)
+        self.assertEqual(snapshot.docs, self.server.fixtures)
+        self.assertEqual(snapshot.get_character_by_name("Renamed").id, characters[220]["_id"])
+        self.assertIsNone(snapshot.get_quote_by_id(removed["_id"]))
+        self.assertEqual(snapshot.get_quote_by_id("new").dialog, quotes[-1]["dialog"])
+
+    def test_appends(self):
+        """
+        Test that docs appended at the end change only the last pages.
+        """
+        sync_snapshot(self.path, limit=100)
+        quotes = self.server.fixtures["quote"]
+        quotes.extend({**quotes[i], "_id": f"new{i}", "id": f"new{i}"} for i in range(30))
+        self.server.stop()
+        self.server.start()
+        client.configure(api=self.server.api, headers={})
+
+        snapshot, report = sync_snapshot(self.path, limit=100)
+        quote = next(result for result in report.collections if result.collection == "quote")
+        # the total in every page changes its ETag, so its docs are compared by checksum
+        self.assertEqual((quote.pages, quote.changed_pages, quote.inserted, quote.deleted), (5, 1, 30, 0))
+        self.assertEqual(snapshot.count("quote"), 450)
+
+    def test_failed_sync(self):
+        """
+        Test that a collection failing to sync keeps its docs.
+        """
+        sync_snapshot(self.path, limit=100)
+        self.server.stop()
+        self.server.error_rate = 1
+        self.server.start()
+        client.configure(api=self.server.api, headers={}, max_retries=0)
+        snapshot, report = sync_snapshot(self.path, limit=100)
+        self.assertFalse(report.ok)
+        self.assertEqual(snapshot.docs, self.server.fixtures)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import client
+import filters
+import memo
+import sorting
+from characters import Character, get_sorted_characters
+from mock_server import MockServer
+from movies import get_all_movies, get_sorted_movies
+from sorting import parse_sort, ranks, sort, sort_objects
+
+CHARACTERS = [
+    Character("c1", "", "Hobbit", "Male", "", "", "", "Shire", "", "Frodo"),
+    Character("c2", "", "Elf", "Female", "", "", "", "", "", "Galadriel"),
+    Character("c3", "", "Hobbit", "Male", "", "", "", "Shire", "", "Sam"),
+    Character("c4", "", None, "Male", "", "", "", "", "", "Gandalf"),
+    Character("c5", "", "Elf", "Male", "", "", "", "", "", "Legolas"),
+]
+
+
+class TestSorting(unittest.TestCase):
+    """
+    Testing suite for sorting.py.
+    """
+    def ids(self, objects: list) -> list:
+        return [obj.id for obj in objects]
+
+    def test_parse_sort(self):
+        """
+        Test that parse_sort() reads several keys and defaults their direction.
+        """
+        self.assertEqual(parse_sort("race:asc, name:desc"), [("race", False), ("name", True)])
+        self.assertEqual(parse_sort("name", "desc"), [("name", True)])
+        self.assertEqual(parse_sort([("name", "asc")]), [("name", False)])
+        self.assertEqual(parse_sort(parse_sort("race:asc,name:desc")), [("race", False), ("name", True)])
+        for invalid in ("name:up", ":asc", ""):
+            with self.assertRaises(ValueError):
+                parse_sort(invalid)
+
+    def test_ranks(self):
+        """
+        Test that equal values share a rank and missing values sort first, as the API sorts them.
+        """
+        order, rank = ranks(CHARACTERS, "race")
+        self.assertEqual(order, [3, 1, 4, 0, 2])
+        self.assertEqual(rank, [2, 1, 2, 0, 1])
+
+    def test_sort_objects(self):
+        """
+        Test sorts by several keys with their own direction, and top-k selections.
+        """
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "race:asc,name:desc")), ["c4", "c5", "c2", "c3", "c1"])
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "race:desc,name:asc")), ["c1", "c3", "c2", "c5", "c4"])
+        # equal keys keep their order
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "gender:asc")), ["c2", "c1", "c3", "c4", "c5"])
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "gender:desc")), ["c1", "c3", "c4", "c5", "c2"])
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "race:asc,name:desc", limit=3)), ["c4", "c5", "c2"])
+        self.assertEqual(self.ids(sort_objects(CHARACTERS, "_id:desc", limit=2)), ["c5", "c4"])
+        self.assertEqual(sort_objects(CHARACTERS, "name", limit=0), [])
+
+
+class TestSortingLocal(unittest.TestCase):
+    """
+    Testing suite for sorting held collections, against a mock server.
+    """
+    def setUp(self):
+        self.server = MockServer().start()
+        client.configure(api=self.server.api, headers={})
+        memo.configure()
+        filters.configure()
+        sorting.clear()
+
+    def tearDown(self):
+        self.server.stop()
+        client.configure()
+        memo.configure()
+        filters.configure()
+        sorting.clear()
+
+    def test_sort(self):
+        """
+        Test that the first sort fetches the collection once, and that local sorts match the server's.
+        """
+        server_sorted = get_all_movies({"sort": "budgetInMillions:desc"})
+        requests = self.server.requests
+        self.assertEqual(get_sorted_movies("budgetInMillions", "desc"), server_sorted)
+        self.assertEqual(self.server.requests, requests)
+        characters = get_sorted_characters("race:asc,name:desc")
+        self.assertEqual(self.server.requests, requests + 1)
+        expected = sorted(sorted(characters, key=lambda character: character.name, reverse=True), key=lambda character: character.race)
+        self.assertEqual(characters, expected)
+        self.assertEqual(get_sorted_characters("race,name:desc", limit=10), expected[:10])
+        self.assertEqual(sort("character", "race:asc,name:desc", limit=10), expected[:10])
+        self.assertEqual(get_sorted_characters("name", "desc", limit=1)[0].name, "Character 99")
+        self.assertEqual(self.server.requests, requests + 1)
+        with self.assertLogs("lotr_sdk.characters", "ERROR") as logs:
+            self.assertEqual(get_sorted_characters("race,weight"), [])
+            self.assertEqual(get_sorted_characters("race:up"), [])
+        self.assertIn("Valid options: _id, height, race", logs.output[0])
+
+    def test_without_holding(self):
+        """
+        Test that sorts still run locally when holding is turned off.
+        """
+        filters.configure(max_age=0)
+        self.assertEqual([character.name for character in sort("character", "name", limit=2)], ["Character 0", "Character 1"])
+        self.assertEqual(len(sort("character", "name")), 933)
+
+
+if __name__ == "__main__":
+    unittest.main()
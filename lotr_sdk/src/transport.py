@@ -0,0 +1,71 @@
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+if __package__:
+    from .events import timings
+else:
+    from events import timings
+import socket
+import time
+
+
+class _TimedConnection():
+    """
+    A mixin for urllib3 connections that times name resolution separately
+    from opening the socket and the TLS handshake.
+    """
+    def _new_conn(self) -> socket.socket:
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # let urllib3 resolve again and raise its usual error
+            return super()._new_conn()
+        finally:
+            timings.dns_time = time.perf_counter() - start
+        host = self._dns_host
+        error = None
+        # connect to the resolved addresses in order, as urllib3 would
+        for address in dict.fromkeys(info[4][0] for info in addresses):
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+    def connect(self):
+        start = time.perf_counter()
+        timings.dns_time = 0
+        super().connect()
+        timings.connect_time = time.perf_counter() - start - timings.dns_time
+
+
+class TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    A class that works like requests' HTTPAdapter and records the DNS and
+    connect time of every new connection for connection_timings().
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
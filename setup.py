@@ -10,14 +10,19 @@ setuptools.setup(
     description="An SDK for The Lord of the Rings API",
     long_description=long_description,      # Long description read from the the readme file
     long_description_content_type="text/markdown",
-    packages=setuptools.find_packages(),    # List of all python modules to be installed
+    packages=["lotr_sdk"],                  # The package imported as lotr_sdk
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],                                      # Information to filter the project on PyPi website
     python_requires='>=3.9.10',             # Minimum version requirement of the package
-    py_modules=["Emily_Smith-sdk"],             # Name of the python package
-    package_dir={'':'lotr_sdk/src'},     # Directory of the source code of the package
-    install_requires=[]                     # Install other dependencies if any
+    package_dir={"lotr_sdk": "lotr_sdk/src"},  # Directory of the source code of the package
+    install_requires=["requests"],          # Install other dependencies if any
+    extras_require={                        # Optional dependencies, imported only when used
+        "async": ["aiohttp"],
+        "fast": ["orjson"],
+        "columnar": ["numpy"],
+        "export": ["pyarrow"],
+    },
 )
\ No newline at end of file